@@ -14,7 +14,8 @@ import ctypes
 class App(QApplication):
     def __init__(self, sys_argv) -> None:
         super(App, self).__init__(sys_argv)
-        ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID('mfa.app')
+        if sys.platform == "win32":
+            ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID('mfa.app')
         self.setWindowIcon(QIcon(u"icon.png"))
 
         self.message_service = ApplicationContainer.message_service()
@@ -42,6 +43,10 @@ class App(QApplication):
 
 
 if __name__ == '__main__':
+    data_service = ApplicationContainer.data_service()
+    data_service.load_content()
     app = App(sys.argv)
-    app.aboutToQuit.connect(ApplicationContainer.data_service().save_data)
+    data_service.warm_notes()
+    data_service.start_autosave()
+    app.aboutToQuit.connect(data_service.stop_autosave)
     sys.exit(app.exec_())
\ No newline at end of file
@@ -4,6 +4,10 @@ class Settings():
     # System FIle Path
     USER_FILE_PATH = "data/user.json"
 
+    USER_JOURNAL_PATH = "data/user.journal"
+
+    USER_DATABASE_PATH = "data/user.db"
+
     ICON_FILE_PATH = "resources/icons/"
 
     IMAGE_FILE_PATH = "resources/images/"
@@ -20,13 +24,33 @@ class Settings():
 
     NOTE_FILE_PATH = "data/notes/"
 
+    NOTE_CACHE_PATH = "data/notes_cache/"
+
     QUIZ_FILE_PATH = "data/quizzes/"
 
     HELP_TOKEN_FILE_PATH = "data/help_token.json"
 
+    # compiled copy of the static content above, rebuilt when a source changes
+    CONTENT_BUNDLE_PATH = "data/content.bundle"
+
     # APP SETTINGS
     ENABLE_CUSTOM_TITLE_BAR = True
     ENABLE_CUSTOM_THEME = False
 
+    # Encrypt picture password images in chunks with "cbc", "ctr" or "gcm", None keeps whole file CBC
+    PICTURE_STREAM_CIPHER = None
+
+    # "json" keeps one learner in USER_FILE_PATH, "sqlite" keeps every profile in USER_DATABASE_PATH
+    USER_STORAGE = "json"
+    USER_PROFILE = "default"
+
+    # Journal records before the user document is rewritten, fsync every record for power cut durability
+    USER_JOURNAL_COMPACT_RECORDS = 500
+    USER_JOURNAL_FSYNC = False
+
+    # Autosave after this many seconds without a change, or once this many changes are pending
+    AUTOSAVE_INTERVAL = 2.0
+    AUTOSAVE_MAX_DIRTY = 50
+
     # CUSTOM THEME FILE
     THEME_FILE = "resources/themes/light.css"
\ No newline at end of file
@@ -1,6 +1,8 @@
 from typing import Protocol, Any, List
+from concurrent.futures import Future, ThreadPoolExecutor
 from enum import Enum
-import datetime
+from models.authentication.strategy_state import StrategyState, timestamp
+import threading
 
 class Method(Enum):
     NULL = 0
@@ -13,6 +15,40 @@ class Method(Enum):
     TWOFA_KEY = 7
 
 
+_executor = None
+_executor_lock = threading.Lock()
+EXECUTOR_PREFIX = "authentication"
+
+
+def get_executor() -> ThreadPoolExecutor:
+    # Shared worker pool for slow strategy work (KDFs, image encryption), kept off the Qt thread
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix=EXECUTOR_PREFIX)
+        return _executor
+
+
+def on_executor() -> bool:
+    # True on a worker of the shared pool, work started there must not wait on the pool again
+    return threading.current_thread().name.startswith(EXECUTOR_PREFIX + "_")
+
+
+def submit_after(future: Future, fn, *args: Any) -> Future:
+    # Runs fn(result of future, *args) on the shared executor once future resolves,
+    # no thread is held while waiting for it
+    result = Future()
+
+    def run(f: Future) -> None:
+        try:
+            result.set_result(fn(f.result(), *args))
+        except Exception as e:
+            result.set_exception(e)
+
+    future.add_done_callback(lambda f: get_executor().submit(run, f))
+    return result
+
+
 class AuthenticationStrategy(Protocol):
     def get_type(self) -> Method:
         return Method.NULL
@@ -23,6 +59,12 @@ class AuthenticationStrategy(Protocol):
     def authenticate(self, index: int, *data: Any) -> bool:
         ...
 
+    def register_async(self, index: int, *data: Any) -> Future:
+        ...
+
+    def authenticate_async(self, index: int, *data: Any) -> Future:
+        ...
+
     def bypass(self) -> None:
         ...
 
@@ -57,6 +99,12 @@ class CompoundAuthentication(AuthenticationStrategy):
 
     def authenticate(self, index: int, *data: Any) -> bool:
         return self.childens[index].authenticate(*data)
+
+    def register_async(self, index: int, *data: Any) -> Future:
+        return self.childens[index].register_async(*data)
+
+    def authenticate_async(self, index: int, *data: Any) -> Future:
+        return self.childens[index].authenticate_async(*data)
     
     def bypass(self, index) -> None:
         self.childens[index].bypass()
@@ -69,14 +117,23 @@ class CompoundAuthentication(AuthenticationStrategy):
     
 
 class BaseStrategy(AuthenticationStrategy):
+    state_class = StrategyState
+
     def __init__(self) -> None:
-        self.data = {}
+        self.data = self.state_class()
+
+    def register_async(self, *data: Any) -> Future:
+        return get_executor().submit(self.register, *data)
+
+    def authenticate_async(self, *data: Any) -> Future:
+        return get_executor().submit(self.authenticate, *data)
 
     def bypass(self) -> None:
-        self.data["timestamp_authenticate"] = str(datetime.datetime.now())
+        self.data["timestamp_authenticate"] = timestamp()
     
     def store(self, data: dict) -> None:
         self.data |= data
 
     def get_stored(self) -> dict:
-        return self.data
\ No newline at end of file
+        # read-only view, nothing is copied
+        return self.data.view()
\ No newline at end of file
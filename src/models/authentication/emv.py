@@ -0,0 +1,109 @@
+from typing import Iterator, NamedTuple
+import hashlib
+import hmac
+import random
+import struct
+import time
+
+# Batch EMV transaction simulation for a registered chip card.
+# The static card prefix (chip details + signature) is hashed once, every transaction
+# copies that SHA-256 state and only feeds its own data, so per transaction cost does
+# not depend on the prefix.
+# The card and the issuer are separate objects, each with its own copy of the card key:
+# the issuer rebuilds the transaction data from the fields it was sent to check the ARQC,
+# the card checks the issuer's ARPC before a transaction counts as approved.
+
+ATC_MODULUS = 2**16 # application transaction counter is two bytes
+MAX_AMOUNT = 100000 # minor units
+APPROVED, DECLINED = b"00", b"05" # authorisation response codes
+
+
+class Transaction(NamedTuple):
+    counter: int
+    amount: int
+    unpredictable_number: int
+    arqc: bytes
+    arpc: bytes
+    approved: bool
+
+
+def card_prefix(chip_details, signature: bytes) -> bytes:
+    return str(chip_details).encode() + signature
+
+
+def transaction_data(amount: int, counter: int, unpredictable_number: int) -> bytes:
+    # amount authorised (8 bytes), ATC (2 bytes), unpredictable number (4 bytes)
+    return struct.pack(">QHI", amount, counter % ATC_MODULUS, unpredictable_number)
+
+
+class CardKey:
+    # SHA-256 state of the card prefix, copied for every cryptogram
+    def __init__(self, chip_details, signature: bytes) -> None:
+        self.prefix = card_prefix(chip_details, signature)
+        self._base = hashlib.sha256(self.prefix)
+
+    def mac(self, *parts: bytes) -> bytes:
+        digest = self._base.copy()
+        for part in parts:
+            digest.update(part)
+        return digest.digest()
+
+
+class EmvIssuer(CardKey):
+    # Issuer host, holds its own record of the card
+    def authorise(self, amount: int, counter: int, unpredictable_number: int, arqc: bytes) -> tuple[bytes, bytes]:
+        # (response code, ARPC) for the transaction as received
+        expected = self.mac(transaction_data(amount, counter, unpredictable_number))
+        code = APPROVED if hmac.compare_digest(expected, arqc) else DECLINED
+        return code, self.arpc(arqc, code)
+
+    def arpc(self, arqc: bytes, code: bytes = APPROVED) -> bytes:
+        return self.mac(arqc, code)
+
+
+class EmvTransactionEngine(CardKey):
+    # Card side, the issuer is built from the same registration unless one is given
+    def __init__(self, chip_details, signature: bytes, seed: int | None = None, issuer: EmvIssuer | None = None) -> None:
+        super().__init__(chip_details, signature)
+        self.issuer = issuer or EmvIssuer(chip_details, signature)
+        self.random = random.Random(seed)
+
+    def arqc(self, data: bytes) -> bytes:
+        return self.mac(data)
+
+    def check_arpc(self, arqc: bytes, code: bytes, arpc: bytes) -> bool:
+        # Card accepts the response only when it came from the card's issuer
+        return hmac.compare_digest(self.mac(arqc, code), arpc)
+
+    def process(self, amount: int, counter: int, unpredictable_number: int, send=None) -> Transaction:
+        # One authorisation round trip, send carries the request to the issuer and may alter it
+        arqc = self.arqc(transaction_data(amount, counter, unpredictable_number))
+        request = (amount, counter, unpredictable_number, arqc)
+        code, arpc = self.issuer.authorise(*(send(*request) if send else request))
+        approved = code == APPROVED and self.check_arpc(arqc, code, arpc)
+        return Transaction(counter % ATC_MODULUS, amount, unpredictable_number, arqc, arpc, approved)
+
+    def transactions(self, count: int, start_counter: int = 0) -> Iterator[Transaction]:
+        # Generator so large runs never hold more than one transaction
+        rand = self.random
+        for counter in range(start_counter, start_counter + count):
+            amount = rand.randrange(1, MAX_AMOUNT)
+            yield self.process(amount, counter, rand.getrandbits(32))
+
+    def run(self, count: int, start_counter: int = 0) -> dict:
+        # Drains transactions() and reports throughput
+        approved = 0
+        total_amount = 0
+        start = time.perf_counter()
+        for transaction in self.transactions(count, start_counter):
+            approved += transaction.approved
+            total_amount += transaction.amount
+        elapsed = time.perf_counter() - start
+        return {
+            "transactions": count,
+            "approved": approved,
+            "declined": count - approved,
+            "total_amount": total_amount,
+            "elapsed_s": elapsed,
+            "per_s": count / elapsed if elapsed else 0.0
+        }
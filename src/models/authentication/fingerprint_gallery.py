@@ -0,0 +1,151 @@
+from typing import Any, Hashable
+from models.authentication.fingerprint_template import as_words, popcount
+import numpy as np
+
+# 1:N identification over enrolled packed templates.
+# Templates live in one contiguous (N, bytes) matrix; "brute" scores every row with
+# XOR + popcount in chunks, "lsh" narrows to candidates with bit sampling hash tables
+# and then reranks those candidates exactly.
+
+
+class FingerprintGallery:
+    def __init__(self, template_bytes: int = 512, capacity: int = 1024, chunk_size: int = 65536,
+                 lsh_tables: int = 8, lsh_bits: int = 16, seed: int | None = None) -> None:
+        self.template_bytes = template_bytes
+        self.chunk_size = chunk_size
+        self.lsh_tables = lsh_tables
+        self.lsh_bits = lsh_bits
+        self._matrix = np.zeros((capacity, template_bytes), dtype=np.uint8)
+        self._ids = []
+        self._index_of = {}
+
+        # Each table hashes a template by a fixed random sample of its bits
+        rng = np.random.default_rng(seed)
+        positions = np.stack([rng.choice(template_bytes * 8, lsh_bits, replace=False) for _ in range(lsh_tables)])
+        self._sample_bytes = positions // 8
+        self._sample_shifts = (7 - positions % 8).astype(np.uint8)
+        self._sample_weights = (1 << np.arange(lsh_bits, dtype=np.uint32))
+        self._tables = None
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, template_id: Hashable) -> bool:
+        return template_id in self._index_of
+
+    @property
+    def templates(self) -> np.ndarray:
+        return self._matrix[:len(self._ids)]
+
+    @property
+    def nbytes(self) -> int:
+        return self.templates.nbytes
+
+    def _reserve(self, count: int) -> None:
+        needed = len(self._ids) + count
+        if needed > self._matrix.shape[0]:
+            capacity = max(needed, self._matrix.shape[0] * 2)
+            matrix = np.zeros((capacity, self.template_bytes), dtype=np.uint8)
+            matrix[:len(self._ids)] = self.templates
+            self._matrix = matrix
+
+    def add(self, template_id: Hashable, packed: np.ndarray) -> None:
+        self.add_many([template_id], np.asarray(packed)[None])
+
+    def add_many(self, template_ids: list, packed: np.ndarray) -> None:
+        packed = np.asarray(packed, dtype=np.uint8)
+        if packed.ndim != 2 or packed.shape[1] != self.template_bytes:
+            raise ValueError(f"Expected packed templates of shape (N, {self.template_bytes}).")
+        if len(template_ids) != packed.shape[0]:
+            raise ValueError("Number of ids does not match number of templates.")
+        if any(template_id in self._index_of for template_id in template_ids) or len(set(template_ids)) != len(template_ids):
+            raise ValueError("Template ids must be unique.")
+
+        self._reserve(len(template_ids))
+        start = len(self._ids)
+        self._matrix[start:start + len(template_ids)] = packed
+        for offset, template_id in enumerate(template_ids):
+            self._index_of[template_id] = start + offset
+        self._ids.extend(template_ids)
+        self._tables = None
+
+    def get(self, template_id: Hashable) -> np.ndarray:
+        return self.templates[self._index_of[template_id]]
+
+    def _hash(self, packed: np.ndarray) -> np.ndarray:
+        # (N, bytes) -> (tables, N) bucket keys
+        keys = np.empty((self.lsh_tables, packed.shape[0]), dtype=np.uint32)
+        for t in range(self.lsh_tables):
+            bits = (packed[:, self._sample_bytes[t]] >> self._sample_shifts[t]) & 1
+            keys[t] = bits.astype(np.uint32) @ self._sample_weights
+        return keys
+
+    def build_index(self) -> None:
+        # Sorted keys per table, a bucket lookup is then a searchsorted range
+        keys = self._hash(self.templates)
+        order = np.argsort(keys, axis=1, kind="stable")
+        self._tables = (np.take_along_axis(keys, order, axis=1), order)
+
+    def candidates(self, packed: np.ndarray) -> np.ndarray:
+        if self._tables is None:
+            self.build_index()
+        sorted_keys, order = self._tables
+        query_keys = self._hash(np.asarray(packed, dtype=np.uint8)[None])[:, 0]
+
+        found = []
+        for t in range(self.lsh_tables):
+            lo = np.searchsorted(sorted_keys[t], query_keys[t], side="left")
+            hi = np.searchsorted(sorted_keys[t], query_keys[t], side="right")
+            found.append(order[t, lo:hi])
+        return np.unique(np.concatenate(found))
+
+    def distances(self, packed: np.ndarray, rows: np.ndarray | None = None) -> np.ndarray:
+        query = as_words(np.asarray(packed, dtype=np.uint8))
+        if rows is not None:
+            return popcount(np.bitwise_xor(as_words(self.templates[rows]), query))
+
+        out = np.empty(len(self._ids), dtype=np.int64)
+        for start in range(0, len(self._ids), self.chunk_size):
+            stop = min(start + self.chunk_size, len(self._ids))
+            out[start:stop] = popcount(np.bitwise_xor(as_words(self._matrix[start:stop]), query))
+        return out
+
+    def distance_matrix(self, queries: np.ndarray) -> np.ndarray:
+        # (Q, N) distances, gallery rows are chunked so the XOR temporary stays bounded
+        queries = as_words(np.asarray(queries, dtype=np.uint8))
+        out = np.empty((queries.shape[0], len(self._ids)), dtype=np.int64)
+        step = max(1, self.chunk_size // max(1, queries.shape[0]))
+        for start in range(0, len(self._ids), step):
+            stop = min(start + step, len(self._ids))
+            chunk = as_words(self._matrix[start:stop])
+            out[:, start:stop] = popcount(np.bitwise_xor(queries[:, None, :], chunk[None, :, :]))
+        return out
+
+    def top_k(self, distances: np.ndarray, k: int, rows: np.ndarray | None = None) -> list[tuple[Any, float]]:
+        k = min(k, distances.size)
+        best = np.argpartition(distances, k - 1)[:k]
+        best = best[np.argsort(distances[best], kind="stable")]
+
+        bits = self.template_bytes * 8
+        indices = best if rows is None else rows[best]
+        return [(self._ids[i], 1.0 - float(distances[j]) / bits) for i, j in zip(indices, best)]
+
+    def search(self, packed: np.ndarray, k: int = 1, mode: str = "brute") -> list[tuple[Any, float]]:
+        if len(self._ids) == 0 or k <= 0:
+            return []
+
+        if mode == "brute":
+            rows = None
+        elif mode == "lsh":
+            rows = self.candidates(packed)
+            if rows.size == 0:
+                return []
+        else:
+            raise ValueError(f"Unknown search mode: {mode}")
+
+        return self.top_k(self.distances(packed, rows), k, rows)
+
+    def search_many(self, queries: np.ndarray, k: int = 1, mode: str = "brute") -> list[list[tuple[Any, float]]]:
+        if mode != "brute" or len(self._ids) == 0 or k <= 0:
+            return [self.search(query, k, mode) for query in queries]
+        return [self.top_k(distances, k) for distances in self.distance_matrix(queries)]
@@ -0,0 +1,141 @@
+from concurrent.futures import Future
+from models.authentication.authentication import BaseStrategy, Method, submit_after
+from models.authentication.strategy_state import FingerPrintState, TwoFAKeyState, timestamp
+from models.authentication.fingerprint_gallery import FingerprintGallery
+from models.authentication.signature_backends import get_signature_backend
+from models.authentication.fingerprint_template import generate_templates, generate_packed_templates, pack_template, packed_similarity
+import hashlib
+import secrets
+import random
+import numpy as np
+
+# Strategies built on fingerprint templates, kept apart from authentication_methods
+# because they pull in numpy, OpenCV and the RSA/ECC libraries
+
+class FingerprintTemplateMixin:
+    # Template helpers of the strategies that enrol a fingerprint
+    def generate_template(self, fingerprint_bytes: bytes) -> np.ndarray:
+        return generate_templates([fingerprint_bytes])[0]
+
+    def generate_templates(self, fingerprints: list[bytes]) -> np.ndarray:
+        return generate_templates(fingerprints)
+
+    def generate_packed_template(self, fingerprint_bytes: bytes) -> np.ndarray:
+        return generate_packed_templates([fingerprint_bytes])[0]
+
+    def calculate_similarity(self, template1, template2):
+        # Calculate similarity score on packed templates (popcount of XOR)
+        if np.ndim(template1) > 1:
+            template1 = pack_template(template1)
+        if np.ndim(template2) > 1:
+            template2 = pack_template(template2)
+        return packed_similarity(template1, template2)
+
+class FingerPrintStrategy(FingerprintTemplateMixin, BaseStrategy):
+    state_class = FingerPrintState
+
+    def __init__(self) -> None:
+        super().__init__()
+    
+    def get_type(self) -> Method:
+        return Method.FINGERPRINT
+        
+    def register(self, fingerprint: bytes) -> bool:
+        if fingerprint:
+            self.data["timestamp_register"] = timestamp()
+
+            self.data["user_fingerprint"] = fingerprint #For bypass
+
+            # Assuming doing fingerprint to fingerprint template
+            self.data["fingerprint_template"] = self.generate_packed_template(fingerprint)
+
+            return True
+        return False
+    
+    def authenticate(self, fingerprint: bytes) -> bool:
+        self.data["timestamp_authenticate"] = timestamp()
+        self.data["fingerprint"] = fingerprint
+        # Assuming doing fingerprint to fingerprint template
+        template = self.generate_packed_template(fingerprint)
+        # Account for False negative
+        if self.calculate_similarity(template, self.data["fingerprint_template"]) > 0.99:
+            self.data["similarity_score"] = random.uniform(0.97, 1.0)
+            return True
+        self.data["similarity_score"] = random.uniform(0.5, 0.7)
+        return False
+
+    def identify(self, fingerprint: bytes, gallery: FingerprintGallery, k: int = 1, mode: str = "brute") -> list:
+        # 1:N identification, top k enrolled ids by similarity
+        return gallery.search(self.generate_packed_template(fingerprint), k, mode)
+    
+    def bypass(self) -> None:
+        self.authenticate(self.data["user_fingerprint"])
+
+class TwoFAKeyStrategy(FingerprintTemplateMixin, BaseStrategy):
+    state_class = TwoFAKeyState
+
+    def __init__(self, key_size: int = 512, backend: str = "rsa") -> None:
+        super().__init__()
+        self.key_size = key_size # small bits for simulation
+        self.backend = get_signature_backend(backend)
+        self.backend.prepare(key_size) # the rsa key pool starts filling here, on first use
+    
+    def get_type(self) -> Method:
+        return Method.TWOFA_KEY
+    
+    def generate_challenge(self, length=16) -> bytes:
+        return secrets.token_bytes(length)
+    
+    def challenge_response(self) -> bool:
+        # server send challenge
+        nonce = self.generate_challenge()
+        self.data["nonce"] = nonce
+
+        # security key signs the challenge then client send to server
+        signed_challenge = self.backend.sign(nonce, self.data["private_key"])
+        self.data["signed_challenge"] = signed_challenge
+
+        # server calculate the expected response
+        return self.backend.verify(nonce, signed_challenge, self.data["public_key"])
+    
+    def register(self, fingerprint: bytes, key_pair: tuple | None = None) -> bool:
+        if fingerprint:
+            self.data["timestamp_register"] = timestamp()
+
+            self.data["user_fingerprint"] = fingerprint #For bypass
+            self.data["fingerprint"] = b""
+            self.data["similarity_score"] = "NULL"
+
+            # Assuming doing fingerprint to fingerprint template
+            self.data["fingerprint_template"] = self.generate_packed_template(fingerprint)
+            
+            self.data["signature_backend"] = self.backend.name
+            self.data["public_key"], self.data["private_key"] = key_pair or self.backend.generate_keys(self.key_size)
+
+            # Key handle to match to correct private key
+            self.data["key_handle"] = hashlib.sha256(b'link_to_private_key').hexdigest()
+
+            return True
+        return False
+
+    def register_async(self, fingerprint: bytes) -> Future:
+        # The key pair is requested first (from the key pool for rsa), the registration
+        # runs once it is ready so neither the caller nor a worker waits on the generation
+        if not fingerprint:
+            return super().register_async(fingerprint)
+        return submit_after(self.backend.generate_keys_async(self.key_size), lambda key_pair: self.register(fingerprint, key_pair))
+    
+    def authenticate(self, fingerprint: bytes) -> bool:
+        self.data["timestamp_authenticate"] = timestamp()
+        self.data["fingerprint"] = fingerprint
+        # Assuming doing fingerprint to fingerprint template
+        template = self.generate_packed_template(fingerprint)
+
+        if self.calculate_similarity(template, self.data["fingerprint_template"]) > 0.99:
+            self.data["similarity_score"] = random.uniform(0.97, 1.0)
+            return self.challenge_response()
+        self.data["similarity_score"] = random.uniform(0.5, 0.7)
+        return False
+    
+    def bypass(self) -> None:
+        self.authenticate(self.data["user_fingerprint"])
@@ -0,0 +1,236 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from models.authentication.template_cache import TemplateCache, content_key
+import cv2
+import numpy as np
+import threading
+
+# Shared fingerprint template pipeline used by FingerPrintStrategy and TwoFAKeyStrategy
+# decode -> equalise -> blur (per image, OpenCV releases the GIL) then
+# Otsu binarise -> area resize (batched NumPy over images of the same shape)
+# The resize reproduces cv2.resize(..., interpolation=cv2.INTER_AREA) pixel for pixel,
+# templates stay comparable with ones made by the per image OpenCV pipeline.
+
+TEMPLATE_SIZE = (64, 64)
+RESIZE_COEF_SCALE = 2048 # OpenCV's 11 bit fixed point interpolation weights
+
+# Packed templates hold 8 template pixels per byte, 64x64 -> 512 bytes
+POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def pack_templates(templates: np.ndarray) -> np.ndarray:
+    # (N, H, W) 0/1 templates -> (N, H*W/8) uint8
+    templates = np.asarray(templates, dtype=np.uint8)
+    return np.packbits(templates.reshape(templates.shape[0], -1), axis=1)
+
+
+def pack_template(template: np.ndarray) -> np.ndarray:
+    return pack_templates(np.asarray(template)[None])[0]
+
+
+def unpack_template(packed: np.ndarray, size: tuple = TEMPLATE_SIZE) -> np.ndarray:
+    out_w, out_h = size
+    return np.unpackbits(np.asarray(packed, dtype=np.uint8), count=out_w * out_h).reshape(out_h, out_w)
+
+
+def popcount(words: np.ndarray) -> np.ndarray:
+    # Number of set bits per element, summed over the last axis
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+    as_bytes = words.view(np.uint8)
+    return POPCOUNT_TABLE[as_bytes].sum(axis=-1, dtype=np.int64)
+
+
+def as_words(packed: np.ndarray) -> np.ndarray:
+    # View packed bytes as 64 bit words when the length allows it
+    packed = np.ascontiguousarray(packed, dtype=np.uint8)
+    if packed.shape[-1] % 8 == 0:
+        return packed.view(np.uint64)
+    return packed
+
+
+def hamming_distance(packed1: np.ndarray, packed2: np.ndarray) -> np.ndarray:
+    # Broadcasts over leading axes, e.g. one query against an (N, 512) gallery
+    return popcount(np.bitwise_xor(as_words(packed1), as_words(packed2)))
+
+
+def packed_similarity(packed1: np.ndarray, packed2: np.ndarray) -> float:
+    bits = np.asarray(packed1).shape[-1] * 8
+    return 1.0 - float(hamming_distance(packed1, packed2)) / bits
+
+
+@lru_cache(maxsize=64)
+def area_weights(in_len: int, out_len: int) -> np.ndarray:
+    # (out_len, in_len) matrix, row j averages the source span covered by output pixel j
+    scale = in_len / out_len
+    starts = np.arange(out_len) * scale
+    ends = starts + scale
+    edges = np.arange(in_len + 1)
+    overlap = np.clip(np.minimum(ends[:, None], edges[None, 1:]) - np.maximum(starts[:, None], edges[None, :-1]), 0, None)
+    weights = overlap / scale
+    weights.setflags(write=False)
+    return weights
+
+
+@lru_cache(maxsize=64)
+def linear_area_taps(in_len: int, out_len: int) -> tuple[np.ndarray, np.ndarray]:
+    # OpenCV's INTER_AREA when enlarging, two source pixels per output pixel with
+    # fixed point weights, returns (out_len, 2) indices and (out_len, 2) weights
+    inv_scale = out_len / in_len
+    dst = np.arange(out_len)
+    src = np.floor(dst * (in_len / out_len)).astype(np.int64)
+    fx = ((dst + 1) - (src + 1) * inv_scale).astype(np.float32)
+    fx = np.where(fx <= 0, np.float32(0), fx - np.floor(fx))
+    first = np.rint((np.float32(1) - fx) * np.float32(RESIZE_COEF_SCALE)).astype(np.int64)
+    indices = np.minimum(np.stack([src, src + 1], axis=1), in_len - 1)
+    weights = np.stack([first, RESIZE_COEF_SCALE - first], axis=1)
+    indices.setflags(write=False)
+    weights.setflags(write=False)
+    return indices, weights
+
+
+def otsu_thresholds(images: np.ndarray) -> np.ndarray:
+    # Otsu threshold for each image in an (N, H, W) uint8 stack
+    n = images.shape[0]
+    offsets = (np.arange(n, dtype=np.int64) * 256)[:, None]
+    hist = np.bincount((images.reshape(n, -1) + offsets).ravel(), minlength=n * 256).reshape(n, 256)
+    p = hist / images[0].size
+
+    omega = np.cumsum(p, axis=1)
+    mu = np.cumsum(p * np.arange(256), axis=1)
+    mu_t = mu[:, -1:]
+
+    eps = np.finfo(np.float32).eps
+    valid = (omega >= eps) & (omega <= 1 - eps)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sigma = (mu_t * omega - mu) ** 2 / (omega * (1 - omega))
+    sigma = np.where(valid, sigma, -1.0)
+    return np.argmax(sigma, axis=1).astype(np.uint8)
+
+
+class FingerprintTemplateEngine:
+    def __init__(self, size: tuple = TEMPLATE_SIZE, max_workers: int | None = None, cache: TemplateCache | None = None) -> None:
+        self.size = size
+        self.max_workers = max_workers
+        self.cache = cache
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="fingerprint")
+            return self._executor
+
+    def shutdown(self) -> None:
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def preprocess(self, fingerprint_bytes: bytes) -> np.ndarray:
+        arr = np.frombuffer(fingerprint_bytes, np.uint8)
+        image = cv2.imdecode(arr, cv2.IMREAD_GRAYSCALE)
+        if image is None:
+            raise ValueError("Fingerprint bytes could not be decoded as an image.")
+
+        # Enhance contrast
+        image = cv2.equalizeHist(image)
+
+        # Apply Gaussian Blur to smooth the image
+        return cv2.GaussianBlur(image, (3, 3), 0)
+
+    def binarise(self, images: np.ndarray) -> np.ndarray:
+        # Binarize a stack of same shaped images, 1 above each image's Otsu threshold
+        thresholds = otsu_thresholds(images)
+        return (images > thresholds[:, None, None]).astype(np.float32)
+
+    def resize(self, images: np.ndarray) -> np.ndarray:
+        # Simulated template: area resize of the whole stack, OpenCV only averages areas
+        # when shrinking in both directions and interpolates otherwise
+        out_w, out_h = self.size
+        in_h, in_w = images.shape[1:]
+        if in_h < out_h or in_w < out_w:
+            return self.resize_linear(images)
+
+        rows = area_weights(in_h, out_h).astype(np.float32)
+        cols = area_weights(in_w, out_w).astype(np.float32)
+        resized = rows @ images @ cols.T
+        if (in_h, in_w) == (2 * out_h, 2 * out_w):
+            # OpenCV's 2x2 fast path rounds halves up
+            return np.floor(resized + 0.5).astype(np.uint8)
+        return np.rint(resized).astype(np.uint8)
+
+    def resize_linear(self, images: np.ndarray) -> np.ndarray:
+        # Same integer arithmetic as OpenCV, horizontal pass then vertical pass
+        out_w, out_h = self.size
+        images = images.astype(np.int64)
+        x_index, x_weight = linear_area_taps(images.shape[2], out_w)
+        y_index, y_weight = linear_area_taps(images.shape[1], out_h)
+        horizontal = images[:, :, x_index[:, 0]] * x_weight[:, 0] + images[:, :, x_index[:, 1]] * x_weight[:, 1]
+        top = (y_weight[:, :1] * (horizontal[:, y_index[:, 0]] >> 4)) >> 16
+        bottom = (y_weight[:, 1:] * (horizontal[:, y_index[:, 1]] >> 4)) >> 16
+        return ((top + bottom + 2) >> 2).astype(np.uint8)
+
+    def compute(self, fingerprints: list[bytes]) -> np.ndarray:
+        out_w, out_h = self.size
+        templates = np.empty((len(fingerprints), out_h, out_w), dtype=np.uint8)
+        if not fingerprints:
+            return templates
+
+        if len(fingerprints) == 1:
+            images = [self.preprocess(fingerprints[0])]
+        else:
+            images = list(self.executor.map(self.preprocess, fingerprints))
+
+        # Group by shape so each group is processed as one stacked array
+        groups = {}
+        for i, image in enumerate(images):
+            groups.setdefault(image.shape, []).append(i)
+
+        for indices in groups.values():
+            stack = np.stack([images[i] for i in indices])
+            templates[indices] = self.resize(self.binarise(stack))
+
+        return templates
+
+    def generate(self, fingerprints: list[bytes]) -> np.ndarray:
+        if self.cache is None:
+            return self.compute(fingerprints)
+
+        out_w, out_h = self.size
+        templates = np.empty((len(fingerprints), out_h, out_w), dtype=np.uint8)
+
+        # Only blobs never seen before go through the OpenCV pipeline
+        missing = {}
+        for i, fingerprint in enumerate(fingerprints):
+            key = content_key(fingerprint)
+            cached = self.cache.get(key)
+            if cached is not None and cached.shape == (out_h, out_w):
+                templates[i] = cached
+            else:
+                missing.setdefault(key, []).append(i)
+
+        if missing:
+            keys = list(missing)
+            computed = self.compute([fingerprints[missing[key][0]] for key in keys])
+            for key, template in zip(keys, computed):
+                templates[missing[key]] = template
+                self.cache.put(key, template)
+
+        return templates
+
+    def generate_packed(self, fingerprints: list[bytes]) -> np.ndarray:
+        return pack_templates(self.generate(fingerprints))
+
+
+template_engine = FingerprintTemplateEngine(cache=TemplateCache())
+
+
+def generate_templates(fingerprints: list[bytes]) -> np.ndarray:
+    return template_engine.generate(fingerprints)
+
+
+def generate_packed_templates(fingerprints: list[bytes]) -> np.ndarray:
+    return template_engine.generate_packed(fingerprints)
@@ -0,0 +1,69 @@
+import hashlib
+import time
+
+# Named key derivation profiles for SaltStrategy.
+# The parameters used for a registration are stored next to its salt, verification
+# always re-derives with those stored parameters so profiles can change freely.
+
+KDF_PROFILES = {
+    "pbkdf2-sha256": {"algorithm": "pbkdf2-sha256", "iterations": 100000},
+    "pbkdf2-sha512": {"algorithm": "pbkdf2-sha512", "iterations": 50000},
+    "scrypt": {"algorithm": "scrypt", "n": 2**14, "r": 8, "p": 1, "dklen": 32}
+}
+
+# Registrations made before profiles existed
+LEGACY_KDF = KDF_PROFILES["pbkdf2-sha256"]
+
+MIN_PBKDF2_ITERATIONS = 1000
+MIN_SCRYPT_N = 2**10
+MAX_SCRYPT_N = 2**20
+
+
+def get_kdf_profile(name: str) -> dict:
+    try:
+        return dict(KDF_PROFILES[name])
+    except KeyError:
+        raise ValueError(f"Unknown KDF profile: {name}") from None
+
+
+def derive(secret: bytes, salt: bytes, params: dict) -> bytes:
+    algorithm = params["algorithm"]
+    if algorithm in ("pbkdf2-sha256", "pbkdf2-sha512"):
+        return hashlib.pbkdf2_hmac(algorithm.split("-")[1], secret, salt, params["iterations"])
+    if algorithm == "scrypt":
+        n, r, p = params["n"], params["r"], params["p"]
+        # default maxmem is 32 MiB, allow what the parameters actually need
+        return hashlib.scrypt(secret, salt=salt, n=n, r=r, p=p, dklen=params.get("dklen", 32), maxmem=256 * n * r * p + 2**20)
+    raise ValueError(f"Unknown KDF algorithm: {algorithm}")
+
+
+def measure(params: dict, rounds: int = 3) -> float:
+    # best of a few runs in seconds, to shave off scheduler noise
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        derive(b"calibration", b"calibration-salt", params)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def calibrate(name: str, target_ms: float = 50.0) -> dict:
+    # Pick the cost parameter for profile name that takes about target_ms on this host
+    params = get_kdf_profile(name)
+    target = target_ms / 1000
+
+    if params["algorithm"] == "scrypt":
+        probe = dict(params, n=2**12)
+        per_n = measure(probe) / probe["n"]
+        n = MIN_SCRYPT_N
+        while n * 2 <= MAX_SCRYPT_N and per_n * n * 2 <= target:
+            n *= 2
+        params["n"] = n
+    else:
+        probe = dict(params, iterations=10000)
+        per_iteration = measure(probe) / probe["iterations"]
+        iterations = int(target / per_iteration) // 1000 * 1000
+        params["iterations"] = max(MIN_PBKDF2_ITERATIONS, iterations)
+
+    params["calibrated_ms"] = round(measure(params, rounds=1) * 1000, 2)
+    return params
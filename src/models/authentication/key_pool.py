@@ -0,0 +1,184 @@
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from collections import deque
+import atexit
+import os
+import threading
+import time
+
+# Pre-generated RSA key pairs for TwoFAKeyStrategy.
+# Keys are generated in a background process pool up to a watermark per key size,
+# acquire() pops a ready pair in O(1) and tops the pool back up asynchronously.
+# The pool is started on first use (a TwoFAKeyStrategy with the rsa backend), so an app
+# launch that never simulates a 2FA key loads neither rsa nor the worker processes.
+# A request on an empty pool gets a future of the next generated pair.
+
+SUPPORTED_KEY_SIZES = (512, 1024, 2048)
+
+
+def generate_key_pair(bits: int) -> tuple:
+    # Runs in a worker process, must stay a module level function so it can be pickled
+    import rsa
+    start = time.perf_counter()
+    public_key, private_key = rsa.newkeys(bits)
+    return public_key, private_key, time.perf_counter() - start
+
+
+class KeyPool:
+    def __init__(self, watermark: int = 2, max_workers: int | None = None, use_processes: bool = True) -> None:
+        self.watermark = watermark
+        self.max_workers = max_workers or min(2, os.cpu_count() or 1)
+        self.use_processes = use_processes
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._ready = {bits: deque() for bits in SUPPORTED_KEY_SIZES}
+        self._pending = {bits: 0 for bits in SUPPORTED_KEY_SIZES}
+        self._waiters = {bits: deque() for bits in SUPPORTED_KEY_SIZES} # futures of requests made on an empty pool
+        self.hits = 0
+        self.misses = 0
+        self.generated = 0
+        self.failed = 0
+        self.total_generation_time = 0.0
+        self.last_generation_time = 0.0
+
+    @property
+    def executor(self) -> Executor:
+        # RSA generation is CPU bound pure Python, so the pool runs processes rather than the shared threads
+        with self._executor_lock:
+            if self._executor is None:
+                if self.use_processes:
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                else:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="key_pool")
+            return self._executor
+
+    def _check_size(self, bits: int) -> None:
+        if bits not in self._ready:
+            raise ValueError(f"Unsupported key size {bits}, expected one of {SUPPORTED_KEY_SIZES}.")
+
+    def _record(self, seconds: float) -> None:
+        # caller holds the lock
+        self.generated += 1
+        self.total_generation_time += seconds
+        self.last_generation_time = seconds
+
+    def _on_generated(self, bits: int, future: Future) -> None:
+        with self._lock:
+            self._pending[bits] -= 1
+            waiter = self._waiters[bits].popleft() if self._waiters[bits] else None
+            if future.cancelled() or future.exception() is not None:
+                self.failed += 1
+                key_pair = None
+            else:
+                public_key, private_key, seconds = future.result()
+                key_pair = (public_key, private_key)
+                self._record(seconds)
+                if waiter is None:
+                    self._ready[bits].append(key_pair)
+        # resolved outside the lock, a waiter's callbacks may call back into the pool
+        if waiter is not None:
+            if key_pair is None:
+                waiter.set_exception(future.exception() if not future.cancelled() else RuntimeError("Key generation was cancelled."))
+            else:
+                waiter.set_result(key_pair)
+
+    def _fail_waiter(self, bits: int, error: Exception) -> None:
+        with self._lock:
+            waiter = self._waiters[bits].popleft() if self._waiters[bits] else None
+        if waiter is not None:
+            waiter.set_exception(error)
+
+    def refill(self, bits: int = 512) -> int:
+        # Submit enough jobs to bring ready + pending up to the watermark plus the waiting requests
+        self._check_size(bits)
+        with self._lock:
+            missing = self.watermark + len(self._waiters[bits]) - len(self._ready[bits]) - self._pending[bits]
+            if missing <= 0:
+                return 0
+            self._pending[bits] += missing
+
+        for _ in range(missing):
+            try:
+                future = self.executor.submit(generate_key_pair, bits)
+            except RuntimeError as e:
+                # executor already shut down (interpreter exit)
+                with self._lock:
+                    self._pending[bits] -= 1
+                self._fail_waiter(bits, e)
+                continue
+            future.add_done_callback(lambda f, bits=bits: self._on_generated(bits, f))
+        return missing
+
+    def prefill(self, bits: int = 512) -> None:
+        self.refill(bits)
+
+    def acquire_async(self, bits: int = 512) -> Future:
+        # A future of a key pair, already resolved when the pool had one ready
+        self._check_size(bits)
+        future = Future()
+        with self._lock:
+            ready = self._ready[bits]
+            if ready:
+                self.hits += 1
+                future.set_result(ready.popleft())
+            else:
+                self.misses += 1
+                self._waiters[bits].append(future)
+        self.refill(bits)
+        return future
+
+    def acquire(self, bits: int = 512, timeout: float | None = None) -> tuple:
+        # On an empty pool this waits for the refill, the generation itself stays off this thread
+        return self.acquire_async(bits).result(timeout)
+
+    def depth(self, bits: int = 512) -> int:
+        self._check_size(bits)
+        return len(self._ready[bits])
+
+    def wait_ready(self, bits: int = 512, count: int = 1, timeout: float = 30.0) -> bool:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.depth(bits) >= count:
+                return True
+            time.sleep(0.01)
+        return self.depth(bits) >= count
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "watermark": self.watermark,
+                "depth": {bits: len(ready) for bits, ready in self._ready.items()},
+                "pending": dict(self._pending),
+                "hits": self.hits,
+                "misses": self.misses,
+                "generated": self.generated,
+                "failed": self.failed,
+                "last_generation_s": self.last_generation_time,
+                "avg_generation_s": self.total_generation_time / self.generated if self.generated else 0.0
+            }
+
+    def shutdown(self) -> None:
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+_key_pool = None
+_key_pool_lock = threading.Lock()
+
+
+def get_key_pool() -> KeyPool:
+    global _key_pool
+    with _key_pool_lock:
+        if _key_pool is None:
+            _key_pool = KeyPool()
+            atexit.register(_key_pool.shutdown)
+        return _key_pool
+
+
+def start_key_pool(bits: int = 512) -> KeyPool:
+    # Called when a strategy that needs keys is created, its registration then finds keys ready
+    pool = get_key_pool()
+    pool.prefill(bits)
+    return pool
@@ -0,0 +1,219 @@
+from typing import Any
+from models.authentication.authentication import BaseStrategy, CompoundAuthentication, Method
+from models.authentication.strategy_registry import strategy_registry
+from models.utils import ImageList, atomic_write
+import importlib
+import json
+import os
+import struct
+import uuid
+
+# Binary snapshot of an in-progress simulation, so a session survives a reboot or
+# moves to another worker process without redoing key generation or templates.
+#
+#   header   MAGIC, version (u8), measure, at, register_count, auth_count (i32), strategies (u16)
+#   strategy method (u8), config (u32 length + JSON), fields (u16)
+#   field    name (u8 length + UTF-8), tag (u8), payload (u32 length + bytes)
+#
+# numpy arrays are written raw (dtype, shape, buffer), keys as DER.
+
+MAGIC = b"MFAS"
+VERSION = 2
+
+HEADER = struct.Struct(">4sBiiiiH")
+STRATEGY = struct.Struct(">BI")
+FIELD = struct.Struct(">BI")
+
+NONE, BOOL, INT, FLOAT, STR, BYTES, NDARRAY, UUID, JSON, IMAGES, RSA_PUBLIC, RSA_PRIVATE, CRYPTO_RSA, CRYPTO_ECC = range(14)
+
+# strategy attributes that are configuration rather than state
+CONFIG_ATTRIBUTES = ("kdf_params", "window", "key_size")
+
+
+def _pack_list(items) -> bytes:
+    return struct.pack(">I", len(items)) + b"".join(struct.pack(">I", len(item)) + bytes(item) for item in items)
+
+
+def _unpack_list(payload: memoryview) -> list[bytes]:
+    count, = struct.unpack_from(">I", payload)
+    items, offset = [], 4
+    for _ in range(count):
+        length, = struct.unpack_from(">I", payload, offset)
+        items.append(bytes(payload[offset + 4:offset + 4 + length]))
+        offset += 4 + length
+    return items
+
+
+def encode_value(value: Any) -> tuple[int, bytes]:
+    # (tag, payload) for one field value
+    if value is None:
+        return NONE, b""
+    if isinstance(value, bool):
+        return BOOL, bytes([value])
+    if isinstance(value, int):
+        return INT, struct.pack(">q", value)
+    if isinstance(value, float):
+        return FLOAT, struct.pack(">d", value)
+    if isinstance(value, str):
+        return STR, value.encode("utf-8")
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return BYTES, bytes(value)
+    if isinstance(value, uuid.UUID):
+        return UUID, value.bytes
+    if isinstance(value, ImageList):
+        return IMAGES, _pack_list(value)
+
+    module = type(value).__module__
+    if module.startswith("numpy"):
+        if value.ndim == 0:
+            return encode_value(value.item())
+        dtype = value.dtype.str.encode()
+        header = struct.pack(">B", len(dtype)) + dtype + struct.pack(">B", value.ndim) + struct.pack(f">{value.ndim}I", *value.shape)
+        return NDARRAY, header + value.tobytes()
+    if module.startswith("rsa"):
+        return (RSA_PRIVATE if hasattr(value, "d") else RSA_PUBLIC), value.save_pkcs1(format="DER")
+    if module.startswith("Crypto.PublicKey.RSA"):
+        return CRYPTO_RSA, value.export_key(format="DER")
+    if module.startswith("Crypto.PublicKey.ECC"):
+        return CRYPTO_ECC, value.export_key(format="DER")
+
+    # kdf parameters, question lists
+    return JSON, json.dumps(value).encode("utf-8")
+
+
+def decode_value(tag: int, payload: memoryview) -> Any:
+    if tag == NONE:
+        return None
+    if tag == BOOL:
+        return bool(payload[0])
+    if tag == INT:
+        return struct.unpack(">q", payload)[0]
+    if tag == FLOAT:
+        return struct.unpack(">d", payload)[0]
+    if tag == STR:
+        return str(payload, "utf-8")
+    if tag == BYTES:
+        return bytes(payload)
+    if tag == UUID:
+        return uuid.UUID(bytes=bytes(payload))
+    if tag == IMAGES:
+        return ImageList(_unpack_list(payload))
+    if tag == NDARRAY:
+        import numpy as np
+        dtype_length = payload[0]
+        dtype = str(payload[1:1 + dtype_length], "ascii")
+        ndim = payload[1 + dtype_length]
+        shape = struct.unpack_from(f">{ndim}I", payload, 2 + dtype_length)
+        # copy so the array owns its memory rather than pinning the whole snapshot
+        return np.frombuffer(payload[2 + dtype_length + 4 * ndim:], dtype=dtype).reshape(shape).copy()
+    if tag in (RSA_PUBLIC, RSA_PRIVATE):
+        rsa = importlib.import_module("rsa")
+        key_class = rsa.PrivateKey if tag == RSA_PRIVATE else rsa.PublicKey
+        return key_class.load_pkcs1(bytes(payload), format="DER")
+    if tag == CRYPTO_RSA:
+        return importlib.import_module("Crypto.PublicKey.RSA").import_key(bytes(payload))
+    if tag == CRYPTO_ECC:
+        return importlib.import_module("Crypto.PublicKey.ECC").import_key(bytes(payload))
+    if tag == JSON:
+        return json.loads(str(payload, "utf-8"))
+    raise ValueError(f"Unknown field tag {tag}")
+
+
+def strategy_config(strategy: BaseStrategy) -> dict:
+    config = {name: getattr(strategy, name) for name in CONFIG_ATTRIBUTES if hasattr(strategy, name)}
+    if hasattr(strategy, "backend"):
+        config["backend"] = strategy.backend.name
+    return config
+
+
+def dump_strategy(strategy: BaseStrategy) -> bytes:
+    config = json.dumps(strategy_config(strategy)).encode("utf-8")
+    parts = [STRATEGY.pack(strategy.get_type().value, len(config)), config, struct.pack(">H", len(strategy.data))]
+    for name, value in strategy.data.items():
+        encoded_name = name.encode("utf-8")
+        tag, payload = encode_value(value)
+        parts += [struct.pack(">B", len(encoded_name)), encoded_name, FIELD.pack(tag, len(payload)), payload]
+    return b"".join(parts)
+
+
+def load_strategy(blob: memoryview, offset: int) -> tuple[BaseStrategy, int]:
+    method, config_length = STRATEGY.unpack_from(blob, offset)
+    offset += STRATEGY.size
+    config = json.loads(str(blob[offset:offset + config_length], "utf-8"))
+    offset += config_length
+
+    try:
+        strategy_class = strategy_registry[Method(method)]
+    except (KeyError, ValueError):
+        raise ValueError(f"Not a valid snapshot, unknown method {method}.") from None
+    strategy = strategy_class()
+
+    if not isinstance(config, dict):
+        raise ValueError("Not a valid snapshot, strategy config is not an object.")
+    for name, value in config.items():
+        # only configuration the strategy has, anything else in the blob is rejected
+        if name not in CONFIG_ATTRIBUTES + ("backend",) or not hasattr(strategy, name):
+            raise ValueError(f"Not a valid snapshot, unexpected strategy config {name!r}.")
+        if name == "backend":
+            from models.authentication.signature_backends import get_signature_backend
+            value = get_signature_backend(value)
+        setattr(strategy, name, value)
+
+    count, = struct.unpack_from(">H", blob, offset)
+    offset += 2
+    for _ in range(count):
+        name_length = blob[offset]
+        name = str(blob[offset + 1:offset + 1 + name_length], "utf-8")
+        offset += 1 + name_length
+        tag, length = FIELD.unpack_from(blob, offset)
+        offset += FIELD.size
+        strategy.data[name] = decode_value(tag, blob[offset:offset + length])
+        offset += length
+    return strategy, offset
+
+
+def dump_session(service) -> bytes:
+    # AuthenticationService -> bytes, lockout state is left out on purpose
+    strategies = service.strategy.childens
+    header = HEADER.pack(MAGIC, VERSION, service.measure, service.at, service.register_count,
+                         service.auth_count, len(strategies))
+    return header + b"".join(dump_strategy(strategy) for strategy in strategies)
+
+
+def load_session(service, blob: bytes) -> None:
+    # Replace the chain and counters of service with those in blob
+    blob = memoryview(blob)
+    if len(blob) < HEADER.size:
+        raise ValueError("Snapshot is truncated.")
+    magic, version, measure, at, register_count, auth_count, count = HEADER.unpack_from(blob)
+    if magic != MAGIC:
+        raise ValueError("Not a session snapshot.")
+    if version != VERSION:
+        raise ValueError(f"Unsupported snapshot version {version}.")
+
+    chain = CompoundAuthentication()
+    offset = HEADER.size
+    try:
+        for _ in range(count):
+            strategy, offset = load_strategy(blob, offset)
+            chain.add(strategy)
+    except (struct.error, IndexError) as e:
+        raise ValueError("Snapshot is truncated.") from e
+    if offset != len(blob):
+        raise ValueError("Snapshot is truncated or has trailing bytes.")
+
+    with service.state_lock:
+        service.strategy = chain
+        service.measure = measure
+        service.at = at
+        service.register_count = register_count
+        service.auth_count = auth_count
+
+
+def write_snapshot(service, path: str) -> None:
+    atomic_write(path, dump_session(service))
+
+
+def read_snapshot(service, path: str) -> None:
+    with open(path, 'rb') as f:
+        load_session(service, f.read())
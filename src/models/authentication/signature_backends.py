@@ -0,0 +1,119 @@
+from Crypto.Hash import SHA256
+from Crypto.PublicKey import ECC, RSA
+from Crypto.Signature import DSS, pkcs1_15, pss
+from concurrent.futures import Future
+from models.authentication.authentication import get_executor
+from models.authentication.key_pool import get_key_pool
+import rsa
+
+# Signer/verifier backends for the security key challenge-response.
+# Each backend generates its own key pair, signs a challenge with the private key
+# and verifies the signature with the public key.
+
+
+class SignatureBackend:
+    name = ""
+
+    def generate_keys(self, bits: int) -> tuple:
+        # returns (public_key, private_key)
+        ...
+
+    def prepare(self, bits: int) -> None:
+        # Called when a strategy picks the backend, before any key is needed
+        pass
+
+    def generate_keys_async(self, bits: int) -> Future:
+        # Future of (public_key, private_key)
+        return get_executor().submit(self.generate_keys, bits)
+
+    def sign(self, message: bytes, private_key) -> bytes:
+        ...
+
+    def verify(self, message: bytes, signature: bytes, public_key) -> bool:
+        ...
+
+
+class RsaBackend(SignatureBackend):
+    # pure Python rsa package, PKCS#1 v1.5 with SHA-256
+    name = "rsa"
+
+    def generate_keys(self, bits: int) -> tuple:
+        return get_key_pool().acquire(bits)
+
+    def prepare(self, bits: int) -> None:
+        get_key_pool().prefill(bits)
+
+    def generate_keys_async(self, bits: int) -> Future:
+        return get_key_pool().acquire_async(bits)
+
+    def sign(self, message: bytes, private_key) -> bytes:
+        return rsa.sign(message, private_key, 'SHA-256')
+
+    def verify(self, message: bytes, signature: bytes, public_key) -> bool:
+        try:
+            rsa.verify(message, signature, public_key)
+            return True
+        except rsa.VerificationError:
+            return False
+
+
+class CryptodomeRsaBackend(SignatureBackend):
+    # pycryptodome RSA with either PSS or PKCS#1 v1.5 padding
+    MIN_KEY_SIZE = 1024 # pycryptodome refuses smaller moduli
+
+    def __init__(self, scheme: str = "pss") -> None:
+        if scheme not in ("pss", "pkcs1v15"):
+            raise ValueError(f"Unknown RSA signature scheme: {scheme}")
+        self.scheme = scheme
+        self.name = f"rsa-{scheme}"
+
+    def _signer(self, key):
+        return pss.new(key) if self.scheme == "pss" else pkcs1_15.new(key)
+
+    def generate_keys(self, bits: int) -> tuple:
+        private_key = RSA.generate(max(bits, self.MIN_KEY_SIZE))
+        return private_key.public_key(), private_key
+
+    def sign(self, message: bytes, private_key) -> bytes:
+        return self._signer(private_key).sign(SHA256.new(message))
+
+    def verify(self, message: bytes, signature: bytes, public_key) -> bool:
+        try:
+            self._signer(public_key).verify(SHA256.new(message), signature)
+            return True
+        except (ValueError, TypeError):
+            return False
+
+
+class EcdsaP256Backend(SignatureBackend):
+    # pycryptodome ECDSA over NIST P-256, key size is fixed by the curve
+    name = "ecdsa-p256"
+
+    def generate_keys(self, bits: int) -> tuple:
+        private_key = ECC.generate(curve="P-256")
+        return private_key.public_key(), private_key
+
+    def sign(self, message: bytes, private_key) -> bytes:
+        return DSS.new(private_key, 'fips-186-3').sign(SHA256.new(message))
+
+    def verify(self, message: bytes, signature: bytes, public_key) -> bool:
+        try:
+            DSS.new(public_key, 'fips-186-3').verify(SHA256.new(message), signature)
+            return True
+        except ValueError:
+            return False
+
+
+SIGNATURE_BACKENDS = {
+    "rsa": RsaBackend,
+    "rsa-pss": lambda: CryptodomeRsaBackend("pss"),
+    "rsa-pkcs1v15": lambda: CryptodomeRsaBackend("pkcs1v15"),
+    "ecdsa-p256": EcdsaP256Backend
+}
+
+
+def get_signature_backend(name: str) -> SignatureBackend:
+    try:
+        return SIGNATURE_BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown signature backend: {name}") from None
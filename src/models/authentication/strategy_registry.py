@@ -0,0 +1,45 @@
+from typing import Iterator
+from collections.abc import Mapping
+from models.authentication.authentication import Method
+import importlib
+import threading
+
+# Method -> strategy class, resolved on first use so a session that only uses
+# passwords never imports numpy, OpenCV or rsa
+
+STRATEGY_PATHS = {
+    Method.PASSWORD: ("models.authentication.authentication_methods", "PasswordStrategy"),
+    Method.SECRET_QUESTION: ("models.authentication.authentication_methods", "SecurityQuestionStrategy"),
+    Method.PICTURE_PASSWORD: ("models.authentication.authentication_methods", "PicturePasswordStrategy"),
+    Method.FINGERPRINT: ("models.authentication.fingerprint_methods", "FingerPrintStrategy"),
+    Method.CHIP_PIN: ("models.authentication.authentication_methods", "ChipPinStrategy"),
+    Method.TOTP: ("models.authentication.authentication_methods", "TOTPStrategy"),
+    Method.TWOFA_KEY: ("models.authentication.fingerprint_methods", "TwoFAKeyStrategy")
+}
+
+
+class StrategyRegistry(Mapping):
+    def __init__(self, paths: dict | None = None) -> None:
+        self.paths = paths or STRATEGY_PATHS
+        self._classes = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, method: Method) -> type:
+        strategy_class = self._classes.get(method)
+        if strategy_class is None:
+            module_name, class_name = self.paths[method]
+            with self._lock:
+                strategy_class = self._classes[method] = getattr(importlib.import_module(module_name), class_name)
+        return strategy_class
+
+    def __iter__(self) -> Iterator[Method]:
+        return iter(self.paths)
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def is_loaded(self, method: Method) -> bool:
+        return method in self._classes
+
+
+strategy_registry = StrategyRegistry()
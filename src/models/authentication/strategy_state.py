@@ -0,0 +1,156 @@
+from typing import Any, Iterator
+from collections.abc import Mapping, MutableMapping
+import datetime
+
+# Compact per-strategy state. Each strategy declares its fields as __slots__ instead of
+# a free-form dict, an unset slot reads as a missing key so strategies keep using
+# self.data["key"] and "key" in self.data. Timestamps are stored as epoch floats and
+# only rendered to text by the read-only view handed out by get_stored().
+
+TIMESTAMP_FIELDS = frozenset(("timestamp_register", "timestamp_authenticate"))
+
+
+def timestamp() -> float:
+    # epoch seconds from the wall clock str(datetime.datetime.now()) used to read
+    return datetime.datetime.now().timestamp()
+
+
+def render_timestamp(value: Any) -> Any:
+    # Same text str(datetime.datetime.now()) used to produce
+    if isinstance(value, float):
+        return str(datetime.datetime.fromtimestamp(value))
+    return value
+
+
+class StrategyState(MutableMapping):
+    __slots__ = ("timestamp_register", "timestamp_authenticate", "_extra")
+
+    @classmethod
+    def fields(cls) -> tuple:
+        # every declared slot across the hierarchy, in declaration order
+        names = []
+        for klass in reversed(cls.__mro__):
+            names.extend(name for name in getattr(klass, "__slots__", ()) if name != "_extra")
+        return tuple(names)
+
+    def _extras(self) -> dict:
+        try:
+            return self._extra
+        except AttributeError:
+            return {}
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._field_set:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        return self._extras()[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in self._field_set:
+            setattr(self, key, value)
+        else:
+            # keys no strategy declares (session_store from a viewmodel) go to a lazily created dict
+            try:
+                self._extra[key] = value
+            except AttributeError:
+                self._extra = {key: value}
+
+    def __delitem__(self, key: str) -> None:
+        if key in self._field_set:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        else:
+            del self._extras()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        for name in self._fields:
+            if hasattr(self, name):
+                yield name
+        yield from list(self._extras())
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __ior__(self, other: Mapping) -> "StrategyState":
+        self.update(other)
+        return self
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self.items())!r})"
+
+    def copy(self) -> dict:
+        return dict(self.items())
+
+    def view(self) -> "StateView":
+        return StateView(self)
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        super().__init_subclass__(**kwargs)
+        cls._fields = cls.fields()
+        cls._field_set = frozenset(cls._fields)
+
+
+StrategyState._fields = StrategyState.fields()
+StrategyState._field_set = frozenset(StrategyState._fields)
+
+
+class StateView(Mapping):
+    # Read-only live view of a strategy state, timestamps come out as text
+    __slots__ = ("_state",)
+
+    def __init__(self, state: StrategyState) -> None:
+        self._state = state
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._state[key]
+        return render_timestamp(value) if key in TIMESTAMP_FIELDS else value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._state)
+
+    def __len__(self) -> int:
+        return len(self._state)
+
+    def __repr__(self) -> str:
+        return f"StateView({self.copy()!r})"
+
+    def copy(self) -> dict:
+        # Plain dict for callers that go on to edit the values for display
+        return {key: self[key] for key in self._state}
+
+
+class SaltState(StrategyState):
+    __slots__ = ("salt", "kdf", "hashed_secret")
+
+
+class PasswordState(SaltState):
+    __slots__ = ("user_registered", "user_password", "username", "password")
+
+
+class SecurityQuestionState(SaltState):
+    __slots__ = ("user_questions", "user_answers", "answers")
+
+
+class TOTPState(SaltState):
+    __slots__ = ("shared_key", "last_accepted_step", "step_drift", "totp", "totp_entered", "sha1_hash")
+
+
+class ChipPinState(StrategyState):
+    __slots__ = ("user_pin", "hashed_pin", "chip_details", "chip_digital_signature", "pin", "arqc", "arpc")
+
+
+class PicturePasswordState(StrategyState):
+    __slots__ = ("user_images", "hashed_secret", "images", "nonce", "signed_challenge", "expected_response",
+                 "encryption_key", "iv")
+
+
+class FingerPrintState(StrategyState):
+    __slots__ = ("user_fingerprint", "fingerprint_template", "fingerprint", "similarity_score")
+
+
+class TwoFAKeyState(FingerPrintState):
+    __slots__ = ("signature_backend", "public_key", "private_key", "key_handle", "key_name", "nonce", "signed_challenge")
@@ -0,0 +1,109 @@
+from collections import OrderedDict
+from models.utils import atomic_write
+import hashlib
+import os
+import threading
+import numpy as np
+
+# Content addressed store for fingerprint templates, keyed by SHA-256 of the raw image bytes.
+# Memory tier is a bounded LRU, disk tier (.npy per template) is opt-in and survives restarts.
+
+
+def content_key(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class TemplateCache:
+    def __init__(self, max_entries: int = 256, cache_dir: str | None = None) -> None:
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.npy")
+
+    def _put_memory(self, key: str, template: np.ndarray) -> None:
+        # caller holds the lock
+        self._entries[key] = template
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get(self, key: str) -> np.ndarray | None:
+        with self._lock:
+            template = self._entries.get(key)
+            if template is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return template
+
+        if self.cache_dir:
+            try:
+                template = np.load(self._disk_path(key), allow_pickle=False)
+            except (OSError, ValueError):
+                template = None
+            if template is not None:
+                template.setflags(write=False)
+                with self._lock:
+                    self._put_memory(key, template)
+                    self.hits += 1
+                    self.disk_hits += 1
+                return template
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, template: np.ndarray) -> None:
+        template = np.array(template, copy=True)
+        template.setflags(write=False)
+        with self._lock:
+            self._put_memory(key, template)
+
+        if self.cache_dir:
+            path = self._disk_path(key)
+            if not os.path.exists(path):
+                atomic_write(path, lambda f: np.save(f, template, allow_pickle=False))
+
+    def clear(self, disk: bool = False) -> None:
+        with self._lock:
+            self._entries.clear()
+        if disk and self.cache_dir:
+            for filename in os.listdir(self.cache_dir):
+                if filename.endswith(".npy"):
+                    os.remove(os.path.join(self.cache_dir, filename))
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.disk_hits = 0
+            self.evictions = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "disk_hits": self.disk_hits,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0
+            }
@@ -0,0 +1,56 @@
+from models.authentication.totp import DIGITS
+import hmac
+import numpy as np
+
+# Bulk TOTP validation, reference model for a server checking many submissions at once.
+# Kept apart from totp so TOTPStrategy loads without numpy.
+# Validation runs serially in chunks: HMAC-SHA1 over 8 byte messages holds the GIL, so a
+# thread pool only adds overhead, and a process pool pays more to pickle the keys than it
+# saves (see tests/benchmarks/bench_totp_bulk.py).
+
+BULK_CHUNK_SIZE = 4096 # bounds the (chunk, 20) digest arrays
+
+
+def parse_codes(codes, digits: int = DIGITS) -> np.ndarray:
+    # Submitted codes as int64, anything that is not exactly digits ASCII digits becomes -1 and never matches
+    if isinstance(codes, np.ndarray) and codes.dtype.kind in "iu":
+        return codes.astype(np.int64)
+    return np.array([int(code) if isinstance(code, str) and len(code) == digits and code.isascii() and code.isdigit() else -1
+                     for code in codes], dtype=np.int64)
+
+
+def bulk_digests(keys: list[bytes], counters: np.ndarray) -> np.ndarray:
+    # (N, 20) raw HMAC-SHA1 digests, hmac.digest is the one shot C implementation
+    messages = counters.astype(">u8").tobytes()
+    joined = b"".join(hmac.digest(key, messages[i * 8:i * 8 + 8], "sha1") for i, key in enumerate(keys))
+    return np.frombuffer(joined, dtype=np.uint8).reshape(len(keys), 20)
+
+
+def bulk_truncate(digests: np.ndarray, digits: int = DIGITS) -> np.ndarray:
+    # Dynamic truncation of every row at once
+    offsets = (digests[:, -1] & 0x0f).astype(np.intp)
+    words = np.take_along_axis(digests, offsets[:, None] + np.arange(4), axis=1).astype(np.uint32)
+    binary = ((words[:, 0] << 24) | (words[:, 1] << 16) | (words[:, 2] << 8) | words[:, 3]) & 0x7fffffff
+    return (binary % 10 ** digits).astype(np.int64)
+
+
+def _validate_chunk(keys: list[bytes], counters: np.ndarray, codes: np.ndarray, digits: int, window: int) -> np.ndarray:
+    result = np.zeros(len(keys), dtype=bool)
+    for drift in range(-window, window + 1):
+        result |= bulk_truncate(bulk_digests(keys, counters + drift), digits) == codes
+    return result
+
+
+def validate_bulk(shared_keys, counters, codes, digits: int = DIGITS, window: int = 0) -> np.ndarray:
+    # Boolean array, True where codes[i] is valid for shared_keys[i] at counters[i] (+/- window)
+    keys = [key if isinstance(key, bytes) else bytes(key, encoding="utf-8") for key in shared_keys]
+    counters = np.broadcast_to(np.asarray(counters, dtype=np.int64), (len(keys),))
+    codes = parse_codes(codes, digits)
+    if not (len(keys) == counters.shape[0] == codes.shape[0]):
+        raise ValueError("shared_keys, counters and codes must have the same length.")
+
+    if len(keys) <= BULK_CHUNK_SIZE:
+        return _validate_chunk(keys, counters, codes, digits, window)
+    return np.concatenate([_validate_chunk(keys[i:i + BULK_CHUNK_SIZE], counters[i:i + BULK_CHUNK_SIZE],
+                                           codes[i:i + BULK_CHUNK_SIZE], digits, window)
+                           for i in range(0, len(keys), BULK_CHUNK_SIZE)])
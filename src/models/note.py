@@ -15,4 +15,13 @@ class Note:
 
     @content.setter
     def content(self,  content: str) -> None:
-        self._content = markdown.markdown(content)
\ No newline at end of file
+        self._content = markdown.markdown(content)
+
+    @property
+    def html(self) -> str:
+        return self._content
+
+    @html.setter
+    def html(self, html: str) -> None:
+        # already rendered, e.g. by the note index
+        self._content = html
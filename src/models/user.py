@@ -3,6 +3,8 @@ from enum import Enum
 from datetime import datetime
 import json
 
+ACTIVITY_DATE_FORMAT = "%A, %b %d, %Y, %I:%M %p"
+
 
 class Badge(Enum):
     ONE_FA = [0, "b5.png"]
@@ -47,7 +49,7 @@ class User:
         self.simulation_played += 1
 
     def add_activity(self, activity_title, description) -> None:
-        formatted_date = datetime.now().strftime("%A, %b %d, %Y, %I:%M %p")
+        formatted_date = datetime.now().strftime(ACTIVITY_DATE_FORMAT)
         if len(self.recent_activities) == 3:
             self.recent_activities.pop(0)
         self.recent_activities.append((activity_title, formatted_date, description))
@@ -80,18 +82,24 @@ class User:
     def unlock_simulation(self, method_val: int) -> None:
         self.unlocked_simulations[method_val] = True
     
+    def to_dict(self) -> dict:
+        return self.__dict__
+
     def to_json(self) -> str:
-        return json.dumps(self.__dict__)
+        return json.dumps(self.to_dict())
     
     @classmethod
-    def from_json(cls, json_string):
+    def from_dict(cls, user_data: dict):
         def convert_keys_to_int(x) -> dict:
             if isinstance(x, dict):
                 return {int(k): v for k, v in x.items()}
             return x
 
-        user_data = json.loads(json_string)
         user = cls()
         user.__dict__.update(user_data)
         user.unlocked_simulations = convert_keys_to_int(user.unlocked_simulations)
-        return user
\ No newline at end of file
+        return user
+
+    @classmethod
+    def from_json(cls, json_string):
+        return cls.from_dict(json.loads(json_string))
\ No newline at end of file
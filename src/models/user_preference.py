@@ -8,12 +8,18 @@ class UserPreference():
         self.custom_quiz_setting_expand = False
         self.show_notification = True
 
+    def to_dict(self) -> dict:
+        return self.__dict__
+
     def to_json(self) -> str:
-        return json.dumps(self.__dict__)
+        return json.dumps(self.to_dict())
     
     @classmethod
-    def from_json(cls, json_string):
-        preference_data = json.loads(json_string)
+    def from_dict(cls, preference_data: dict):
         preference = cls()
         preference.__dict__.update(preference_data)
-        return preference
\ No newline at end of file
+        return preference
+
+    @classmethod
+    def from_json(cls, json_string):
+        return cls.from_dict(json.loads(json_string))
\ No newline at end of file
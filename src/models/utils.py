@@ -1,7 +1,13 @@
+from collections import OrderedDict
 import base64
-from Crypto.Cipher import AES
-from Crypto.Util.Padding import pad, unpad
+import hashlib
+import hmac
+import os
+import tempfile
+import threading
 
+# pycryptodome is imported inside the functions that use it, the viewmodels import this
+# module at startup and most sessions never encrypt an image
 
 
 def normalise_text(text: str) -> str:
@@ -16,7 +22,50 @@ def byte_str(bytes_val: bytes) -> str:
     return base64.b64encode(bytes_val).decode('utf-8')
 
 def decode_key(key) -> str:
-    return key.save_pkcs1().decode()
+    if hasattr(key, "save_pkcs1"): # rsa package
+        return key.save_pkcs1().decode()
+    # pycryptodome RSA returns bytes, ECC returns str
+    pem = key.export_key(format="PEM")
+    return pem.decode() if isinstance(pem, bytes) else pem
+
+def hash_images(images) -> bytes:
+    # SHA-256 over the images in order, same digest as hashing b''.join(images) without the copy
+    h = hashlib.sha256()
+    for image in images:
+        h.update(memoryview(image))
+    return h.digest()
+
+def _invalidating(name: str):
+    method = getattr(list, name)
+
+    def mutate(self, *args, **kwargs):
+        self._joined = None
+        return method(self, *args, **kwargs)
+    mutate.__name__ = name
+    return mutate
+
+class ImageList(list):
+    # List of image bytes with a lazily joined blob. Every list method that changes the
+    # items drops the blob, so it is only held while the images are unchanged and read.
+    def __init__(self, images=()) -> None:
+        super().__init__(images)
+        self._joined = None
+
+    @property
+    def joined(self) -> bytes:
+        if self._joined is None:
+            self._joined = b''.join(self)
+        return self._joined
+
+for _name in ("__setitem__", "__delitem__", "__iadd__", "__imul__", "append", "extend",
+              "insert", "pop", "remove", "clear", "sort", "reverse"):
+    setattr(ImageList, _name, _invalidating(_name))
+del _name
+
+def joined_images(images) -> bytes:
+    if isinstance(images, ImageList):
+        return images.joined
+    return b''.join(images)
 
 def image_byte(image_dir: str):
     with open(image_dir, 'rb') as img_file:
@@ -24,49 +73,290 @@ def image_byte(image_dir: str):
         img_bytes = img_file.read()
     return img_bytes
 
-def encrypt_images(image_dirs, key, iv):
-    # Initialize an empty list to store encrypted image bytes
-    encrypted_images = []
+class ByteLRUCache:
+    # Thread safe LRU bounded by the total size of the cached bytes values
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
 
-    # Iterate through each image directory
-    for img_dir in image_dirs:
-        # Open the image
-        with open(img_dir, 'rb') as img_file:
-            # Read the image file as bytes
-            img_bytes = img_file.read()
+    def put(self, key, value: bytes) -> None:
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._entries[key] = value
+            self.size += len(value)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
 
-        # Pad the image bytes to be a multiple of block size (16 bytes for AES)
-        img_bytes = pad(img_bytes, 16)
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
 
-        # Create a new AES cipher object
-        cipher = AES.new(key, AES.MODE_CBC, iv)
 
-        # Encrypt the image bytes using CBC mode
-        encrypted_img_bytes = cipher.encrypt(img_bytes)
+# Image files read once and encrypted results memoised per (path, mtime, digest of key and iv),
+# the cache never holds the key material itself
+image_read_cache = ByteLRUCache(32 * 1024 * 1024)
+encrypted_image_cache = ByteLRUCache(64 * 1024 * 1024)
 
-        # Append the encrypted image bytes to the list
-        encrypted_images.append(encrypted_img_bytes)
+def secret_digest(key, iv) -> bytes:
+    # length prefixed so (key, iv) pairs with the same concatenation differ
+    key, iv = bytes(key), bytes(iv)
+    return hashlib.sha256(len(key).to_bytes(2, "big") + key + iv).digest()
+
+def map_images(fn, items) -> list:
+    # pycryptodome releases the GIL while encrypting, so the shared pool runs images in parallel.
+    # Called from a task already on that pool (authenticate_async) the images run inline.
+    from models.authentication.authentication import get_executor, on_executor
+    items = list(items)
+    if len(items) <= 1 or on_executor():
+        return [fn(item) for item in items]
+    return list(get_executor().map(fn, items))
+
+def file_version(path: str) -> tuple:
+    stat = os.stat(path)
+    return (path, stat.st_mtime_ns, stat.st_size)
+
+def atomic_write(path: str, data, mode: str = "wb") -> int:
+    # Write data (bytes, str, or a function writing to the open file) to a uniquely named temp
+    # file next to path, fsync it and rename it over path. A crash leaves either the old file or
+    # the new one, and concurrent writers never share a temp file. Returns the bytes written.
+    folder = os.path.dirname(os.path.abspath(path))
+    tmp = tempfile.NamedTemporaryFile(mode, dir=folder, prefix=os.path.basename(path) + ".", suffix=".tmp",
+                                      delete=False, encoding=None if "b" in mode else "utf-8")
+    try:
+        with tmp:
+            if callable(data):
+                data(tmp)
+            else:
+                tmp.write(data)
+            size = tmp.tell()
+            tmp.flush()
+            os.fsync(tmp.fileno())
+        os.replace(tmp.name, path)
+    except BaseException:
+        try:
+            os.remove(tmp.name)
+        except OSError:
+            pass
+        raise
+    _fsync_dir(folder)
+    return size
+
+def _fsync_dir(folder: str) -> None:
+    # makes the rename itself durable, not every platform or filesystem allows it
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    try:
+        fd = os.open(folder, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def read_image_cached(image_dir: str) -> bytes:
+    version = file_version(image_dir)
+    img_bytes = image_read_cache.get(version)
+    if img_bytes is None:
+        img_bytes = image_byte(image_dir)
+        image_read_cache.put(version, img_bytes)
+    return img_bytes
+
+def encrypt_image(img_bytes: bytes, key, iv) -> bytes:
+    # Pad the image bytes to be a multiple of block size (16 bytes for AES)
+    # then encrypt using CBC mode with a fresh cipher object
+    from Crypto.Cipher import AES
+    from Crypto.Util.Padding import pad
+    return AES.new(key, AES.MODE_CBC, iv).encrypt(pad(img_bytes, 16))
+
+def decrypt_image(encrypted_img_bytes: bytes, key, iv) -> bytes:
+    # Decrypt using CBC mode then unpad
+    from Crypto.Cipher import AES
+    from Crypto.Util.Padding import unpad
+    return unpad(AES.new(key, AES.MODE_CBC, iv).decrypt(encrypted_img_bytes), 16)
+
+def encrypt_images(image_dirs, key, iv):
+    def encrypt(img_dir):
+        memo_key = file_version(img_dir) + (secret_digest(key, iv),)
+        encrypted_img_bytes = encrypted_image_cache.get(memo_key)
+        if encrypted_img_bytes is None:
+            encrypted_img_bytes = encrypt_image(read_image_cached(img_dir), key, iv)
+            encrypted_image_cache.put(memo_key, encrypted_img_bytes)
+        return encrypted_img_bytes
 
-    # Return the list of encrypted image bytes
-    return encrypted_images
+    # Return the list of encrypted image bytes, in the order of image_dirs
+    return map_images(encrypt, image_dirs)
 
 def decrypt_images(encrypted_images, key, iv):
-    # Initialize an empty list to store decrypted image bytes
-    decrypted_images = []
+    # Return the list of decrypted image bytes, in the order of encrypted_images
+    return map_images(lambda encrypted_img_bytes: decrypt_image(encrypted_img_bytes, key, iv), encrypted_images)
+
+
+# Chunked streaming encryption for large images, peak memory is one chunk per image.
+# GCM authenticates natively, CBC and CTR get an HMAC-SHA256 over the ciphertext.
+STREAM_CHUNK_SIZE = 64 * 1024
+STREAM_MODES = ("cbc", "ctr", "gcm")
+
+def read_chunks(path: str, chunk_size: int = STREAM_CHUNK_SIZE):
+    with open(path, 'rb') as f:
+        while chunk := f.read(chunk_size):
+            yield chunk
+
+class StreamingImageCipher:
+    def __init__(self, key, iv, mode: str = "gcm", chunk_size: int = STREAM_CHUNK_SIZE) -> None:
+        if mode not in STREAM_MODES:
+            raise ValueError(f"Unsupported stream mode {mode}, expected one of {STREAM_MODES}.")
+        if chunk_size % 16:
+            raise ValueError("Chunk size must be a multiple of the AES block size.")
+        self.key = key
+        self.iv = iv
+        self.mode = mode
+        self.chunk_size = chunk_size
+        self.tag = None
+
+    @property
+    def tag_size(self) -> int:
+        return 16 if self.mode == "gcm" else 32
+
+    def _new_cipher(self):
+        from Crypto.Cipher import AES
+        if self.mode == "cbc":
+            return AES.new(self.key, AES.MODE_CBC, self.iv)
+        if self.mode == "ctr":
+            return AES.new(self.key, AES.MODE_CTR, nonce=self.iv[:8])
+        return AES.new(self.key, AES.MODE_GCM, nonce=self.iv[:12])
+
+    def _new_mac(self):
+        mac_key = hashlib.sha256(bytes(self.key) + b"image-stream-mac").digest()
+        return hmac.new(mac_key, digestmod=hashlib.sha256)
+
+    def encrypt_chunks(self, chunks):
+        # Yields ciphertext as it is produced, self.tag is set once the generator is exhausted
+        cipher = self._new_cipher()
+        mac = None if self.mode == "gcm" else self._new_mac()
+        leftover = b""
+
+        for chunk in chunks:
+            if self.mode == "cbc":
+                # CBC only takes whole blocks, carry the remainder into the next chunk
+                data = leftover + chunk
+                cut = len(data) - len(data) % 16
+                data, leftover = data[:cut], data[cut:]
+            else:
+                data = chunk
+            if data:
+                encrypted = cipher.encrypt(data)
+                if mac:
+                    mac.update(encrypted)
+                yield encrypted
+
+        if self.mode == "cbc":
+            from Crypto.Util.Padding import pad
+            encrypted = cipher.encrypt(pad(leftover, 16))
+            mac.update(encrypted)
+            yield encrypted
+
+        self.tag = cipher.digest() if self.mode == "gcm" else mac.digest()
+
+    def encrypt_file(self, path: str):
+        return self.encrypt_chunks(read_chunks(path, self.chunk_size))
+
+    def decrypt_chunks(self, chunks, tag: bytes):
+        # Yields plaintext as it is produced and raises ValueError at the end if the tag does not match,
+        # callers must not trust the output before the generator finishes
+        cipher = self._new_cipher()
+        mac = None if self.mode == "gcm" else self._new_mac()
+        held = b""
+
+        for chunk in chunks:
+            if mac:
+                mac.update(chunk)
+            if self.mode == "cbc":
+                # keep the last block back, it carries the padding
+                data = held + bytes(chunk)
+                cut = max(0, len(data) - 16)
+                cut -= cut % 16
+                data, held = data[:cut], data[cut:]
+                if data:
+                    yield cipher.decrypt(data)
+            else:
+                yield cipher.decrypt(chunk)
+
+        if self.mode == "cbc":
+            if len(held) != 16:
+                raise ValueError("Ciphertext is not a whole number of blocks.")
+            last = cipher.decrypt(held)
+
+        if self.mode == "gcm":
+            cipher.verify(tag)
+        elif not hmac.compare_digest(mac.digest(), tag):
+            raise ValueError("MAC check failed")
+
+        if self.mode == "cbc":
+            from Crypto.Util.Padding import unpad
+            yield unpad(last, 16)
+
+STREAM_NONCE_SIZE = 16
+
+def stream_nonce(key, iv, index: int, img_dir: str, chunk_size: int = STREAM_CHUNK_SIZE) -> bytes:
+    # Synthetic per image nonce, an HMAC over the position and the image itself. The same image at the
+    # same position still encrypts the same (authentication compares hashes of the ciphertext), any other
+    # image gets its own nonce so a CTR keystream or GCM nonce is never used for two different plaintexts.
+    mac_key = hashlib.sha256(bytes(key) + b"image-stream-nonce").digest()
+    mac = hmac.new(mac_key, bytes(iv) + index.to_bytes(4, "big"), hashlib.sha256)
+    for chunk in read_chunks(img_dir, chunk_size):
+        mac.update(chunk)
+    return mac.digest()[:STREAM_NONCE_SIZE]
 
-    # Iterate through each encrypted image
-    for encrypted_img_bytes in encrypted_images:
-        # Create a new AES cipher object
-        cipher = AES.new(key, AES.MODE_CBC, iv)
+def encrypt_image_stream(img_dir: str, key, iv, index: int = 0, mode: str = "gcm", chunk_size: int = STREAM_CHUNK_SIZE):
+    # Yields the nonce, the ciphertext chunk by chunk and then the tag, peak memory is one chunk
+    nonce = stream_nonce(key, iv, index, img_dir, chunk_size)
+    stream = StreamingImageCipher(key, nonce, mode, chunk_size)
+    yield nonce
+    yield from stream.encrypt_file(img_dir)
+    yield stream.tag
 
-        # Decrypt the image bytes using CBC mode
-        decrypted_img_bytes = cipher.decrypt(encrypted_img_bytes)
+def encrypt_images_stream(image_dirs, key, iv, mode: str = "gcm", chunk_size: int = STREAM_CHUNK_SIZE):
+    # Same shape as encrypt_images, each image is nonce + ciphertext + tag. The picture password strategy
+    # keeps whole images, so this joins each stream, only encrypt_image_stream keeps memory to one chunk.
+    def encrypt(item):
+        index, img_dir = item
+        return b"".join(encrypt_image_stream(img_dir, key, iv, index, mode, chunk_size))
 
-        # Unpad the decrypted image bytes
-        decrypted_img_bytes = unpad(decrypted_img_bytes, 16)
+    return map_images(encrypt, enumerate(image_dirs))
 
-        # Append the decrypted image bytes to the list
-        decrypted_images.append(decrypted_img_bytes)
+def decrypt_images_stream(encrypted_images, key, mode: str = "gcm", chunk_size: int = STREAM_CHUNK_SIZE):
+    def decrypt(encrypted_img_bytes):
+        view = memoryview(encrypted_img_bytes)
+        nonce = bytes(view[:STREAM_NONCE_SIZE])
+        stream = StreamingImageCipher(key, nonce, mode, chunk_size)
+        body, tag = view[STREAM_NONCE_SIZE:-stream.tag_size], bytes(view[-stream.tag_size:])
+        chunks = (body[i:i + chunk_size] for i in range(0, len(body), chunk_size))
+        return b"".join(stream.decrypt_chunks(chunks, tag))
 
-    # Return the list of decrypted image bytes
-    return decrypted_images
\ No newline at end of file
+    return map_images(decrypt, encrypted_images)
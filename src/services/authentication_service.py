@@ -1,31 +1,45 @@
 from typing import Any, List
+from concurrent.futures import Future
 from models.authentication.authentication import CompoundAuthentication, Method
-from models.authentication.authentication_methods import *
+from models.authentication.strategy_registry import strategy_registry
 from services.data_service import Badge
-import time
+from services.rate_limiter import FixedWindowPolicy, RateLimiter
+import threading
 
-class AuthenticationService():
-    def __init__(self, data_service) -> None:
-        self.data_service = data_service
+class SessionState:
+    # Everything one simulation owns, the rest of AuthenticationService can be shared
+    __slots__ = ("id", "strategy", "measure", "at", "register_count", "auth_count", "lock")
+
+    def __init__(self, session_id: str = "default") -> None:
+        self.id = session_id
         self.strategy = CompoundAuthentication()
         self.measure = 0
         self.at = 0
         self.register_count = 0
         self.auth_count = 0
-        self.auth_false_count = 0
-        self.lock_time = 0.0
-        self.LIMIT_COUNT = 5
-        self.LOCK_DURATION = 10
-
-        self.type_to_strategy = {
-            Method.PASSWORD: PasswordStrategy,
-            Method.SECRET_QUESTION: SecurityQuestionStrategy,
-            Method.PICTURE_PASSWORD: PicturePasswordStrategy,
-            Method.FINGERPRINT: FingerPrintStrategy,
-            Method.CHIP_PIN: ChipPinStrategy,
-            Method.TOTP: TOTPStrategy,
-            Method.TWOFA_KEY: TwoFAKeyStrategy
-        }
+        self.lock = threading.RLock()
+
+
+def session_field(name: str) -> property:
+    return property(lambda self: getattr(self.state, name), lambda self, value: setattr(self.state, name, value))
+
+
+class AuthenticationService():
+    strategy = session_field("strategy")
+    measure = session_field("measure")
+    at = session_field("at")
+    register_count = session_field("register_count")
+    auth_count = session_field("auth_count")
+
+    def __init__(self, data_service, rate_limiter: RateLimiter | None = None, session_id: str = "default",
+                 state: SessionState | None = None) -> None:
+        self.data_service = data_service
+        self.state = state or SessionState(session_id)
+        # Lockout is tracked per (session, method), a session manager shares one limiter across sessions.
+        # The limiter is the only record of failed attempts.
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter(FixedWindowPolicy())
+
+        self.type_to_strategy = strategy_registry
 
         self.type_to_string = {
             Method.PASSWORD: "password",
@@ -38,16 +52,26 @@ class AuthenticationService():
         }
 
 
+    @property
+    def session_id(self) -> str:
+        return self.state.id
+
+    @property
+    def state_lock(self) -> threading.RLock:
+        return self.state.lock
+
     def can_simulate(self) -> bool:
         return len(self.strategy) > 0 and (not self.all_registered() or not self.all_authenticated())
     
     def reset(self) -> None:
+        # a new simulation starts without the lockouts of the last one
+        for method in Method:
+            self.rate_limiter.reset((self.session_id, method))
         self.strategy = CompoundAuthentication()
         self.measure = 0
         self.at = 0
         self.register_count = 0
         self.auth_count = 0
-        self.auth_false_count = 0
 
     def get_type(self) -> Method:
         if len(self.strategy) > 0:
@@ -138,33 +162,106 @@ class AuthenticationService():
             return self.data_service.get_simulation_details(self.type_to_string[self.strategy.get_type(self.at)])["authentication"]
 
     def register(self, *data: Any) -> bool:
-        state = self.strategy.register(self.at, *data)
-        if state:
-            if self.at == self.register_count:
-                self.register_count += 1
-            return True
-        return False
+        return self.record_registration(self.at, self.strategy.register(self.at, *data))
+
+    def record_registration(self, at: int, state: bool) -> bool:
+        with self.state_lock:
+            if state:
+                if at == self.register_count:
+                    self.register_count += 1
+                return True
+            return False
+
+    def rate_key(self, at: int | None = None) -> tuple:
+        return (self.session_id, self.strategy.get_type(self.at if at is None else at))
+
+    def retry_after(self) -> float:
+        # Seconds until the current method accepts attempts again, 0 when it is not locked
+        if len(self.strategy) == 0:
+            return 0.0
+        return self.rate_limiter.retry_after(self.rate_key())
+
+    def is_locked(self) -> bool:
+        return self.retry_after() > 0
+
+    def reserve_attempt(self, ignore_limit: bool = False) -> tuple[int, bool]:
+        # (index of the method, granted). The attempt is counted in the limiter before it runs,
+        # attempts already in flight count against the limit until they are settled.
+        with self.state_lock:
+            at = self.at
+            return at, ignore_limit or self.rate_limiter.reserve(self.rate_key(at))
+
+    def release_attempt(self, at: int, ignore_limit: bool = False) -> None:
+        # the attempt raised before it had an outcome
+        if not ignore_limit:
+            self.rate_limiter.release(self.rate_key(at))
+
+    def record_authentication(self, at: int, state: bool, ignore_limit: bool = False) -> int:
+        # Settles the attempt reserved by reserve_attempt
+        if not ignore_limit:
+            self.rate_limiter.settle(self.rate_key(at), state)
+        with self.state_lock:
+            if state:
+                if at == self.auth_count:
+                    self.auth_count += 1
+                return 0
+            return 1
     
     def authenticate(self, *data: Any, ignore_limit: bool = False) -> int:
         # 2 for lock
         # 1 for fail
         # 0 for success
-        if ignore_limit or (self.auth_false_count < self.LIMIT_COUNT):
-            if ignore_limit or (time.time() - self.lock_time >= self.LOCK_DURATION):
-                state = self.strategy.authenticate(self.at, *data)
-                if state:
-                    if self.at == self.auth_count:
-                        self.auth_count += 1
-                    return 0
-                
-                if not ignore_limit:
-                    self.auth_false_count += 1
-                return 1
+        at, granted = self.reserve_attempt(ignore_limit)
+        if not granted:
             return 2
+        try:
+            state = self.strategy.authenticate(at, *data)
+        except Exception:
+            self.release_attempt(at, ignore_limit)
+            raise
+        return self.record_authentication(at, state, ignore_limit)
 
-        self.lock_time = time.time()
-        self.auth_false_count = 0
-        return 2
+    def chain(self, future: Future, on_result, on_error=None) -> Future:
+        # Future resolving to on_result(result of future), errors are passed through after on_error(error)
+        result = Future()
+
+        def done(f: Future) -> None:
+            try:
+                value = f.result()
+            except Exception as e:
+                if on_error is not None:
+                    on_error(e)
+                result.set_exception(e)
+                return
+            try:
+                result.set_result(on_result(value))
+            except Exception as e:
+                result.set_exception(e)
+
+        future.add_done_callback(done)
+        return result
+
+    def register_async(self, *data: Any) -> Future:
+        # Same as register but the strategy (KDF) runs on the shared executor
+        at = self.at
+        return self.chain(self.strategy.register_async(at, *data), lambda state: self.record_registration(at, state))
+
+    def authenticate_async(self, *data: Any, ignore_limit: bool = False) -> Future:
+        # Same lockout rules as authenticate, the returned Future resolves to 0, 1 or 2.
+        # The attempt is reserved when it is submitted, not when it completes.
+        at, granted = self.reserve_attempt(ignore_limit)
+        if not granted:
+            future = Future()
+            future.set_result(2)
+            return future
+
+        try:
+            attempt = self.strategy.authenticate_async(at, *data)
+        except Exception:
+            self.release_attempt(at, ignore_limit)
+            raise
+        return self.chain(attempt, lambda state: self.record_authentication(at, state, ignore_limit),
+                          lambda error: self.release_attempt(at, ignore_limit))
     
     def bypass(self) -> bool:
         if not self.all_authenticated() and self.at == self.auth_count and self.data_service.update_user_coin(-100):
@@ -174,6 +271,15 @@ class AuthenticationService():
             return True
         return False
     
+    def snapshot(self) -> bytes:
+        # imported here, the snapshot codec is not needed at startup
+        from models.authentication.session_snapshot import dump_session
+        return dump_session(self)
+
+    def restore(self, blob: bytes) -> None:
+        from models.authentication.session_snapshot import load_session
+        load_session(self, blob)
+
     def session_store(self, data: dict):
         self.strategy.store(self.at, data)
 
@@ -0,0 +1,147 @@
+import atexit
+import logging
+import threading
+import time
+
+# Background saver for DataService. Mutations only notify, the worker waits until no
+# change arrived for interval seconds (or max_dirty changes piled up) and then writes
+# once, so a burst of updates during a quiz costs a single save off the GUI thread.
+# A failed save is retried with exponential backoff, the worker never dies on one.
+
+logger = logging.getLogger(__name__)
+
+
+class Autosaver:
+    def __init__(self, data_service, interval: float = 2.0, max_dirty: int = 50, clock=time.monotonic,
+                 max_backoff: float = 60.0, report_after: int = 3) -> None:
+        self.data_service = data_service
+        self.interval = interval # debounce, seconds without a change before saving
+        self.max_dirty = max_dirty # save anyway once this many changes are pending
+        self.clock = clock
+        self.max_backoff = max_backoff # longest wait between retries of a failing save
+        self.report_after = report_after # consecutive failures before it is logged as an error
+        self.retry_at = None # clock time of the next retry while backing off
+        self.condition = threading.Condition()
+        self.thread = None
+        self.stopping = False
+        self.dirty = 0
+        self.last_notify = 0.0
+
+        # counters
+        self.notifications = 0
+        self.saves = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.last_error = None
+        self.bytes_written = 0
+        self.last_latency = 0.0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def start(self) -> "Autosaver":
+        self.thread = threading.Thread(target=self.run, name="autosave", daemon=True)
+        self.thread.start()
+        atexit.register(self.stop)
+        return self
+
+    def notify(self) -> None:
+        # Called by the GUI thread on every change, never waits for a save
+        with self.condition:
+            self.dirty += 1
+            self.notifications += 1
+            self.last_notify = self.clock()
+            self.condition.notify()
+
+    def due(self) -> float:
+        # Seconds until a save is due, 0 when it is, caller holds the condition
+        if self.retry_at is not None:
+            return max(0.0, self.retry_at - self.clock())
+        if self.dirty >= self.max_dirty:
+            return 0.0
+        return max(0.0, self.interval - (self.clock() - self.last_notify))
+
+    def wait(self) -> bool:
+        # Blocks until a save is due, False once stopping
+        with self.condition:
+            while not self.stopping and (not self.dirty or self.due() > 0):
+                self.condition.wait(self.due() if self.dirty else None)
+            if self.stopping:
+                return False
+            self.dirty = 0
+            return True
+
+    def run(self) -> None:
+        while self.wait():
+            self.save()
+
+    def backoff(self) -> float:
+        # interval, 2 * interval, 4 * interval ... up to max_backoff
+        return min(self.max_backoff, self.interval * 2 ** (self.consecutive_failures - 1))
+
+    def save(self) -> bool:
+        # One autosave, any error is logged and the save retried after a backoff.
+        # DataService keeps signal_update set when a write fails, the retry writes it again.
+        try:
+            self.flush()
+        except Exception as e:
+            with self.condition:
+                self.failures += 1
+                self.consecutive_failures += 1
+                self.last_error = e
+                self.dirty += 1
+                delay = self.backoff()
+                self.retry_at = self.clock() + delay
+                failures = self.consecutive_failures
+            if failures >= self.report_after:
+                logger.error("Autosave failed %d times in a row, retrying in %.1fs", failures, delay, exc_info=e)
+            else:
+                logger.warning("Autosave failed, retrying in %.1fs: %r", delay, e)
+            return False
+        with self.condition:
+            self.consecutive_failures = 0
+            self.last_error = None
+            self.retry_at = None
+        return True
+
+    def flush(self) -> int:
+        # Save now on the calling thread, returns the bytes written
+        start = time.perf_counter()
+        written = self.data_service.save_data()
+        if not written:
+            return 0
+        latency = time.perf_counter() - start
+        self.saves += 1
+        self.bytes_written += written
+        self.last_latency = latency
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        return written
+
+    def stop(self, flush: bool = True) -> None:
+        # Exit hook, stops the worker then writes whatever is still pending
+        with self.condition:
+            self.stopping = True
+            self.condition.notify()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+            atexit.unregister(self.stop)
+        if flush:
+            with self.condition:
+                self.dirty = 0
+            self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "notifications": self.notifications,
+            "saves": self.saves,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "last_error": repr(self.last_error) if self.last_error is not None else None,
+            # changes folded into an earlier or later save
+            "coalesced": self.notifications - self.saves,
+            "bytes_written": self.bytes_written,
+            "last_latency_ms": self.last_latency * 1000,
+            "mean_latency_ms": self.total_latency / self.saves * 1000 if self.saves else 0.0,
+            "max_latency_ms": self.max_latency * 1000
+        }
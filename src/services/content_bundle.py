@@ -0,0 +1,165 @@
+from typing import Any
+from configuration.app_configuration import Settings
+from models.utils import atomic_write
+import argparse
+import hashlib
+import json
+import marshal
+import mmap
+import os
+import struct
+import sys
+
+# Static content (facts, security questions, quiz bank, help tokens, simulation details)
+# compiled into one file. The JSON is parsed once at build time and stored marshalled,
+# the loader maps the file and unmarshals an entry only when it is asked for.
+#
+#   header    MAGIC, format version (u8), python version (u8, u8), manifest length (u32)
+#   manifest  marshal {"sources": {key: (path, mtime_ns, size, sha256)}, "entries": {key: (offset, length)}}
+#   entries   marshal of each parsed JSON document, offsets are from the end of the manifest
+#
+# marshal output is only stable within one Python version, so that is part of the header.
+# python -m services.content_bundle (from src) builds it, load_bundle() rebuilds it as needed.
+
+MAGIC = b"MFAB"
+VERSION = 1
+HEADER = struct.Struct(">4sBBBI")
+
+
+def content_sources(root: str = "") -> dict[str, str]:
+    # bundle key -> source file, paths are relative to root (the src folder)
+    sources = {
+        "facts": Settings.FACT_FILE_PATH,
+        "security_questions": Settings.SECURITY_QUESTION_FILE_PATH,
+        "quiz_bank": Settings.QUIZ_FILE_PATH + "quiz_bank1.json",
+        "help_token": Settings.HELP_TOKEN_FILE_PATH
+    }
+    try:
+        details = sorted(f for f in os.listdir(root + Settings.SIMULATION_NOTE_PATH) if f.endswith(".json"))
+    except FileNotFoundError:
+        details = []
+    for filename in details:
+        sources[f"simulation/{os.path.splitext(filename)[0]}"] = Settings.SIMULATION_NOTE_PATH + filename
+    return {key: root + path for key, path in sources.items()}
+
+
+def file_hash(path: str) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def build_bundle(path: str, root: str = "") -> dict:
+    # Compile every source that exists into path, returns the manifest
+    sources, blobs = {}, []
+    for key, source in content_sources(root).items():
+        try:
+            with open(source, 'rb') as f:
+                raw = f.read()
+            stat = os.stat(source)
+        except FileNotFoundError:
+            continue
+        sources[key] = (source, stat.st_mtime_ns, stat.st_size, hashlib.sha256(raw).hexdigest())
+        blobs.append((key, marshal.dumps(json.loads(raw))))
+
+    entries, offset = {}, 0
+    for key, blob in blobs:
+        entries[key] = (offset, len(blob))
+        offset += len(blob)
+    manifest = {"sources": sources, "entries": entries}
+    encoded = marshal.dumps(manifest)
+
+    def write(f) -> None:
+        f.write(HEADER.pack(MAGIC, VERSION, *sys.version_info[:2], len(encoded)))
+        f.write(encoded)
+        for _, blob in blobs:
+            f.write(blob)
+
+    # replaced rather than rewritten, a process still mapping the old bundle keeps its copy
+    atomic_write(path, write)
+    return manifest
+
+
+class ContentBundle:
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if len(self.map) < HEADER.size:
+                raise ValueError("Content bundle is truncated.")
+            magic, version, major, minor, length = HEADER.unpack_from(self.map)
+            if magic != MAGIC or version != VERSION or (major, minor) != sys.version_info[:2]:
+                raise ValueError("Content bundle was built by another version.")
+            manifest = marshal.loads(self.map[HEADER.size:HEADER.size + length])
+            self.sources = manifest["sources"]
+            self.entries = manifest["entries"]
+            self.base = HEADER.size + length
+            if any(self.base + offset + size > len(self.map) for offset, size in self.entries.values()):
+                raise ValueError("Content bundle is truncated.")
+        except (ValueError, EOFError, TypeError, KeyError) as e:
+            self.close()
+            raise ValueError(f"Invalid content bundle: {path}") from e
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.entries
+
+    def keys(self) -> list[str]:
+        return list(self.entries)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        # A fresh copy on every call, callers may edit what they get
+        entry = self.entries.get(key)
+        if entry is None:
+            return default
+        offset, size = entry
+        return marshal.loads(self.map[self.base + offset:self.base + offset + size])
+
+    def stale(self, root: str = "") -> bool:
+        # True when a source was added, removed or edited since the build
+        existing = {key for key, path in content_sources(root).items() if os.path.exists(path)}
+        if existing != self.sources.keys():
+            return True
+        for key, (path, mtime_ns, size, digest) in self.sources.items():
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                return True
+            if (stat.st_mtime_ns, stat.st_size) != (mtime_ns, size) and file_hash(path) != digest:
+                return True
+        return False
+
+    def close(self) -> None:
+        self.map.close()
+
+
+def load_bundle(path: str | None = None, root: str = "") -> ContentBundle | None:
+    # The bundle at path, rebuilt first when missing, invalid or stale. None when there
+    # is no source content or the bundle can not be written, callers read the JSON files.
+    path = path or root + Settings.CONTENT_BUNDLE_PATH
+    if not os.path.exists(path):
+        if not any(os.path.exists(source) for source in content_sources(root).values()):
+            return None
+    else:
+        try:
+            bundle = ContentBundle(path)
+        except (OSError, ValueError):
+            bundle = None
+        if bundle is not None:
+            if not bundle.stale(root):
+                return bundle
+            bundle.close()
+
+    try:
+        build_bundle(path, root)
+        return ContentBundle(path)
+    except (OSError, ValueError):
+        return None
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compile the static content into one bundle")
+    parser.add_argument("--output", default=Settings.CONTENT_BUNDLE_PATH)
+    parser.add_argument("--root", default="", help="folder the data paths are relative to")
+    args = parser.parse_args()
+    manifest = build_bundle(args.output, args.root)
+    print(f"{len(manifest['entries'])} entries -> {args.output}")
@@ -1,26 +1,40 @@
+from typing import Any
 from configuration.app_configuration import Settings
 from models.user_preference import *
 from models.user import *
 from models.note import *
+from services.autosave import Autosaver
+from services.content_bundle import load_bundle
+from services.note_index import NoteIndex
+from services.storage import create_storage
+from contextlib import contextmanager
+import copy
 import json
 import os
 import random
+import threading
 
 
 class DataService():
     def __init__(self, message_service) -> None:
         self.message_service = message_service
         self.user_path = Settings.USER_FILE_PATH
+        self.note_index = NoteIndex(Settings.NOTE_FILE_PATH, Settings.NOTE_CACHE_PATH)
+        self.storage = create_storage()
+        self.lock = threading.RLock() # guards the state, held only to copy it for a save
+        self.write_lock = threading.Lock() # one document write at a time, taken before lock
+        self.generation = 0 # copies taken for a save
+        self.written = 0 # newest copy on disk
+        self.autosaver = None
         self.signal_update = False
 
-        if not os.path.exists(self.user_path):
+        data = self.storage.load()
+        if data is None:
             # if not exist initalise the data file
             self.reset_data()
         else:
-            with open(self.user_path, 'r') as f:
-                data = json.load(f)
-                self.user = User.from_json(json.dumps(data["user"]))
-                self.user_preference = UserPreference.from_json(json.dumps(data["user_preference"]))
+            self.user = User.from_dict(data["user"])
+            self.user_preference = UserPreference.from_dict(data["user_preference"])
 
         self.notes = self.read_notes_titles()
         self.cached_quiz_bank = []
@@ -28,21 +42,120 @@ class DataService():
         self.cached_facts = []
         self.cached_details = {}
         self.cache_help_index = dict()
+        self.content = None
+        self.content_loaded = False
 
-    def save_data(self) -> None:
-        if self.signal_update:
-            with open(self.user_path, 'w') as f:
-                json.dump({"user": json.loads(self.user.to_json()), "user_preference": json.loads(self.user_preference.to_json())}, f)
+    def document(self) -> dict:
+        return {"user": self.user.to_dict(), "user_preference": self.user_preference.to_dict()}
+
+    def save_data(self, force: bool = False) -> int:
+        # Write the whole document, returns the bytes written. The state is copied under
+        # the lock and written outside it, change() on the GUI thread never waits for the disk.
+        snapshot = self.snapshot(force)
+        return self.write_snapshot(*snapshot) if snapshot else 0
+
+    def snapshot(self, force: bool = False) -> tuple[int, dict] | None:
+        # (generation, document) when there is something to write
+        with self.lock:
+            if not (self.signal_update or force):
+                return None
+            document = copy.deepcopy(self.document())
+            # nothing is marked clean before the checkpoint went through
+            self.storage.checkpoint()
             self.signal_update = False
+            self.generation += 1
+            return self.generation, document
+
+    def write_snapshot(self, generation: int, document: dict) -> int:
+        with self.write_lock:
+            if generation < self.written:
+                # a newer copy is already on disk
+                return 0
+            try:
+                written = self.storage.write(document)
+            except Exception:
+                with self.lock:
+                    self.signal_update = True
+                raise
+            self.written = generation
+        return written
+
+    @contextmanager
+    def change(self, target: str, *fields: str):
+        # Mutate target inside the block, the change and its journal records happen under
+        # the lock so a save never copies a half-updated object. Yields the list of changed
+        # fields, the block may add to it, nothing is logged when it stays empty.
+        changed = list(fields)
+        with self.lock:
+            yield changed
+            if changed:
+                self.log_fields(target, changed)
+        if changed:
+            self.changed()
+
+    def log_fields(self, target: str, fields: list) -> None:
+        # Log the new value of each changed field, O(change) instead of O(document), caller holds the lock
+        source = self.user if target == "user" else self.user_preference
+        self.signal_update = True
+        for field in fields:
+            self.storage.append(target, field, getattr(source, field))
+
+    def changed(self) -> None:
+        # Called outside the lock, a save may take the write lock
+        if self.autosaver is not None:
+            self.autosaver.notify()
+        elif self.storage.pending() >= Settings.USER_JOURNAL_COMPACT_RECORDS:
+            self.save_data()
+
+    def record(self, target: str, *fields: str) -> None:
+        # For fields already changed by the caller
+        with self.change(target, *fields):
+            pass
+
+    def start_autosave(self) -> Autosaver:
+        # Save from a background thread, stop_autosave() flushes on exit
+        if self.autosaver is None:
+            self.autosaver = Autosaver(self, Settings.AUTOSAVE_INTERVAL,
+                                       min(Settings.AUTOSAVE_MAX_DIRTY, Settings.USER_JOURNAL_COMPACT_RECORDS)).start()
+        return self.autosaver
+
+    def stop_autosave(self) -> None:
+        if self.autosaver is not None:
+            self.autosaver.stop()
+            self.autosaver = None
+        else:
+            self.save_data()
     
     def reset_data(self) -> None:
-        self.user = User()
-        self.user_preference = UserPreference()
-        data = {"user": json.loads(self.user.to_json()), "user_preference": json.loads(self.user_preference.to_json())}
-        with open(self.user_path, 'w') as f:
-            json.dump(data, f)
+        with self.lock:
+            self.user = User()
+            self.user_preference = UserPreference()
+        self.save_data(force=True)
+        self.notes = self.read_notes_titles()
+        self.message_service.send(self, "Reboot")
+
+    def get_profile(self) -> str:
+        return self.storage.profile
+
+    def get_profiles(self) -> list:
+        return self.storage.profiles()
+
+    def change_profile(self, profile: str) -> None:
+        # Only the chosen learner is loaded, a new name starts a fresh profile
+        self.save_data()
+        with self.write_lock, self.lock:
+            self.storage.use(profile)
+            data = self.storage.load()
+            # copies taken before the switch belong to the old profile
+            self.generation += 1
+            self.written = self.generation
+        if data is None:
+            self.reset_data()
+            return
+        with self.lock:
+            self.user = User.from_dict(data["user"])
+            self.user_preference = UserPreference.from_dict(data["user_preference"])
         self.notes = self.read_notes_titles()
-        self.signal_update = False
         self.message_service.send(self, "Reboot")
 
     """
@@ -52,54 +165,60 @@ class DataService():
     """
 
     def update_user_coin(self, value: int) -> bool:
-        if self.user.coins + value >= 0:
-            self.signal_update = True
-            self.user.update_coins(value)
+        with self.change("user") as changed:
+            if self.user.coins + value >= 0:
+                self.user.update_coins(value)
+                changed.append("coins")
+            coins = self.user.coins
 
+        if changed:
             #BADGE CONDITION
-            if self.user.coins >= 1000:
+            if coins >= 1000:
                 self.update_user_badge(Badge.COIN_HUNTER)
             #BADGE END
 
-            self.message_service.send(self, "Update Coins", self.user.coins, value > 0)
+            self.message_service.send(self, "Update Coins", coins, value > 0)
             return True
         else:
-            self.message_service.send(self, "Insufficient Coins", value*-1 - self.user.coins)
+            self.message_service.send(self, "Insufficient Coins", value*-1 - coins)
             return False
 
     def update_user_quiz(self, correct: int) -> None:
-        self.signal_update = True
-        self.user.increase_quiz_count()
-        self.user.add_activity("Quiz Completion", "Great job on completing the quiz! Keep learning.")
+        with self.change("user", "quiz_completed", "recent_activities"):
+            self.user.increase_quiz_count()
+            self.user.add_activity("Quiz Completion", "Great job on completing the quiz! Keep learning.")
         self.update_user_coin(correct*20)
         self.message_service.send(self, "Update Quiz", self.user.quiz_completed)
 
     def update_user_simulation(self) -> None:
-        self.signal_update = True
-        self.user.increase_simulation_count()
-        self.user.add_activity("Simulation Completion", "Well done! You've mastered a simulation. Keep growing.")
+        with self.change("user", "simulation_played", "recent_activities"):
+            self.user.increase_simulation_count()
+            self.user.add_activity("Simulation Completion", "Well done! You've mastered a simulation. Keep growing.")
         self.update_user_coin(100)
         self.message_service.send(self, "Update Simulation", self.user.simulation_played)
 
     def update_user_badge(self, badge: Badge) -> None:
-        if self.user.add_badge(badge):
-            self.signal_update = True
-            count = 1
-            #BADGE CONDITION
-            current, total = self.user.get_badges_count()
-            if current == total-1:
-                if self.user.add_badge(Badge.SECURITY_SAVY): count += 1
-            #BADGE END
-            self.message_service.send(self, "Update Badges", self.user.get_badges_count(), count)
+        with self.change("user") as changed:
+            if self.user.add_badge(badge):
+                count = 1
+                #BADGE CONDITION
+                current, total = self.user.get_badges_count()
+                if current == total-1:
+                    if self.user.add_badge(Badge.SECURITY_SAVY): count += 1
+                #BADGE END
+                changed.append("badges")
+                badges_count = self.user.get_badges_count()
+        if changed:
+            self.message_service.send(self, "Update Badges", badges_count, count)
 
     def update_user_improvement(self, improvements: list[tuple]) -> None:
-        self.signal_update = True
-        self.user.update_improvements(improvements)
+        with self.change("user", "improvements"):
+            self.user.update_improvements(improvements)
         self.message_service.send(self, "Update Improvements", None)
 
     def update_user_reading(self, title: str, state: bool, i: int) -> None:
-        self.signal_update = True
-        self.user.update_reading(title, state, i)
+        with self.change("user", "readings"):
+            self.user.update_reading(title, state, i)
 
         #BADGE CONDITION
         readings = self.user.readings
@@ -112,8 +231,8 @@ class DataService():
         #BADGE END
             
     def unlock_user_simulation(self, method_val: int) -> None:
-        self.signal_update = True
-        self.user.unlock_simulation(method_val)
+        with self.change("user", "unlocked_simulations"):
+            self.user.unlock_simulation(method_val)
 
     def get_user_coins(self) -> int:
         return self.user.coins
@@ -152,22 +271,35 @@ class DataService():
         return self.user_preference.start_up_index
     
     def change_system_start_up(self, index: int) -> None:
-        self.signal_update = True
-        self.user_preference.start_up_index = index
+        with self.change("user_preference", "start_up_index"):
+            self.user_preference.start_up_index = index
 
     def get_custom_quiz_setting_expand(self) -> bool:
         return self.user_preference.custom_quiz_setting_expand
     
     def change_custom_quiz_setting_expand(self, state: bool) -> None:
-        self.signal_update = True
-        self.user_preference.custom_quiz_setting_expand = state
+        with self.change("user_preference", "custom_quiz_setting_expand"):
+            self.user_preference.custom_quiz_setting_expand = state
         self.message_service.send(self, "Update Custom Quiz", state)
 
+    def load_content(self) -> None:
+        # Map the static content bundle, rebuilt first when a source file changed
+        self.content = load_bundle()
+        self.content_loaded = True
+
+    def read_content(self, key: str, path: str) -> Any:
+        # Bundled copy when there is one, the JSON file otherwise
+        if not self.content_loaded:
+            self.load_content()
+        if self.content is not None and key in self.content:
+            return self.content.get(key)
+        with open(path, 'r') as file:
+            return json.load(file)
+
     def get_fun_fact(self) -> str:
         if not self.cached_facts:
             try:
-                with open(Settings.FACT_FILE_PATH, 'r') as file:
-                    self.cached_facts = json.load(file)["facts"]
+                self.cached_facts = self.read_content("facts", Settings.FACT_FILE_PATH)["facts"]
             except FileNotFoundError:
                 return "Where are all the MFA facts :("
         return random.choice(self.cached_facts)
@@ -176,8 +308,8 @@ class DataService():
         return self.user_preference.show_notification
     
     def set_system_show_notification(self, state: bool) -> None:
-        self.signal_update = True
-        self.user_preference.show_notification = state
+        with self.change("user_preference", "show_notification"):
+            self.user_preference.show_notification = state
         self.message_service.send(self, "Update Notification", state)
 
     """
@@ -189,17 +321,15 @@ class DataService():
         if name in self.cached_details:
             return self.cached_details[name]
         try:
-            with open(f'{Settings.SIMULATION_NOTE_PATH}{name}.json', 'r') as file:
-                self.cached_details[name] = json.load(file)
-                return self.cached_details[name]
+            self.cached_details[name] = self.read_content(f"simulation/{name}", f'{Settings.SIMULATION_NOTE_PATH}{name}.json')
+            return self.cached_details[name]
         except FileNotFoundError:
             return {}
 
     def get_security_questions(self) -> list:
         if not self.cached_security_questions:
             try:
-                with open(Settings.SECURITY_QUESTION_FILE_PATH, 'r') as file:
-                    self.cached_security_questions = json.load(file)["security_questions"]
+                self.cached_security_questions = self.read_content("security_questions", Settings.SECURITY_QUESTION_FILE_PATH)["security_questions"]
             except FileNotFoundError:
                 return []
         
@@ -213,27 +343,26 @@ class DataService():
     """
 
     def read_notes_titles(self) -> list:
-        notes = []
-        for filename in os.listdir(Settings.NOTE_FILE_PATH):
-            if filename.endswith('.md'):
-                title = os.path.splitext(filename)[0].replace("_", " ")
-                if not title.isupper():
-                    title = title.title()
-                notes.append(Note(title, ""))
-
-        if len(notes) > len(self.get_user_readings()):
-            readings = []
-            for note in notes:
-                readings.append([note.title, False])
-            self.user.readings = readings
+        notes = [Note(entry.title, "") for entry in self.note_index.build()]
+
+        with self.lock:
+            if len(notes) > len(self.get_user_readings()):
+                readings = []
+                for note in notes:
+                    readings.append([note.title, False])
+                self.user.readings = readings
 
         return notes
     
     def read_note_content(self, index: int) -> str:
-        if self.notes[index].content == "":
-            with open(os.path.join(Settings.NOTE_FILE_PATH, os.listdir(Settings.NOTE_FILE_PATH)[index]), 'r') as file:
-                self.notes[index].content = file.read()
-        return self.notes[index].content
+        note = self.notes[index]
+        if note.content == "":
+            note.html = self.note_index.html(note.title)
+        return note.content
+
+    def warm_notes(self) -> None:
+        # Render every note off the GUI thread so opening one is a lookup
+        self.note_index.start_warming()
     
     def get_notes(self) -> list:
         return self.notes
@@ -247,8 +376,7 @@ class DataService():
 
     def get_quiz_bank(self) -> list:
         if not self.cached_quiz_bank:
-            with open(Settings.QUIZ_FILE_PATH+'quiz_bank1.json', 'r') as f:
-                self.cached_quiz_bank = json.load(f)
+            self.cached_quiz_bank = self.read_content("quiz_bank", Settings.QUIZ_FILE_PATH+'quiz_bank1.json')
         return self.cached_quiz_bank
     
     """
@@ -259,6 +387,5 @@ class DataService():
 
     def get_help_token(self) -> tuple:
         if not self.cache_help_index:
-            with open(Settings.HELP_TOKEN_FILE_PATH, 'r') as f:
-                return (self.cache_help_index, json.load(f))
+            return (self.cache_help_index, self.read_content("help_token", Settings.HELP_TOKEN_FILE_PATH))
         return (self.cache_help_index, None)
\ No newline at end of file
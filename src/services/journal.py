@@ -0,0 +1,100 @@
+from typing import Any, Iterator
+from models.utils import atomic_write
+import json
+import os
+
+# Append-only write-ahead log of user state changes. Every record is one JSON line
+# [target, field, value] holding the new value of a field, so replaying a record twice
+# gives the same state and a crash between compaction and truncation is harmless.
+
+
+def write_json_atomic(path: str, data: Any) -> int:
+    return atomic_write(path, lambda f: json.dump(data, f), mode='w')
+
+
+class Journal:
+    def __init__(self, path: str, fsync: bool = False) -> None:
+        self.path = path
+        self.old_path = f"{path}.old" # records of a document write still in progress
+        self.fsync = fsync # flush survives a process crash, fsync also a power cut
+        self.file = None
+        self.count = 0 # records since the last compaction
+        self.appended = 0
+        self.failed = 0
+
+    def append(self, target: str, field: str, value: Any) -> bool:
+        line = json.dumps([target, field, value], separators=(",", ":")) + "\n"
+        try:
+            if self.file is None:
+                self.file = open(self.path, 'a', encoding="utf-8")
+            self.file.write(line)
+            self.file.flush()
+            if self.fsync:
+                os.fsync(self.file.fileno())
+        except OSError:
+            # the document is still written in full on save
+            self.failed += 1
+            return False
+        self.count += 1
+        self.appended += 1
+        return True
+
+    def records(self) -> Iterator[list]:
+        # The rotated records first, they are older
+        for path in (self.old_path, self.path):
+            if not os.path.isfile(path):
+                continue
+            with open(path, 'r', encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # torn last line from a crash mid append, nothing after it was written
+                        break
+                    self.count += 1
+                    yield record
+
+    def replay(self, data: dict) -> int:
+        # Apply the logged changes onto the loaded document, returns the number applied
+        applied = 0
+        for target, field, value in self.records():
+            data.setdefault(target, {})[field] = value
+            applied += 1
+        return applied
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def rotate(self) -> None:
+        # Called when the document is copied for a write, later records go to a new file
+        # and only the rotated ones are dropped once the write is done
+        self.close()
+        if not os.path.isfile(self.path):
+            return
+        if os.path.isfile(self.old_path):
+            # an earlier write failed, its records are still needed
+            with open(self.path, 'r', encoding="utf-8") as f, open(self.old_path, 'a', encoding="utf-8") as old:
+                old.write(f.read())
+            os.remove(self.path)
+        else:
+            os.replace(self.path, self.old_path)
+        self.count = 0
+
+    def drop(self) -> None:
+        # The rotated records are in the written document
+        try:
+            os.remove(self.old_path)
+        except FileNotFoundError:
+            pass
+
+    def clear(self) -> None:
+        # Called once the document holds every logged change
+        self.close()
+        for path in (self.old_path, self.path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self.count = 0
@@ -0,0 +1,160 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from configuration.app_configuration import Settings
+from models.authentication.authentication import Method
+from models.authentication.key_pool import get_key_pool
+from models.authentication.totp import time_step, totp_code
+from models.utils import encrypt_images
+from services.authentication_service import AuthenticationService
+import argparse
+import json
+import os
+import sys
+import time
+import numpy as np
+
+# Headless load generator, drives register -> authenticate on AuthenticationService
+# for every Method without the Qt UI and reports latency percentiles and throughput.
+# cd src && python -m services.load_generator --iterations 200 --workers 8 --mode thread
+
+METHODS = [method for method in Method if method != Method.NULL]
+PERCENTILES = (50, 90, 95, 99)
+
+
+@lru_cache(maxsize=None)
+def payloads(root: str = "") -> dict:
+    # Sample inputs per process, files are read relative to root (the src folder)
+    picture_path = root + Settings.PICTURE_FILE_PATH
+    pictures = sorted(f for f in os.listdir(picture_path) if f.endswith(('.png', '.jpg', '.jpeg')))[:3]
+    with open(root + Settings.FINGERPRINT_FILE_PATH + "fp1.png", 'rb') as f:
+        fingerprint = f.read()
+    return {
+        "pictures": encrypt_images([picture_path + f for f in pictures], b"k" * 32, b"i" * 16),
+        "fingerprint": fingerprint
+    }
+
+
+def flow_inputs(method: Method, index: int, root: str = "") -> tuple[list[tuple], tuple]:
+    # (register calls, authenticate args) for one scripted user
+    data = payloads(root)
+    if method == Method.PASSWORD:
+        return [(f"user{index}", "password")], (f"user{index}", "password")
+    if method == Method.SECRET_QUESTION:
+        return [(["question 1", "question 2"], "answer")], ("answer",)
+    if method == Method.PICTURE_PASSWORD:
+        return [(data["pictures"],)], (data["pictures"],)
+    if method in (Method.FINGERPRINT, Method.TWOFA_KEY):
+        return [(data["fingerprint"],)], (data["fingerprint"],)
+    if method == Method.CHIP_PIN:
+        return [("1234",)], ("1234",)
+    if method == Method.TOTP:
+        # first call only creates the shared key, the code is computed once it exists
+        return [("",), ("Confirm Key",)], None
+    raise ValueError(f"No scripted flow for {method}")
+
+
+def run_flow(method: Method, index: int, root: str = "") -> tuple[Method, float, float, bool]:
+    # One user: fresh service, register then authenticate, returns (method, register_s, authenticate_s, ok)
+    service = AuthenticationService(data_service=None)
+    service.add(method)
+    registrations, auth_args = flow_inputs(method, index, root)
+
+    start = time.perf_counter()
+    registered = [service.register(*args) for args in registrations][-1]
+    register_s = time.perf_counter() - start
+
+    if method == Method.TOTP:
+        auth_args = (totp_code(service.get_session_stored()["shared_key"], time_step(time.time()))[0],)
+
+    start = time.perf_counter()
+    result = service.authenticate(*auth_args, ignore_limit=True)
+    authenticate_s = time.perf_counter() - start
+    return method, register_s, authenticate_s, registered and result == 0
+
+
+def latency_summary(samples: list[float]) -> dict:
+    if not samples:
+        return {}
+    values = np.array(samples) * 1000
+    summary = {f"p{p}_ms": float(v) for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))}
+    summary["mean_ms"] = float(values.mean())
+    summary["max_ms"] = float(values.max())
+    return summary
+
+
+def init_worker() -> None:
+    # Worker processes generate 2FA keys on threads rather than nesting another process pool
+    get_key_pool().use_processes = False
+
+
+def make_executor(mode: str, workers: int) -> Executor:
+    if mode == "thread":
+        return ThreadPoolExecutor(max_workers=workers, thread_name_prefix="load")
+    if mode == "process":
+        return ProcessPoolExecutor(max_workers=workers, initializer=init_worker)
+    raise ValueError(f"Unknown concurrency mode: {mode}")
+
+
+def run_load(methods: list[Method] = METHODS, iterations: int = 100, workers: int = 4,
+             mode: str = "thread", root: str = "") -> dict:
+    results = {method: {"register": [], "authenticate": [], "ok": 0, "failed": 0} for method in methods}
+
+    start = time.perf_counter()
+    with make_executor(mode, workers) as executor:
+        futures = [executor.submit(run_flow, method, i, root) for method in methods for i in range(iterations)]
+        for future in futures:
+            method, register_s, authenticate_s, ok = future.result()
+            result = results[method]
+            result["register"].append(register_s)
+            result["authenticate"].append(authenticate_s)
+            result["ok" if ok else "failed"] += 1
+    elapsed = time.perf_counter() - start
+
+    return {
+        "mode": mode,
+        "workers": workers,
+        "iterations": iterations,
+        "elapsed_s": elapsed,
+        "flows_per_s": len(methods) * iterations / elapsed if elapsed else 0.0,
+        "methods": {
+            method.name.lower(): {
+                "ok": result["ok"],
+                "failed": result["failed"],
+                "register": latency_summary(result["register"]),
+                "authenticate": latency_summary(result["authenticate"]),
+                # serial throughput of a single flow, comparable across concurrency settings
+                "serial_flows_per_s": len(result["register"]) / (sum(result["register"]) + sum(result["authenticate"]) or 1)
+            } for method, result in results.items()
+        }
+    }
+
+
+def parse_methods(names: list[str]) -> list[Method]:
+    try:
+        return [Method[name.upper()] for name in names]
+    except KeyError as e:
+        raise ValueError(f"Unknown method: {e.args[0].lower()}") from None
+
+
+def main(argv: list[str] | None = None) -> dict:
+    parser = argparse.ArgumentParser(description="Headless register/authenticate load generator")
+    parser.add_argument("--methods", nargs="+", default=[method.name.lower() for method in METHODS])
+    parser.add_argument("--iterations", type=int, default=100, help="flows per method")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--mode", choices=["thread", "process"], default="thread")
+    parser.add_argument("--root", default="", help="folder the data paths are relative to")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = run_load(parse_methods(args.methods), args.iterations, args.workers, args.mode, args.root)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    return report
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+from typing import NamedTuple
+from models.utils import atomic_write
+import hashlib
+import os
+import threading
+import markdown
+
+# Learn section notes. The folder is listed once into a sorted index, note HTML is
+# rendered off the GUI thread and kept in memory and on disk, the disk copy is keyed by
+# a hash of the markdown so an edited note is rendered again and an unchanged one never is.
+# lock guards entries, paths and rendered, markdown runs outside it.
+
+
+class NoteEntry(NamedTuple):
+    title: str
+    path: str
+    mtime_ns: int
+
+
+def note_title(filename: str) -> str:
+    title = os.path.splitext(filename)[0].replace("_", " ")
+    if not title.isupper():
+        title = title.title()
+    return title
+
+
+class NoteIndex:
+    def __init__(self, folder: str, cache_folder: str | None = None) -> None:
+        self.folder = folder
+        self.cache_folder = cache_folder
+        self.lock = threading.RLock() # shared by the GUI thread and the note-warm thread
+        self.listing: list[str] = []
+        self.entries: list[NoteEntry] = []
+        self.paths: dict[str, str] = {} # title -> path
+        self.rendered: dict[str, str] = {} # title -> HTML
+        self.thread = None
+        self.rendered_count = 0 # markdown runs, the rest came from a cache
+
+    def build(self) -> list[NoteEntry]:
+        # Sorted case-insensitively so the order matches the stored readings
+        listing = sorted((f for f in os.listdir(self.folder) if f.endswith('.md')), key=str.lower)
+        if listing == self.listing:
+            # same notes, only edits to pick up
+            self.refresh()
+            with self.lock:
+                return self.entries
+        entries = []
+        for filename in listing:
+            path = os.path.join(self.folder, filename)
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except OSError:
+                mtime_ns = 0
+            entries.append(NoteEntry(note_title(filename), path, mtime_ns))
+        with self.lock:
+            # HTML of notes that are still there unedited is kept
+            previous = {entry.title: entry for entry in self.entries}
+            self.rendered = {entry.title: self.rendered[entry.title] for entry in entries
+                             if entry.title in self.rendered and previous.get(entry.title) == entry}
+            self.listing = listing
+            self.entries = entries
+            self.paths = {entry.title: entry.path for entry in entries}
+        return entries
+
+    def refresh(self) -> None:
+        # Forget the HTML of notes edited since they were indexed
+        with self.lock:
+            for i, entry in enumerate(self.entries):
+                try:
+                    mtime_ns = os.stat(entry.path).st_mtime_ns
+                except OSError:
+                    continue
+                if mtime_ns != entry.mtime_ns:
+                    self.entries[i] = entry._replace(mtime_ns=mtime_ns)
+                    self.rendered.pop(entry.title, None)
+
+    def cache_path(self, text: str) -> str:
+        # markdown's version is part of the key, an upgrade may render differently
+        digest = hashlib.sha256(f"{markdown.__version__}\0{text}".encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_folder, f"{digest}.html")
+
+    def render(self, path: str) -> str:
+        with open(path, 'r', encoding="utf-8") as file:
+            text = file.read()
+        if self.cache_folder is None:
+            with self.lock:
+                self.rendered_count += 1
+            return markdown.markdown(text)
+
+        cache_path = self.cache_path(text)
+        if os.path.isfile(cache_path):
+            with open(cache_path, 'r', encoding="utf-8") as file:
+                return file.read()
+        with self.lock:
+            self.rendered_count += 1
+        html = markdown.markdown(text)
+        try:
+            # mkdir rather than makedirs, the cache only lives next to an existing data folder
+            if not os.path.isdir(self.cache_folder):
+                os.mkdir(self.cache_folder)
+            atomic_write(cache_path, html, mode='w')
+        except OSError:
+            pass
+        return html
+
+    def store(self, title: str, path: str, html: str) -> str:
+        # Keep the HTML only while the title still points at the rendered file
+        with self.lock:
+            if self.paths.get(title) == path:
+                return self.rendered.setdefault(title, html)
+        return html
+
+    def html(self, title: str) -> str:
+        # A dictionary lookup once warmed
+        with self.lock:
+            html = self.rendered.get(title)
+            path = self.paths.get(title)
+        if html is not None:
+            return html
+        if path is None:
+            self.build()
+            with self.lock:
+                path = self.paths[title]
+        return self.store(title, path, self.render(path))
+
+    def warm(self) -> None:
+        self.refresh()
+        with self.lock:
+            pending = [entry for entry in self.entries if entry.title not in self.rendered]
+        for entry in pending:
+            try:
+                self.store(entry.title, entry.path, self.render(entry.path))
+            except OSError:
+                pass
+        self.prune()
+
+    def prune(self) -> None:
+        # Drop cached HTML of notes that were edited or removed
+        if self.cache_folder is None or not os.path.isdir(self.cache_folder):
+            return
+        with self.lock:
+            entries = list(self.entries)
+        keep = set()
+        for entry in entries:
+            try:
+                with open(entry.path, 'r', encoding="utf-8") as file:
+                    keep.add(os.path.basename(self.cache_path(file.read())))
+            except OSError:
+                return
+        for filename in os.listdir(self.cache_folder):
+            if filename.endswith(".html") and filename not in keep:
+                try:
+                    os.remove(os.path.join(self.cache_folder, filename))
+                except OSError:
+                    pass
+
+    def start_warming(self) -> threading.Thread:
+        # Render every note in the background after start up
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self.warm, name="note-warm", daemon=True)
+            self.thread.start()
+        return self.thread
@@ -0,0 +1,292 @@
+from typing import Callable, Hashable
+from collections import deque
+import threading
+import time
+
+# Authentication lockout policies. Every key (session, method) holds one small state
+# object of fixed size, all times come from a monotonic clock so wall clock changes
+# can not lift or extend a lock.
+
+
+class FixedWindowState:
+    __slots__ = ("window_start", "failures", "locked_until", "last_seen")
+
+    def __init__(self, now: float) -> None:
+        self.window_start = now
+        self.failures = 0
+        self.locked_until = 0.0
+        self.last_seen = now
+
+
+class SlidingLogState:
+    __slots__ = ("failures", "locked_until", "last_seen")
+
+    def __init__(self, now: float, limit: int) -> None:
+        self.failures = deque(maxlen=limit) # bounded by the limit
+        self.locked_until = 0.0
+        self.last_seen = now
+
+
+class TokenBucketState:
+    __slots__ = ("tokens", "updated", "last_seen")
+
+    def __init__(self, now: float, capacity: float) -> None:
+        self.tokens = capacity
+        self.updated = now
+        self.last_seen = now
+
+
+class BackoffState:
+    __slots__ = ("failures", "locked_until", "last_seen")
+
+    def __init__(self, now: float) -> None:
+        self.failures = 0
+        self.locked_until = 0.0
+        self.last_seen = now
+
+
+class RateLimitPolicy:
+    def new_state(self, now: float):
+        ...
+
+    def retry_after(self, state, now: float) -> float:
+        # 0 when an attempt may go ahead, otherwise seconds until it may
+        return max(0.0, state.locked_until - now)
+
+    def on_failure(self, state, now: float) -> None:
+        ...
+
+    def allowance(self, state, now: float) -> int:
+        # Failures that may still be recorded before a lock starts
+        ...
+
+    def on_success(self, state, now: float) -> None:
+        pass
+
+    def idle(self, state, now: float) -> bool:
+        # True when the state holds nothing a fresh one would not
+        ...
+
+
+class FixedWindowPolicy(RateLimitPolicy):
+    # limit failures within window seconds locks for lock_duration. The count is kept through
+    # the lock, a failure after it within the same window locks again.
+    def __init__(self, limit: int = 5, window: float = 60.0, lock_duration: float = 10.0) -> None:
+        self.limit = limit
+        self.window = window
+        self.lock_duration = lock_duration
+
+    def new_state(self, now: float) -> FixedWindowState:
+        return FixedWindowState(now)
+
+    def on_failure(self, state: FixedWindowState, now: float) -> None:
+        if now - state.window_start >= self.window:
+            state.window_start = now
+            state.failures = 0
+        state.failures += 1
+        if state.failures >= self.limit:
+            state.locked_until = now + self.lock_duration
+
+    def allowance(self, state: FixedWindowState, now: float) -> int:
+        if now - state.window_start >= self.window:
+            return self.limit
+        return self.limit - state.failures
+
+    def idle(self, state: FixedWindowState, now: float) -> bool:
+        return now >= state.locked_until and (state.failures == 0 or now - state.window_start >= self.window)
+
+
+class SlidingLogPolicy(RateLimitPolicy):
+    # limit failures within any window seconds locks for lock_duration. The log is kept through
+    # the lock, a failure after it locks again while limit failures are still in the window.
+    def __init__(self, limit: int = 5, window: float = 60.0, lock_duration: float = 10.0) -> None:
+        self.limit = limit
+        self.window = window
+        self.lock_duration = lock_duration
+
+    def new_state(self, now: float) -> SlidingLogState:
+        return SlidingLogState(now, self.limit)
+
+    def on_failure(self, state: SlidingLogState, now: float) -> None:
+        failures = state.failures
+        failures.append(now)
+        while failures and now - failures[0] >= self.window:
+            failures.popleft()
+        if len(failures) >= self.limit:
+            state.locked_until = now + self.lock_duration
+
+    def allowance(self, state: SlidingLogState, now: float) -> int:
+        return self.limit - sum(1 for failure in state.failures if now - failure < self.window)
+
+    def idle(self, state: SlidingLogState, now: float) -> bool:
+        return now >= state.locked_until and (not state.failures or now - state.failures[-1] >= self.window)
+
+
+class TokenBucketPolicy(RateLimitPolicy):
+    # each failure spends a token, tokens refill at rate per second up to capacity
+    def __init__(self, capacity: float = 5, rate: float = 0.5) -> None:
+        self.capacity = capacity
+        self.rate = rate
+
+    def new_state(self, now: float) -> TokenBucketState:
+        return TokenBucketState(now, self.capacity)
+
+    def _refill(self, state: TokenBucketState, now: float) -> None:
+        state.tokens = min(self.capacity, state.tokens + (now - state.updated) * self.rate)
+        state.updated = now
+
+    def retry_after(self, state: TokenBucketState, now: float) -> float:
+        self._refill(state, now)
+        return 0.0 if state.tokens >= 1 else (1 - state.tokens) / self.rate
+
+    def on_failure(self, state: TokenBucketState, now: float) -> None:
+        self._refill(state, now)
+        state.tokens = max(0.0, state.tokens - 1)
+
+    def allowance(self, state: TokenBucketState, now: float) -> int:
+        self._refill(state, now)
+        return int(state.tokens)
+
+    def idle(self, state: TokenBucketState, now: float) -> bool:
+        self._refill(state, now)
+        return state.tokens >= self.capacity
+
+
+class ExponentialBackoffPolicy(RateLimitPolicy):
+    # after free failures, each failure locks for base * factor ** n seconds capped at max_delay
+    def __init__(self, free: int = 3, base: float = 1.0, factor: float = 2.0, max_delay: float = 300.0,
+                 reset_after: float = 600.0) -> None:
+        self.free = free
+        self.base = base
+        self.factor = factor
+        self.max_delay = max_delay
+        self.reset_after = reset_after
+
+    def new_state(self, now: float) -> BackoffState:
+        return BackoffState(now)
+
+    def on_failure(self, state: BackoffState, now: float) -> None:
+        if now - state.last_seen >= self.reset_after:
+            state.failures = 0
+        state.failures += 1
+        if state.failures > self.free:
+            delay = min(self.max_delay, self.base * self.factor ** (state.failures - self.free - 1))
+            state.locked_until = now + delay
+
+    def allowance(self, state: BackoffState, now: float) -> int:
+        if now - state.last_seen >= self.reset_after:
+            return self.free
+        return self.free - state.failures
+
+    def on_success(self, state: BackoffState, now: float) -> None:
+        state.failures = 0
+
+    def idle(self, state: BackoffState, now: float) -> bool:
+        return now >= state.locked_until and (state.failures == 0 or now - state.last_seen >= self.reset_after)
+
+
+class RateLimiter:
+    def __init__(self, policy: RateLimitPolicy | None = None, clock: Callable[[], float] = time.monotonic,
+                 sweep_interval: float = 60.0) -> None:
+        self.policy = policy or FixedWindowPolicy()
+        self.clock = clock
+        self.sweep_interval = sweep_interval
+        self._states = {}
+        self._pending = {} # key -> attempts reserved but not settled yet
+        self._lock = threading.Lock()
+        self._last_sweep = clock()
+        self.swept = 0
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def _state(self, key: Hashable, now: float):
+        # caller holds the lock
+        state = self._states.get(key)
+        if state is None:
+            state = self._states[key] = self.policy.new_state(now)
+        return state
+
+    def retry_after(self, key: Hashable) -> float:
+        now = self.clock()
+        with self._lock:
+            state = self._states.get(key)
+            return 0.0 if state is None else self.policy.retry_after(state, now)
+
+    def is_locked(self, key: Hashable) -> bool:
+        return self.retry_after(key) > 0
+
+    def record(self, key: Hashable, success: bool) -> float:
+        # Returns the retry after that now applies to key
+        now = self.clock()
+        with self._lock:
+            state = self._state(key, now)
+            if success:
+                self.policy.on_success(state, now)
+            else:
+                self.policy.on_failure(state, now)
+            state.last_seen = now
+            retry_after = self.policy.retry_after(state, now)
+        self.maybe_sweep(now)
+        return retry_after
+
+    def reserve(self, key: Hashable) -> bool:
+        # Claim an attempt before it runs, False when key is locked or the attempts already
+        # in flight could use up what is left before a lock. In flight attempts count as
+        # failures until they end, so concurrent attempts can not get past the limit.
+        # A granted attempt ends with settle() or release().
+        now = self.clock()
+        with self._lock:
+            state = self._state(key, now)
+            if self.policy.retry_after(state, now) > 0:
+                return False
+            pending = self._pending.get(key, 0)
+            # one attempt is always allowed once a lock is over, it may start the next one
+            if pending >= max(1, self.policy.allowance(state, now)):
+                return False
+            self._pending[key] = pending + 1
+            return True
+
+    def release(self, key: Hashable) -> None:
+        # Give a reserved attempt back without recording it (the attempt itself failed to run)
+        with self._lock:
+            pending = self._pending.get(key, 0) - 1
+            if pending > 0:
+                self._pending[key] = pending
+            else:
+                self._pending.pop(key, None)
+
+    def settle(self, key: Hashable, success: bool) -> float:
+        # Record the outcome of a reserved attempt
+        self.release(key)
+        return self.record(key, success)
+
+    def pending(self, key: Hashable) -> int:
+        with self._lock:
+            return self._pending.get(key, 0)
+
+    def reset(self, key: Hashable | None = None) -> None:
+        with self._lock:
+            if key is None:
+                self._states.clear()
+                self._pending.clear()
+            else:
+                self._states.pop(key, None)
+                self._pending.pop(key, None)
+
+    def sweep(self, now: float | None = None) -> int:
+        # Drop keys that are back to their initial state, memory follows active keys only
+        now = self.clock() if now is None else now
+        with self._lock:
+            idle = [key for key, state in self._states.items() if key not in self._pending and self.policy.idle(state, now)]
+            for key in idle:
+                del self._states[key]
+            self._last_sweep = now
+            self.swept += len(idle)
+        return len(idle)
+
+    def maybe_sweep(self, now: float | None = None) -> int:
+        now = self.clock() if now is None else now
+        if now - self._last_sweep >= self.sweep_interval:
+            return self.sweep(now)
+        return 0
@@ -0,0 +1,169 @@
+from typing import Any, Iterator
+from contextlib import contextmanager
+from services.authentication_service import AuthenticationService, SessionState
+from services.rate_limiter import FixedWindowPolicy, RateLimiter
+import secrets
+import threading
+import time
+
+# Many independent simulations per process. A session is a slim record (chain, cursor,
+# counts, its own lock), the service that runs an operation on it is a short lived view
+# over the shared data service and rate limiter. The table lock is only held to look
+# sessions up, add or remove them, so sessions run concurrently from worker threads.
+
+
+class Session:
+    __slots__ = ("state", "created", "last_access")
+
+    def __init__(self, session_id: str) -> None:
+        self.state = SessionState(session_id)
+        self.created = time.monotonic()
+        self.last_access = self.created
+
+    @property
+    def id(self) -> str:
+        return self.state.id
+
+    @property
+    def lock(self) -> threading.RLock:
+        return self.state.lock
+
+    def summary(self, rate_limiter: RateLimiter) -> dict:
+        # caller holds the session lock
+        state = self.state
+        if len(state.strategy):
+            lock_remaining = rate_limiter.retry_after((state.id, state.strategy.get_type(state.at)))
+        else:
+            lock_remaining = 0.0
+        return {
+            "session_id": state.id,
+            "methods": [method.name.lower() for method in state.strategy.get_all_types()],
+            "at": state.at,
+            "register_count": state.register_count,
+            "auth_count": state.auth_count,
+            "locked": lock_remaining > 0,
+            "lock_remaining": lock_remaining,
+            "idle": time.monotonic() - self.last_access
+        }
+
+
+class SerialDataService:
+    # Sessions on worker threads share one DataService, its calls run one at a time
+    def __init__(self, data_service) -> None:
+        self.data_service = data_service
+        self.lock = threading.RLock()
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self.data_service, name)
+        if not callable(attribute):
+            return attribute
+
+        def call(*args: Any, **kwargs: Any) -> Any:
+            with self.lock:
+                return attribute(*args, **kwargs)
+        return call
+
+
+class SessionManager:
+    def __init__(self, data_service, ttl: float = 900.0, sweep_interval: float = 60.0,
+                 rate_limiter: RateLimiter | None = None) -> None:
+        self.data_service = SerialDataService(data_service)
+        # one limiter for every session, keyed by (session id, method)
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter(FixedWindowPolicy(), sweep_interval=sweep_interval)
+        self.ttl = ttl # idle seconds before a session is evicted
+        self.sweep_interval = sweep_interval
+        self._sessions: dict[str, Session] = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+        self.created = 0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def create(self) -> str:
+        self.maybe_sweep()
+        session_id = secrets.token_urlsafe(16)
+        session = Session(session_id)
+        with self._lock:
+            self._sessions[session.id] = session
+            self.created += 1
+        return session.id
+
+    def close(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def _get(self, session_id: str) -> Session:
+        with self._lock:
+            session = self._sessions.get(session_id)
+        if session is None:
+            raise KeyError(f"Unknown or expired session: {session_id}")
+        return session
+
+    def service(self, session: Session) -> AuthenticationService:
+        return AuthenticationService(self.data_service, self.rate_limiter, state=session.state)
+
+    @contextmanager
+    def session(self, session_id: str) -> Iterator[AuthenticationService]:
+        # Exclusive use of one session, other sessions are not blocked
+        session = self._get(session_id)
+        with session.lock:
+            if session_id not in self._sessions:
+                # evicted between the lookup and taking the lock
+                raise KeyError(f"Unknown or expired session: {session_id}")
+            session.last_access = time.monotonic()
+            yield self.service(session)
+            session.last_access = time.monotonic()
+
+    def add(self, session_id: str, type) -> bool:
+        with self.session(session_id) as service:
+            return service.add(type)
+
+    def register(self, session_id: str, *data: Any) -> bool:
+        with self.session(session_id) as service:
+            return service.register(*data)
+
+    def authenticate(self, session_id: str, *data: Any, ignore_limit: bool = False) -> int:
+        with self.session(session_id) as service:
+            return service.authenticate(*data, ignore_limit=ignore_limit)
+
+    def state(self, session_id: str) -> dict:
+        session = self._get(session_id)
+        with session.lock:
+            return session.summary(self.rate_limiter)
+
+    def states(self) -> list[dict]:
+        with self._lock:
+            sessions = list(self._sessions.values())
+        states = []
+        for session in sessions:
+            with session.lock:
+                states.append(session.summary(self.rate_limiter))
+        return states
+
+    def evict_idle(self, now: float | None = None) -> int:
+        # Drop sessions idle for longer than ttl, sessions in use are skipped
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            expired = [session for session in self._sessions.values() if now - session.last_access > self.ttl]
+            count = 0
+            for session in expired:
+                if session.lock.acquire(blocking=False):
+                    try:
+                        del self._sessions[session.id]
+                        count += 1
+                    finally:
+                        session.lock.release()
+            self.evicted += count
+            self._last_sweep = now
+        return count
+
+    def maybe_sweep(self) -> int:
+        if time.monotonic() - self._last_sweep >= self.sweep_interval:
+            self.rate_limiter.sweep()
+            return self.evict_idle()
+        return 0
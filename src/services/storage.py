@@ -0,0 +1,266 @@
+from typing import Any
+from configuration.app_configuration import Settings
+from datetime import datetime
+from models.user import ACTIVITY_DATE_FORMAT
+from services.journal import Journal, write_json_atomic
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Where DataService keeps the user document. A backend loads one profile as
+# {"user": {...}, "user_preference": {...}}, applies single field changes as they happen
+# and writes the whole profile on save.
+
+DEFAULT_PROFILE = "default"
+
+
+class StorageBackend:
+    profile = DEFAULT_PROFILE
+
+    def load(self) -> dict | None:
+        # Document of the active profile, None when it does not exist yet
+        ...
+
+    def checkpoint(self) -> None:
+        # The document was just copied for a write, changes from here on are not in it
+        pass
+
+    def write(self, document: dict) -> int:
+        # Store the whole document, returns the bytes written
+        ...
+
+    def append(self, target: str, field: str, value: Any) -> bool:
+        # Store one changed field
+        ...
+
+    def pending(self) -> int:
+        # Changes stored since the last write that a write would fold in
+        return 0
+
+    def profiles(self) -> list[str]:
+        return [self.profile]
+
+    def use(self, profile: str) -> None:
+        if profile != self.profile:
+            raise ValueError(f"{type(self).__name__} holds a single profile.")
+
+    def close(self) -> None:
+        pass
+
+
+class JsonStorage(StorageBackend):
+    # One JSON document plus an append-only journal of the changes since it was written
+    def __init__(self, path: str, journal_path: str, fsync: bool = False) -> None:
+        self.path = path
+        self.fsync = fsync
+        self.journal = Journal(journal_path, fsync)
+        self.checkpointed = False
+
+    def load(self) -> dict | None:
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, 'r') as f:
+            data = json.load(f)
+        # changes made after the last save, e.g. before a crash
+        if self.journal.replay(data):
+            self.write(data)
+        return data
+
+    def checkpoint(self) -> None:
+        self.journal.rotate()
+        self.checkpointed = True
+
+    def write(self, document: dict) -> int:
+        # Compaction, the whole document replaces the journal up to the checkpoint
+        written = write_json_atomic(self.path, document)
+        if self.checkpointed:
+            self.journal.drop()
+            self.checkpointed = False
+        else:
+            self.journal.clear()
+        return written
+
+    def append(self, target: str, field: str, value: Any) -> bool:
+        return self.journal.append(target, field, value)
+
+    def pending(self) -> int:
+        return self.journal.count
+
+    def close(self) -> None:
+        self.journal.close()
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    coins INTEGER NOT NULL,
+    quiz_completed INTEGER NOT NULL,
+    simulation_played INTEGER NOT NULL,
+    unlocked_simulations TEXT NOT NULL,
+    start_up_index INTEGER NOT NULL,
+    custom_quiz_setting_expand INTEGER NOT NULL,
+    show_notification INTEGER NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS activities (
+    profile_id INTEGER NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    occurred REAL NOT NULL,
+    title TEXT NOT NULL,
+    date TEXT NOT NULL,
+    description TEXT NOT NULL,
+    PRIMARY KEY (profile_id, position)
+);
+-- activity reports by time range
+CREATE INDEX IF NOT EXISTS activities_time ON activities (profile_id, occurred);
+CREATE TABLE IF NOT EXISTS badges (
+    profile_id INTEGER NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    badge INTEGER NOT NULL,
+    icon TEXT NOT NULL,
+    PRIMARY KEY (profile_id, position)
+);
+CREATE TABLE IF NOT EXISTS improvements (
+    profile_id INTEGER NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    category TEXT NOT NULL,
+    difference INTEGER NOT NULL,
+    PRIMARY KEY (profile_id, position)
+);
+CREATE TABLE IF NOT EXISTS readings (
+    profile_id INTEGER NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    done INTEGER NOT NULL,
+    PRIMARY KEY (profile_id, position)
+);
+"""
+
+# document field -> profiles column, the values are bound so the statements are reused
+USER_COLUMNS = ("coins", "quiz_completed", "simulation_played", "unlocked_simulations")
+PREFERENCE_COLUMNS = ("start_up_index", "custom_quiz_setting_expand", "show_notification")
+UPDATE_COLUMN = {column: f"UPDATE profiles SET {column} = ?, updated = ? WHERE id = ?"
+                 for column in USER_COLUMNS + PREFERENCE_COLUMNS}
+
+# document field -> (table, columns after profile_id and position)
+LIST_TABLES = {
+    "recent_activities": ("activities", ("occurred", "title", "date", "description")),
+    "badges": ("badges", ("badge", "icon")),
+    "improvements": ("improvements", ("category", "difference")),
+    "readings": ("readings", ("title", "done"))
+}
+DELETE_ROWS = {field: f"DELETE FROM {table} WHERE profile_id = ?" for field, (table, _) in LIST_TABLES.items()}
+INSERT_ROWS = {field: f"INSERT INTO {table} (profile_id, position, {', '.join(columns)}) VALUES ({', '.join('?' * (len(columns) + 2))})"
+               for field, (table, columns) in LIST_TABLES.items()}
+SELECT_ROWS = {field: f"SELECT {', '.join(columns)} FROM {table} WHERE profile_id = ? ORDER BY position"
+               for field, (table, columns) in LIST_TABLES.items()}
+
+SELECT_PROFILE = f"SELECT id, {', '.join(USER_COLUMNS + PREFERENCE_COLUMNS)} FROM profiles WHERE name = ?"
+UPSERT_PROFILE = f"""INSERT INTO profiles (name, {', '.join(USER_COLUMNS + PREFERENCE_COLUMNS)}, updated)
+    VALUES ({', '.join('?' * (len(USER_COLUMNS) + len(PREFERENCE_COLUMNS) + 2))})
+    ON CONFLICT (name) DO UPDATE SET {', '.join(f'{c} = excluded.{c}' for c in USER_COLUMNS + PREFERENCE_COLUMNS)}, updated = excluded.updated
+    RETURNING id"""
+
+
+def activity_time(date: str) -> float:
+    # Activity dates are stored as display text, the table also keeps them sortable
+    try:
+        return datetime.strptime(date, ACTIVITY_DATE_FORMAT).timestamp()
+    except ValueError:
+        return 0.0
+
+
+class SqliteStorage(StorageBackend):
+    # Profiles in one SQLite database, only the active profile is read
+    def __init__(self, path: str, profile: str = DEFAULT_PROFILE, fsync: bool = False) -> None:
+        self.path = path
+        self.profile = profile
+        self.profile_id = None
+        # DataService serialises access, the autosave thread writes through the same connection
+        self.connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute(f"PRAGMA synchronous = {'FULL' if fsync else 'NORMAL'}")
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.executescript(SCHEMA)
+
+    def rows(self, field: str, value: list) -> list[tuple]:
+        if field == "recent_activities":
+            return [(self.profile_id, i, activity_time(date), title, date, description)
+                    for i, (title, date, description) in enumerate(value)]
+        return [(self.profile_id, i, *item) for i, item in enumerate(value)]
+
+    def column(self, field: str, value: Any) -> Any:
+        return json.dumps(value) if field == "unlocked_simulations" else value
+
+    def load(self) -> dict | None:
+        with self.lock:
+            row = self.connection.execute(SELECT_PROFILE, (self.profile,)).fetchone()
+            if row is None:
+                self.profile_id = None
+                return None
+            self.profile_id = row[0]
+            user = dict(zip(USER_COLUMNS, row[1:1 + len(USER_COLUMNS)]))
+            user["unlocked_simulations"] = json.loads(user["unlocked_simulations"])
+            preference = dict(zip(PREFERENCE_COLUMNS, row[1 + len(USER_COLUMNS):]))
+            for field in ("custom_quiz_setting_expand", "show_notification"):
+                preference[field] = bool(preference[field])
+            for field, query in SELECT_ROWS.items():
+                rows = self.connection.execute(query, (self.profile_id,)).fetchall()
+                if field == "recent_activities":
+                    rows = [list(row[1:]) for row in rows]
+                elif field == "readings":
+                    rows = [[title, bool(done)] for title, done in rows]
+                user[field] = [list(row) for row in rows]
+        return {"user": user, "user_preference": preference}
+
+    def write(self, document: dict) -> int:
+        user, preference = document["user"], document["user_preference"]
+        values = [self.column(c, user[c]) for c in USER_COLUMNS] + [preference[c] for c in PREFERENCE_COLUMNS]
+        with self.lock, self.connection:
+            self.connection.execute("BEGIN")
+            self.profile_id = self.connection.execute(UPSERT_PROFILE, (self.profile, *values, time.time())).fetchone()[0]
+            for field in LIST_TABLES:
+                self.replace_rows(field, user.get(field, []))
+        # payload size, SQLite decides the bytes that reach the disk
+        return len(json.dumps(document))
+
+    def replace_rows(self, field: str, value: list) -> None:
+        self.connection.execute(DELETE_ROWS[field], (self.profile_id,))
+        self.connection.executemany(INSERT_ROWS[field], self.rows(field, value))
+
+    def append(self, target: str, field: str, value: Any) -> bool:
+        if self.profile_id is None:
+            return False
+        with self.lock:
+            if field in UPDATE_COLUMN:
+                self.connection.execute(UPDATE_COLUMN[field], (self.column(field, value), time.time(), self.profile_id))
+            elif field in LIST_TABLES:
+                with self.connection:
+                    self.connection.execute("BEGIN")
+                    self.replace_rows(field, value)
+            else:
+                return False
+        return True
+
+    def profiles(self) -> list[str]:
+        with self.lock:
+            return [name for name, in self.connection.execute("SELECT name FROM profiles ORDER BY name")]
+
+    def use(self, profile: str) -> None:
+        self.profile = profile
+        self.profile_id = None
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+def create_storage() -> StorageBackend:
+    if Settings.USER_STORAGE == "sqlite":
+        return SqliteStorage(Settings.USER_DATABASE_PATH, Settings.USER_PROFILE, Settings.USER_JOURNAL_FSYNC)
+    if Settings.USER_STORAGE == "json":
+        return JsonStorage(Settings.USER_FILE_PATH, Settings.USER_JOURNAL_PATH, Settings.USER_JOURNAL_FSYNC)
+    raise ValueError(f"Unknown user storage: {Settings.USER_STORAGE}")
@@ -1,5 +1,6 @@
 from PyQt5.QtCore import QObject, pyqtSignal
 from services.container import ApplicationContainer
+import math
 
 class AuthenticationBaseViewModel(QObject):
     state_change = pyqtSignal(str, int)
@@ -8,4 +9,7 @@ class AuthenticationBaseViewModel(QObject):
     def __init__(self) -> None:
         super().__init__()
         self.authentication_service = ApplicationContainer.authentication_service()
-        self.message_service = ApplicationContainer.message_service()
\ No newline at end of file
+        self.message_service = ApplicationContainer.message_service()
+
+    def lock_message(self) -> str:
+        return f"Locked for {math.ceil(self.authentication_service.retry_after())} seconds."
@@ -92,7 +92,7 @@ class ChipPinAuthenticateViewModel(AuthenticationBaseViewModel):
             self.state_change.emit("Incorrect PIN entered", flag)
             self.state_data_change.emit(self.state_data(False), flag)
         elif flag == 2:
-            self.state_change.emit("Locked for 10 seconds.", flag)
+            self.state_change.emit(self.lock_message(), flag)
             self.state_data_change.emit(self.state_data(False), flag)
 
     def bypass(self) -> None:
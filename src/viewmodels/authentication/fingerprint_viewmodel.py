@@ -98,7 +98,7 @@ class FingerprintAuthenticateViewModel(AuthenticationBaseViewModel):
         elif flag == 1:
             self.state_change.emit("Your credentials does not match our records.", flag)
         elif flag == 2:
-            self.state_change.emit("Locked for 10 seconds.", flag)
+            self.state_change.emit(self.lock_message(), flag)
             
         self.state_data_change.emit(self.state_data(True), flag)
 
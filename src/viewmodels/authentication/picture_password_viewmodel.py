@@ -2,7 +2,7 @@ from viewmodels.authentication.authentication_base import *
 from PyQt5.QtWidgets import QWidget
 import os
 import random
-from models.utils import encrypt_images, byte_str
+from models.utils import encrypt_images, encrypt_images_stream, byte_str, joined_images
 from configuration.app_configuration import Settings
 
 
@@ -19,6 +19,7 @@ class PicturePasswordRegisterViewModel(AuthenticationBaseViewModel):
         self.display_details = self.authentication_service.get_display_details()
 
         self.MAX_SELECT_COUNT = 7
+        self.stream_cipher = Settings.PICTURE_STREAM_CIPHER
 
         self.selected_images = []
         self.viewed_images = []
@@ -63,9 +64,14 @@ class PicturePasswordRegisterViewModel(AuthenticationBaseViewModel):
         self.security_measure_changed.emit(0)
         self.reset_selection_signal.emit()
 
+    def encrypt_selected(self, key: bytes, iv: bytes) -> list:
+        if self.stream_cipher:
+            return encrypt_images_stream(self.selected_images, key, iv, self.stream_cipher)
+        return encrypt_images(self.selected_images, key, iv)
+
     def state_data(self) -> dict:
         data = self.authentication_service.get_session_stored().copy()
-        data["user_images"] = byte_str(b''.join(data["user_images"]))
+        data["user_images"] = byte_str(joined_images(data["user_images"]))
         data["hashed_secret"] = byte_str(data["hashed_secret"])
         data["encryption_key"] = byte_str(data["encryption_key"])
         data["iv"] = byte_str(data["iv"])
@@ -77,7 +83,7 @@ class PicturePasswordRegisterViewModel(AuthenticationBaseViewModel):
         else:
             key = os.urandom(32)
             iv = os.urandom(16)
-            images_byte = encrypt_images(self.selected_images, key, iv)
+            images_byte = self.encrypt_selected(key, iv)
 
             if self.authentication_service.register(images_byte):
                 self.authentication_service.session_store({"encryption_key": key, "iv": iv})
@@ -110,7 +116,7 @@ class PicturePasswordAuthenticateViewModel(PicturePasswordRegisterViewModel):
 
         data["hashed_secret"] = byte_str(data["hashed_secret"])
         if is_checked:
-            data["images"] = byte_str(b''.join(data["images"]))
+            data["images"] = byte_str(joined_images(data["images"]))
             data["nonce"] = byte_str(data["nonce"])
             data["signed_challenge"] = byte_str(data["signed_challenge"])
             data["expected_response"] = byte_str(data["expected_response"])
@@ -121,7 +127,7 @@ class PicturePasswordAuthenticateViewModel(PicturePasswordRegisterViewModel):
         data = self.authentication_service.get_session_stored()
         encryption_key = data["encryption_key"]
         iv = data["iv"]
-        images_byte = encrypt_images(self.selected_images, encryption_key, iv)
+        images_byte = self.encrypt_selected(encryption_key, iv)
 
         flag = self.authentication_service.authenticate(images_byte)
         if not flag:
@@ -130,7 +136,7 @@ class PicturePasswordAuthenticateViewModel(PicturePasswordRegisterViewModel):
         elif flag == 1:
             self.state_change.emit("These credentials does not match our records.", flag)
         elif flag == 2:
-            self.state_change.emit("Locked for 10 seconds.", flag)
+            self.state_change.emit(self.lock_message(), flag)
 
         self.state_data_change.emit(self.state_data(True), flag)
     
@@ -101,7 +101,7 @@ class SecurityQuestionAuthenticateViewModel(AuthenticationBaseViewModel):
         elif flag == 1:
             self.state_change.emit("These credentials does not match our records.", flag)
         elif flag == 2:
-            self.state_change.emit("Locked for 10 seconds.", flag)
+            self.state_change.emit(self.lock_message(), flag)
         
         self.state_data_change.emit(self.state_data(), flag)
         self.answer_key = ""
@@ -148,7 +148,7 @@ class TOTPAuthenticateViewModel(AuthenticationBaseViewModel):
             self.clear_code_signal.emit()
             self.state_change.emit("The TOTP does not match.", flag)
         elif flag == 2:
-            self.state_change.emit("Locked for 10 seconds.", flag)
+            self.state_change.emit(self.lock_message(), flag)
         
         self.state_data_change.emit(self.state_data(), flag)
 
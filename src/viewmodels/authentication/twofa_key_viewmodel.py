@@ -8,6 +8,7 @@ class TwoFAKeyRegisterViewModel(AuthenticationBaseViewModel):
     key_state_changed = pyqtSignal()
     allow_fingerprint = pyqtSignal(bool)
     fingerprint_progress = pyqtSignal(str)
+    registration_done = pyqtSignal(str, bool)
 
     def __init__(self) -> None:
         super().__init__()
@@ -18,6 +19,8 @@ class TwoFAKeyRegisterViewModel(AuthenticationBaseViewModel):
         self.progress = 0
         self.prev_finger = "fp3"
         self.current_finger = ""
+        # emitted from a worker thread, delivered to on_registered on the GUI thread
+        self.registration_done.connect(self.on_registered)
     
     def on_finger_changed(self, button, checked) -> None:
         if checked:
@@ -60,9 +63,13 @@ class TwoFAKeyRegisterViewModel(AuthenticationBaseViewModel):
         return data
 
     def send(self, key_name: str, fingerprint: str) -> None:
+        # The key pair comes from the key pool asynchronously, the GUI never waits on its generation
         fingerprint_data = image_byte(fingerprint)
+        future = self.authentication_service.register_async(fingerprint_data)
+        future.add_done_callback(lambda f: self.registration_done.emit(key_name, f.exception() is None and bool(f.result())))
 
-        if self.authentication_service.register(fingerprint_data):
+    def on_registered(self, key_name: str, registered: bool) -> None:
+        if registered:
             self.key_on = False
             self.authentication_service.session_store({"key_name":key_name})
             self.state_change.emit("Registration Completed", 0)
@@ -125,7 +132,7 @@ class TwoFAKeyAuthenticateViewModel(AuthenticationBaseViewModel):
                 self.state_change.emit("Your credentials do not match our record.", flag)
                 self.state_data_change.emit(self.state_data(False), flag)
             elif flag == 2:
-                self.state_change.emit("Locked for 10 seconds.", flag)
+                self.state_change.emit(self.lock_message(), flag)
                 self.state_data_change.emit(self.state_data(False), flag)
 
     
@@ -0,0 +1,66 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+from services.content_bundle import ContentBundle, build_bundle, content_sources, load_bundle
+
+# Cold start content access, per file JSON reads against the mapped bundle
+# python -m tests.benchmarks.bench_content_bundle --rounds 200
+
+ROOT = "src/"
+
+
+def read_json_files(sources: dict) -> dict:
+    content = {}
+    for key, path in sources.items():
+        with open(path, 'r') as f:
+            content[key] = json.load(f)
+    return content
+
+
+def read_bundle(path: str) -> dict:
+    # startup check (stat every source) + map + every entry
+    bundle = load_bundle(path, ROOT)
+    content = {key: bundle.get(key) for key in bundle.keys()}
+    bundle.close()
+    return content
+
+
+def first_lookup(path: str) -> None:
+    # what the first screen pays, one entry rather than all of them
+    bundle = ContentBundle(path)
+    bundle.get("facts")
+    bundle.close()
+
+
+def timed(fn, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def run(rounds: int) -> dict:
+    sources = content_sources(ROOT)
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "content.bundle")
+        build_ms = timed(lambda: build_bundle(path, ROOT), 1)
+        assert read_bundle(path) == read_json_files(sources)
+        return {
+            "sources": len(sources),
+            "bundle_bytes": os.path.getsize(path),
+            "json_bytes": sum(os.path.getsize(p) for p in sources.values()),
+            "build_ms": build_ms,
+            "json_all_ms": timed(lambda: read_json_files(sources), rounds),
+            "bundle_all_ms": timed(lambda: read_bundle(path), rounds),
+            "json_first_ms": timed(lambda: read_json_files({"facts": sources["facts"]}), rounds),
+            "bundle_first_ms": timed(lambda: first_lookup(path), rounds)
+        }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+    print(json.dumps(run(args.rounds)))
@@ -0,0 +1,44 @@
+import argparse
+import hashlib
+import json
+import random
+import secrets
+import time
+import uuid
+from models.authentication.emv import EmvTransactionEngine, transaction_data
+
+# Per transaction prefix rebuild (what ChipPinStrategy used to do) against EmvTransactionEngine
+# python -m tests.benchmarks.bench_emv_transactions --sizes 100000 1000000
+
+
+def naive_transactions(chip_details, signature: bytes, count: int) -> int:
+    rand = random.Random(0)
+    approved = 0
+    for counter in range(count):
+        data = transaction_data(rand.randrange(1, 100000), counter, rand.getrandbits(32))
+        arqc = hashlib.sha256(str(chip_details).encode() + signature + data).digest()
+        arpc = hashlib.sha256(str(chip_details).encode() + signature + arqc + b"00").digest()
+        approved += hashlib.sha256(str(chip_details).encode() + signature + data).digest() == arqc \
+            and hashlib.sha256(str(chip_details).encode() + signature + arqc + b"00").digest() == arpc
+    return approved
+
+
+def run(size: int) -> dict:
+    chip_details, signature = uuid.uuid4(), secrets.token_bytes(32)
+
+    start = time.perf_counter()
+    assert naive_transactions(chip_details, signature, size) == size
+    naive = size / (time.perf_counter() - start)
+
+    stats = EmvTransactionEngine(chip_details, signature, seed=0).run(size)
+    assert stats["approved"] == size
+    return {"transactions": size, "naive_per_s": naive, "engine_per_s": stats["per_s"]}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100000, 1000000])
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        print(json.dumps(run(size)))
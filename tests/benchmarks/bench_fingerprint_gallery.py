@@ -0,0 +1,59 @@
+import argparse
+import json
+import time
+import numpy as np
+from models.authentication.fingerprint_gallery import FingerprintGallery
+
+# Queries/second for 1:N identification by gallery size
+# python -m tests.benchmarks.bench_fingerprint_gallery --sizes 10000 100000 1000000
+
+
+def noisy_copies(rng, templates: np.ndarray, flip_bits: int) -> np.ndarray:
+    # Flip a few random bits of each template to simulate a fresh scan of the same finger
+    queries = templates.copy()
+    for query in queries:
+        positions = rng.choice(query.size * 8, flip_bits, replace=False)
+        np.bitwise_xor.at(query, positions // 8, (1 << (7 - positions % 8)).astype(np.uint8))
+    return queries
+
+
+def run(size: int, queries: int, k: int, flip_bits: int, seed: int) -> dict:
+    rng = np.random.default_rng(seed)
+    gallery = FingerprintGallery(capacity=size, seed=seed)
+    gallery.add_many(list(range(size)), rng.integers(0, 256, (size, 512), dtype=np.uint8))
+
+    targets = rng.integers(0, size, queries)
+    probes = noisy_copies(rng, gallery.templates[targets], flip_bits)
+
+    start = time.perf_counter()
+    gallery.build_index()
+    index_time = time.perf_counter() - start
+
+    result = {"gallery_size": size, "gallery_mb": gallery.nbytes / 2**20, "lsh_index_s": index_time}
+    for mode in ("brute", "lsh"):
+        correct = 0
+        start = time.perf_counter()
+        for probe, target in zip(probes, targets):
+            matches = gallery.search(probe, k, mode)
+            correct += bool(matches) and matches[0][0] == target
+        elapsed = time.perf_counter() - start
+        result[f"{mode}_qps"] = queries / elapsed
+        result[f"{mode}_recall"] = correct / queries
+
+    start = time.perf_counter()
+    gallery.search_many(probes, k)
+    result["brute_batched_qps"] = queries / (time.perf_counter() - start)
+    return result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--flip-bits", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        print(json.dumps(run(size, args.queries, args.k, args.flip_bits, args.seed)))
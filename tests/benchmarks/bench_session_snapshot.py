@@ -0,0 +1,100 @@
+import argparse
+import base64
+import json
+import time
+import uuid
+from unittest.mock import MagicMock
+import numpy as np
+from models.authentication.authentication import Method
+from models.authentication.session_snapshot import dump_session, load_session
+from models.utils import ImageList
+from services.authentication_service import AuthenticationService
+
+# Binary session snapshot against JSON with base64 blobs, size and dump/load time
+# python -m tests.benchmarks.bench_session_snapshot --rounds 200
+
+
+def build_session() -> AuthenticationService:
+    with open("src/data/fingerprints/fp1.png", 'rb') as f:
+        fingerprint = f.read()
+    images = [open(f"src/data/images/{name}", 'rb').read() for name in ("arrows-1.jpg", "balloons-1.jpg", "bees-1.jpg")]
+
+    service = AuthenticationService(MagicMock())
+    flows = [(Method.PASSWORD, ("username", "password")), (Method.SECRET_QUESTION, (["question"], "answer")),
+             (Method.PICTURE_PASSWORD, (images,)), (Method.FINGERPRINT, (fingerprint,)), (Method.CHIP_PIN, ("1234",)),
+             (Method.TOTP, ("",)), (Method.TWOFA_KEY, (fingerprint,))]
+    for method, args in flows:
+        service.add(method)
+        service.register(*args)
+        service.forward()
+    return service
+
+
+def to_json_value(value):
+    if isinstance(value, (bytes, bytearray)):
+        return {"b64": base64.b64encode(value).decode()}
+    if isinstance(value, np.ndarray):
+        return {"dtype": value.dtype.str, "shape": value.shape, "b64": base64.b64encode(value.tobytes()).decode()}
+    if isinstance(value, ImageList):
+        return {"images": [base64.b64encode(image).decode() for image in value]}
+    if isinstance(value, uuid.UUID):
+        return {"uuid": str(value)}
+    if hasattr(value, "save_pkcs1"):
+        return {"pem": value.save_pkcs1().decode(), "private": hasattr(value, "d")}
+    return value
+
+
+def from_json_value(value):
+    if isinstance(value, dict):
+        if "dtype" in value:
+            return np.frombuffer(base64.b64decode(value["b64"]), dtype=value["dtype"]).reshape(value["shape"])
+        if "b64" in value:
+            return base64.b64decode(value["b64"])
+        if "images" in value:
+            return ImageList(base64.b64decode(image) for image in value["images"])
+        if "uuid" in value:
+            return uuid.UUID(value["uuid"])
+        if "pem" in value:
+            import rsa
+            return (rsa.PrivateKey if value["private"] else rsa.PublicKey).load_pkcs1(value["pem"].encode())
+    return value
+
+
+def dump_json(service: AuthenticationService) -> bytes:
+    return json.dumps({
+        "counters": [service.measure, service.at, service.register_count, service.auth_count],
+        "strategies": [{"method": strategy.get_type().value, "data": {key: to_json_value(value) for key, value in strategy.data.items()}}
+                       for strategy in service.strategy.childens]
+    }).encode()
+
+
+def load_json(blob: bytes) -> list:
+    return [{key: from_json_value(value) for key, value in strategy["data"].items()} for strategy in json.loads(blob)["strategies"]]
+
+
+def timed(fn, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def run(rounds: int) -> dict:
+    service = build_session()
+    binary, as_json = dump_session(service), dump_json(service)
+    restored = AuthenticationService(MagicMock())
+    return {
+        "binary_bytes": len(binary),
+        "json_bytes": len(as_json),
+        "binary_dump_ms": timed(lambda: dump_session(service), rounds),
+        "json_dump_ms": timed(lambda: dump_json(service), rounds),
+        "binary_load_ms": timed(lambda: load_session(restored, binary), rounds),
+        "json_load_ms": timed(lambda: load_json(as_json), rounds)
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+    print(json.dumps(run(args.rounds)))
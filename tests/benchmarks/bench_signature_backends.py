@@ -0,0 +1,51 @@
+import argparse
+import json
+import time
+from models.authentication.signature_backends import SIGNATURE_BACKENDS, get_signature_backend
+from models.authentication.key_pool import generate_key_pair
+import secrets
+
+# Key generation, sign and verify latency for each security key signature backend
+# python -m tests.benchmarks.bench_signature_backends --bits 1024 --rounds 200
+
+
+def timed(fn, rounds: int) -> float:
+    # mean milliseconds per call
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) * 1000 / rounds
+
+
+def run(name: str, bits: int, rounds: int, keygen_rounds: int) -> dict:
+    backend = get_signature_backend(name)
+    # the rsa backend normally draws from the key pool, time raw generation instead
+    if name == "rsa":
+        keygen = lambda: generate_key_pair(bits)
+    else:
+        keygen = lambda: backend.generate_keys(bits)
+
+    public_key, private_key = backend.generate_keys(bits)
+    nonce = secrets.token_bytes(16)
+    signature = backend.sign(nonce, private_key)
+
+    return {
+        "backend": name,
+        "bits": bits,
+        "keygen_ms": timed(keygen, keygen_rounds),
+        "sign_ms": timed(lambda: backend.sign(nonce, private_key), rounds),
+        "verify_ms": timed(lambda: backend.verify(nonce, signature, public_key), rounds),
+        "signature_bytes": len(signature)
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bits", type=int, default=1024)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--keygen-rounds", type=int, default=5)
+    parser.add_argument("--backends", nargs="+", default=list(SIGNATURE_BACKENDS))
+    args = parser.parse_args()
+
+    for name in args.backends:
+        print(json.dumps(run(name, args.bits, args.rounds, args.keygen_rounds)))
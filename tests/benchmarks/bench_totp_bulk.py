@@ -0,0 +1,67 @@
+import argparse
+import json
+import secrets
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+import numpy as np
+from models.authentication.totp import totp_code
+from models.authentication.totp_bulk import BULK_CHUNK_SIZE, _validate_chunk, parse_codes, validate_bulk
+
+# Scalar TOTP validation loop against validate_bulk, and the same chunks fanned out to a
+# thread pool and a process pool to check that serial validation is the fastest
+# python -m tests.benchmarks.bench_totp_bulk --sizes 10000 100000
+
+
+def scalar_validate(keys: list[str], counters: np.ndarray, codes: list[str]) -> np.ndarray:
+    # what TOTPStrategy does per submission, bypassing its per-step cache
+    generate = totp_code.__wrapped__
+    return np.array([generate(key, int(counter))[0] == code for key, counter, code in zip(keys, counters, codes)])
+
+
+class SerialExecutor:
+    # runs each chunk on the calling thread, what validate_bulk does
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+def pooled_validate(executor, keys: list[bytes], counters: np.ndarray, codes: np.ndarray) -> np.ndarray:
+    # the chunks of validate_bulk on already parsed inputs, only the executor differs
+    futures = [executor.submit(_validate_chunk, keys[i:i + BULK_CHUNK_SIZE], counters[i:i + BULK_CHUNK_SIZE],
+                               codes[i:i + BULK_CHUNK_SIZE], 6, 0) for i in range(0, len(keys), BULK_CHUNK_SIZE)]
+    return np.concatenate([future.result() for future in futures])
+
+
+def run(size: int, threads: ThreadPoolExecutor, processes: ProcessPoolExecutor, repeat: int = 5) -> dict:
+    keys = [secrets.token_hex(20) for _ in range(size)]
+    counters = np.full(size, int(time.time() // 30), dtype=np.int64)
+    codes = [totp_code.__wrapped__(key, int(counter))[0] for key, counter in zip(keys, counters)]
+    raw_keys, parsed_codes = [key.encode() for key in keys], parse_codes(codes)
+
+    result = {"submissions": size}
+    for name, fn in [("scalar", lambda: scalar_validate(keys, counters, codes)),
+                     ("bulk", lambda: validate_bulk(keys, counters, codes)),
+                     ("chunks_serial", lambda: pooled_validate(SerialExecutor(), raw_keys, counters, parsed_codes)),
+                     ("chunks_threads", lambda: pooled_validate(threads, raw_keys, counters, parsed_codes)),
+                     ("chunks_processes", lambda: pooled_validate(processes, raw_keys, counters, parsed_codes))]:
+        assert fn().all() # warm up
+        elapsed = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            elapsed.append(time.perf_counter() - start)
+        result[f"{name}_per_s"] = size / min(elapsed)
+    return result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with ThreadPoolExecutor() as threads, ProcessPoolExecutor() as processes:
+        processes.submit(int).result() # start the workers before timing
+        for size in args.sizes:
+            print(json.dumps(run(size, threads, processes, args.repeat)))
@@ -1,6 +1,9 @@
 import unittest
 from unittest.mock import patch
+from concurrent.futures import Future
 from models.authentication.authentication_methods import *
+from models.authentication.fingerprint_methods import FingerPrintStrategy, TwoFAKeyStrategy
+import hashlib
 import cv2
 import numpy as np
 
@@ -88,6 +91,33 @@ class TestChipPinStrategy(unittest.TestCase):
         self.assertTrue("arqc" in self.strategy.data)
         self.assertTrue("arpc" in self.strategy.data)
 
+    def test_generate_arqc_unchanged(self):
+        # Arrange
+        self.strategy.register("1234")
+        prefix = str(self.strategy.data["chip_details"]).encode() + self.strategy.data["chip_digital_signature"]
+
+        # Act
+        arqc = self.strategy.generate_arqc()
+
+        # Assert
+        self.assertEqual(arqc, hashlib.sha256(prefix + b"transaction_data").digest())
+        self.assertEqual(self.strategy.generate_arpc(arqc), hashlib.sha256(prefix + arqc + b"00").digest())
+
+    def test_transaction_engine_follows_card(self):
+        self.strategy.register("1234")
+        engine = self.strategy.transaction_engine()
+        self.assertIs(self.strategy.transaction_engine(), engine)
+
+        self.strategy.register("1234")
+        self.assertIsNot(self.strategy.transaction_engine(), engine)
+
+    def test_simulate_transactions(self):
+        self.strategy.register("1234")
+        transactions = list(self.strategy.simulate_transactions(50, seed=7))
+        self.assertEqual(len(transactions), 50)
+        self.assertTrue(all(transaction.approved for transaction in transactions))
+        self.assertEqual(transactions, list(self.strategy.simulate_transactions(50, seed=7)))
+
 
 class TestFingerPrintStrategy(unittest.TestCase):
     def setUp(self):
@@ -140,6 +170,7 @@ class TestFingerPrintStrategy(unittest.TestCase):
         self.assertTrue("timestamp_register" in self.strategy.data)
         self.assertEqual(self.strategy.data["user_fingerprint"], fingerprint)
         self.assertTrue("fingerprint_template" in self.strategy.data)
+        self.assertEqual(self.strategy.data["fingerprint_template"].shape, (512,))
 
     def test_register_false(self):
         # Arrange
@@ -443,6 +474,20 @@ class TestPasswordStrategy(unittest.TestCase):
         self.assertEqual(self.strategy.data["password"], self.strategy.data["user_password"])
 
 
+class TestSaltStrategyAsync(unittest.TestCase):
+    def test_hash_secret_async(self):
+        strategy = PasswordStrategy()
+        salt = strategy.generate_salt()
+        future = strategy.hash_secret_async("secret", salt)
+        self.assertEqual(future.result(timeout=10), strategy.hash_secret("secret", salt))
+
+    def test_register_authenticate_async(self):
+        strategy = SecurityQuestionStrategy()
+        self.assertTrue(strategy.register_async(["question"], "answer").result(timeout=10))
+        self.assertTrue(strategy.authenticate_async("answer").result(timeout=10))
+        self.assertFalse(strategy.authenticate_async("wrong").result(timeout=10))
+
+
 class TestTOTPStrategy(unittest.TestCase):
     def setUp(self):
         self.strategy = TOTPStrategy()
@@ -549,6 +594,22 @@ class TestTOTPStrategy(unittest.TestCase):
         self.assertEqual(self.strategy.data["totp_entered"], self.strategy.data["totp"])
         self.assertTrue("sha1_hash" in self.strategy.data)
 
+    @patch('time.time', return_value=95)
+    def test_bypass_twice_in_one_step(self, mock_time):
+        # Arrange
+        self.strategy.register("")
+        self.strategy.register("Confirm")
+
+        # Act
+        self.strategy.bypass()
+        self.strategy.bypass()
+
+        # Assert, the second bypass is not rejected as a replay
+        self.assertEqual(self.strategy.data["totp_entered"], self.strategy.data["totp"])
+        self.assertEqual(self.strategy.data["last_accepted_step"], 3)
+        # a code of the bypassed step is still refused
+        self.assertFalse(self.strategy.authenticate(self.strategy.generate_TOTP()))
+
 
 class TestSecurityQuestionStrategy(unittest.TestCase):
     def setUp(self):
@@ -755,4 +816,65 @@ class TestTwoFAKeyStrategy(unittest.TestCase):
         self.assertEqual(self.strategy.data["fingerprint"], self.strategy.data["user_fingerprint"])
         self.assertGreaterEqual(self.strategy.data["similarity_score"], 0.7)
         self.assertTrue("nonce" in self.strategy.data)
-        self.assertTrue("signed_challenge" in self.strategy.data)
\ No newline at end of file
+        self.assertTrue("signed_challenge" in self.strategy.data)
+
+    @patch("models.authentication.signature_backends.get_key_pool")
+    def test_prefill_on_creation(self, mock_get_key_pool):
+        # the key pool is only started once a 2FA key strategy exists
+        TwoFAKeyStrategy(key_size=1024)
+        mock_get_key_pool.return_value.prefill.assert_called_once_with(1024)
+
+    def test_register_async(self):
+        # Arrange
+        with open("tests/fp1.png", 'rb') as img_file:
+            fingerprint = img_file.read()
+        key_pair = self.strategy.backend.generate_keys(512)
+        keys = Future()
+
+        with patch.object(self.strategy.backend, "generate_keys_async", return_value=keys), \
+             patch.object(self.strategy.backend, "generate_keys") as mock_generate_keys:
+            # Act
+            future = self.strategy.register_async(fingerprint)
+            self.assertFalse(future.done()) # waiting on the key pair, no thread is blocked
+            keys.set_result(key_pair)
+
+            # Assert
+            self.assertTrue(future.result(timeout=30))
+            mock_generate_keys.assert_not_called()
+        self.assertEqual((self.strategy.data["public_key"], self.strategy.data["private_key"]), key_pair)
+
+    def test_register_async_key_failure(self):
+        with open("tests/fp1.png", 'rb') as img_file:
+            fingerprint = img_file.read()
+        keys = Future()
+
+        with patch.object(self.strategy.backend, "generate_keys_async", return_value=keys):
+            future = self.strategy.register_async(fingerprint)
+            keys.set_exception(RuntimeError("Key generation was cancelled."))
+
+            with self.assertRaises(RuntimeError):
+                future.result(timeout=30)
+        self.assertFalse("public_key" in self.strategy.data)
+
+class TestTwoFAKeyStrategyBackends(unittest.TestCase):
+    def test_authenticate_each_backend(self):
+        with open("tests/fp1.png", 'rb') as img_file:
+            fingerprint = img_file.read()
+
+        for backend in ["rsa", "rsa-pss", "rsa-pkcs1v15", "ecdsa-p256"]:
+            with self.subTest(backend=backend):
+                # Arrange
+                strategy = TwoFAKeyStrategy(backend=backend)
+                strategy.register(fingerprint)
+
+                # Act
+                result = strategy.authenticate(fingerprint)
+
+                # Assert
+                self.assertTrue(result)
+                self.assertEqual(strategy.data["signature_backend"], backend)
+                self.assertTrue("signed_challenge" in strategy.data)
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            TwoFAKeyStrategy(backend="unknown")
@@ -0,0 +1,91 @@
+import unittest
+import hashlib
+import uuid
+from models.authentication.emv import *
+
+
+class TestEmvTransactionEngine(unittest.TestCase):
+    def setUp(self):
+        self.chip_details = uuid.uuid4()
+        self.signature = b"s" * 32
+        self.engine = EmvTransactionEngine(self.chip_details, self.signature, seed=1)
+
+    def test_arqc_matches_full_hash(self):
+        data = transaction_data(100, 1, 42)
+        expected = hashlib.sha256(str(self.chip_details).encode() + self.signature + data).digest()
+        self.assertEqual(self.engine.arqc(data), expected)
+        self.assertEqual(self.engine.arqc(data), expected) # base state untouched
+
+    def test_transaction_data(self):
+        self.assertEqual(len(transaction_data(1, 2, 3)), 14)
+        self.assertEqual(transaction_data(1, ATC_MODULUS + 2, 3), transaction_data(1, 2, 3))
+
+    def test_transactions(self):
+        # Act
+        transactions = list(self.engine.transactions(100, start_counter=5))
+
+        # Assert
+        self.assertEqual(len(transactions), 100)
+        self.assertTrue(all(transaction.approved for transaction in transactions))
+        self.assertEqual([transaction.counter for transaction in transactions], list(range(5, 105)))
+        self.assertEqual(len({transaction.arqc for transaction in transactions}), 100)
+
+    def test_transactions_is_lazy(self):
+        transactions = self.engine.transactions(10**9)
+        self.assertEqual(next(transactions).counter, 0)
+
+    def test_transactions_seeded(self):
+        other = EmvTransactionEngine(self.chip_details, self.signature, seed=1)
+        self.assertEqual(list(self.engine.transactions(10)), list(other.transactions(10)))
+
+    def test_issuer_rejects_other_card(self):
+        # Arrange, a card the issuer has no record of
+        other = EmvTransactionEngine(uuid.uuid4(), self.signature, issuer=self.engine.issuer)
+
+        # Act
+        transaction = other.process(100, 1, 42)
+
+        # Assert
+        self.assertFalse(transaction.approved)
+        self.assertTrue(EmvTransactionEngine(uuid.uuid4(), self.signature).process(100, 1, 42).approved)
+
+    def test_tampered_amount_declined(self):
+        # Act, the amount is raised on the way to the issuer
+        transaction = self.engine.process(100, 1, 42, send=lambda amount, *rest: (amount * 100, *rest))
+
+        # Assert
+        self.assertFalse(transaction.approved)
+
+    def test_tampered_counter_declined(self):
+        # Act, a replayed cryptogram under another transaction counter
+        transaction = self.engine.process(100, 1, 42, send=lambda amount, counter, *rest: (amount, counter + 1, *rest))
+
+        # Assert
+        self.assertFalse(transaction.approved)
+
+    def test_issuer_response_codes(self):
+        # Arrange
+        arqc = self.engine.arqc(transaction_data(100, 1, 42))
+        issuer = EmvIssuer(self.chip_details, self.signature)
+
+        # Act
+        approved = issuer.authorise(100, 1, 42, arqc)
+        declined = issuer.authorise(101, 1, 42, arqc)
+
+        # Assert
+        self.assertEqual(approved[0], APPROVED)
+        self.assertEqual(declined[0], DECLINED)
+        self.assertTrue(self.engine.check_arpc(arqc, *approved))
+        # a response flipped to approved without the card key is rejected
+        self.assertFalse(self.engine.check_arpc(arqc, APPROVED, declined[1]))
+
+    def test_run(self):
+        stats = self.engine.run(1000)
+        self.assertEqual(stats["transactions"], 1000)
+        self.assertEqual(stats["approved"], 1000)
+        self.assertEqual(stats["declined"], 0)
+        self.assertGreater(stats["per_s"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
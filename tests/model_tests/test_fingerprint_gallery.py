@@ -0,0 +1,99 @@
+import unittest
+from models.authentication.fingerprint_gallery import FingerprintGallery
+from models.authentication.authentication_methods import FingerPrintStrategy
+from models.authentication.fingerprint_template import generate_packed_templates
+import numpy as np
+
+
+class TestFingerprintGallery(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+        self.gallery = FingerprintGallery(capacity=4, seed=0)
+        self.templates = self.rng.integers(0, 256, (50, 512), dtype=np.uint8)
+        self.gallery.add_many([f"user{i}" for i in range(50)], self.templates)
+
+    def noisy(self, template, flip_bits=10):
+        query = template.copy()
+        for position in self.rng.choice(512 * 8, flip_bits, replace=False):
+            query[position // 8] ^= 1 << (7 - position % 8)
+        return query
+
+    def test_add_grows_contiguous_matrix(self):
+        self.assertEqual(len(self.gallery), 50)
+        self.assertTrue(self.gallery.templates.flags.c_contiguous)
+        self.assertEqual(self.gallery.templates.shape, (50, 512))
+        self.assertTrue(np.array_equal(self.gallery.get("user7"), self.templates[7]))
+        self.assertIn("user49", self.gallery)
+
+    def test_add_duplicate_id(self):
+        with self.assertRaises(ValueError):
+            self.gallery.add("user1", self.templates[0])
+
+    def test_add_wrong_shape(self):
+        with self.assertRaises(ValueError):
+            self.gallery.add("new", np.zeros(64, dtype=np.uint8))
+
+    def test_search_brute(self):
+        # Act
+        matches = self.gallery.search(self.noisy(self.templates[12]), k=3)
+
+        # Assert
+        self.assertEqual(len(matches), 3)
+        self.assertEqual(matches[0][0], "user12")
+        self.assertAlmostEqual(matches[0][1], 1 - 10 / 4096)
+        self.assertTrue(matches[0][1] >= matches[1][1] >= matches[2][1])
+
+    def test_search_lsh(self):
+        # Act
+        matches = self.gallery.search(self.noisy(self.templates[30]), k=1, mode="lsh")
+
+        # Assert
+        self.assertEqual(matches[0][0], "user30")
+
+    def test_search_lsh_reindexes_after_add(self):
+        # Arrange
+        self.gallery.search(self.templates[0], mode="lsh")
+        extra = self.rng.integers(0, 256, 512, dtype=np.uint8)
+
+        # Act
+        self.gallery.add("late", extra)
+
+        # Assert
+        self.assertEqual(self.gallery.search(extra, mode="lsh")[0][0], "late")
+
+    def test_search_many_matches_search(self):
+        queries = np.stack([self.noisy(self.templates[i]) for i in (3, 8, 40)])
+
+        batched = self.gallery.search_many(queries, k=2)
+
+        self.assertEqual(batched, [self.gallery.search(query, k=2) for query in queries])
+        self.assertEqual([matches[0][0] for matches in batched], ["user3", "user8", "user40"])
+
+    def test_search_empty(self):
+        self.assertEqual(FingerprintGallery().search(self.templates[0]), [])
+
+    def test_search_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            self.gallery.search(self.templates[0], mode="unknown")
+
+
+class TestFingerPrintStrategyIdentify(unittest.TestCase):
+    def test_identify(self):
+        # Arrange
+        fingerprints = []
+        for path in ["src/data/fingerprints/fp1.png", "src/data/fingerprints/fp2.png", "src/data/fingerprints/fp3.png"]:
+            with open(path, 'rb') as img_file:
+                fingerprints.append(img_file.read())
+        gallery = FingerprintGallery()
+        gallery.add_many(["fp1", "fp2", "fp3"], generate_packed_templates(fingerprints))
+
+        # Act
+        matches = FingerPrintStrategy().identify(fingerprints[1], gallery, k=2)
+
+        # Assert
+        self.assertEqual(matches[0], ("fp2", 1.0))
+        self.assertLess(matches[1][1], 0.99)
+
+
+if __name__ == '__main__':
+    unittest.main()
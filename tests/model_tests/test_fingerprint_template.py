@@ -0,0 +1,159 @@
+import unittest
+from models.authentication.fingerprint_template import *
+import cv2
+import glob
+import numpy as np
+
+
+class TestFingerprintTemplateEngine(unittest.TestCase):
+    def setUp(self):
+        self.engine = FingerprintTemplateEngine()
+        with open("tests/fp1.png", 'rb') as img_file:
+            self.fp1 = img_file.read()
+        with open("tests/fp2.png", 'rb') as img_file:
+            self.fp2 = img_file.read()
+
+    def tearDown(self):
+        self.engine.shutdown()
+
+    def test_generate_shape(self):
+        # Act
+        templates = self.engine.generate([self.fp1, self.fp2, self.fp1])
+
+        # Assert
+        self.assertIsInstance(templates, np.ndarray)
+        self.assertEqual(templates.shape, (3, 64, 64))
+        self.assertEqual(templates.dtype, np.uint8)
+        self.assertTrue(np.all(np.logical_or(templates == 0, templates == 1)))
+
+    def test_generate_empty(self):
+        templates = self.engine.generate([])
+        self.assertEqual(templates.shape, (0, 64, 64))
+
+    def test_generate_batch_matches_single(self):
+        # Arrange
+        batch = self.engine.generate([self.fp1, self.fp2])
+
+        # Act
+        single_1 = self.engine.generate([self.fp1])[0]
+        single_2 = self.engine.generate([self.fp2])[0]
+
+        # Assert
+        self.assertTrue(np.array_equal(batch[0], single_1))
+        self.assertTrue(np.array_equal(batch[1], single_2))
+        self.assertFalse(np.array_equal(batch[0], batch[1]))
+
+    def test_generate_invalid_bytes(self):
+        with self.assertRaises(ValueError):
+            self.engine.generate([b"not an image"])
+
+    def test_otsu_thresholds(self):
+        # Arrange
+        images = np.stack([self.engine.preprocess(self.fp1), self.engine.preprocess(self.fp1)])
+        expected, _ = cv2.threshold(images[0], 0, 1, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+
+        # Act
+        thresholds = otsu_thresholds(images)
+
+        # Assert
+        self.assertEqual(thresholds.tolist(), [int(expected), int(expected)])
+
+    def test_area_weights(self):
+        # Each output pixel averages its span so every row sums to 1
+        weights = area_weights(73, 64)
+        self.assertEqual(weights.shape, (64, 73))
+        self.assertTrue(np.allclose(weights.sum(axis=1), 1.0))
+
+        weights = area_weights(52, 64)
+        self.assertTrue(np.allclose(weights.sum(axis=1), 1.0))
+
+    def opencv_template(self, fingerprint_bytes):
+        # The original per image pipeline
+        image = cv2.imdecode(np.frombuffer(fingerprint_bytes, np.uint8), cv2.IMREAD_GRAYSCALE)
+        image = cv2.GaussianBlur(cv2.equalizeHist(image), (3, 3), 0)
+        _, binarized_image = cv2.threshold(image, 0, 1, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+        return cv2.resize(binarized_image, (64, 64), interpolation=cv2.INTER_AREA)
+
+    def test_matches_opencv_pipeline(self):
+        # Arrange
+        fingerprints = [self.fp1, self.fp2]
+        for path in sorted(glob.glob("src/data/fingerprints/*.png")):
+            with open(path, 'rb') as img_file:
+                fingerprints.append(img_file.read())
+
+        # Act
+        templates = self.engine.compute(fingerprints)
+
+        # Assert
+        for fingerprint, template in zip(fingerprints, templates):
+            self.assertTrue(np.array_equal(template, self.opencv_template(fingerprint)))
+
+    def test_resize_matches_opencv(self):
+        # enlarging, mixed, shrinking, the 2x2 fast path and an exact fit
+        rng = np.random.default_rng(0)
+        for shape in [(40, 30), (73, 52), (52, 73), (96, 130), (200, 150), (128, 128), (64, 64)]:
+            with self.subTest(shape=shape):
+                # Arrange
+                images = (rng.random((2, *shape)) > 0.5).astype(np.uint8)
+                expected = [cv2.resize(image, (64, 64), interpolation=cv2.INTER_AREA) for image in images]
+
+                # Act
+                resized = self.engine.resize(images.astype(np.float32))
+
+                # Assert
+                self.assertTrue(np.array_equal(resized, np.stack(expected)))
+
+    def test_linear_area_taps(self):
+        indices, weights = linear_area_taps(52, 64)
+        self.assertEqual(indices.shape, (64, 2))
+        self.assertTrue(np.all(weights.sum(axis=1) == RESIZE_COEF_SCALE))
+        self.assertTrue(np.all(indices < 52))
+
+    def test_pack_template(self):
+        # Arrange
+        template = self.engine.generate([self.fp1])[0]
+
+        # Act
+        packed = pack_template(template)
+
+        # Assert
+        self.assertEqual(packed.shape, (512,))
+        self.assertEqual(packed.nbytes, template.nbytes // 8)
+        self.assertTrue(np.array_equal(unpack_template(packed), template))
+
+    def test_packed_similarity(self):
+        # Arrange
+        templates = self.engine.generate([self.fp1, self.fp2])
+        packed = pack_templates(templates)
+        expected = np.sum(templates[0] == templates[1]) / templates[0].size
+
+        # Assert
+        self.assertEqual(packed_similarity(packed[0], packed[0]), 1.0)
+        self.assertAlmostEqual(packed_similarity(packed[0], packed[1]), expected)
+        self.assertEqual(packed_similarity(pack_template(np.zeros((64, 64))), pack_template(np.ones((64, 64)))), 0.0)
+
+    def test_hamming_distance_broadcast(self):
+        # Arrange
+        packed = self.engine.generate_packed([self.fp1, self.fp2])
+
+        # Act
+        distances = hamming_distance(packed[0], packed)
+
+        # Assert
+        self.assertEqual(distances.shape, (2,))
+        self.assertEqual(distances[0], 0)
+        self.assertGreater(distances[1], 0)
+
+    def test_popcount(self):
+        words = as_words(np.array([0xFF, 0x0F, 0x01, 0x00, 0, 0, 0, 0], dtype=np.uint8))
+        self.assertEqual(words.dtype, np.uint64)
+        self.assertEqual(popcount(words), 13)
+        self.assertEqual(POPCOUNT_TABLE[0xFF], 8)
+
+    def test_generate_templates(self):
+        templates = generate_templates([self.fp1])
+        self.assertEqual(templates.shape, (1, 64, 64))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+import unittest
+import hashlib
+from models.authentication.kdf import *
+from models.authentication.authentication_methods import PasswordStrategy, SecurityQuestionStrategy
+
+
+class TestKdf(unittest.TestCase):
+    def test_derive_pbkdf2_sha256(self):
+        # default profile matches the original hard coded PBKDF2 call
+        expected = hashlib.pbkdf2_hmac('sha256', b"secret", b"salt", 100000)
+        self.assertEqual(derive(b"secret", b"salt", get_kdf_profile("pbkdf2-sha256")), expected)
+
+    def test_derive_profiles(self):
+        for name in KDF_PROFILES:
+            with self.subTest(profile=name):
+                params = dict(get_kdf_profile(name), iterations=1000, n=2**10)
+                first = derive(b"secret", b"salt", params)
+                self.assertEqual(first, derive(b"secret", b"salt", params))
+                self.assertNotEqual(first, derive(b"secret", b"other salt", params))
+
+    def test_derive_unknown(self):
+        with self.assertRaises(ValueError):
+            derive(b"secret", b"salt", {"algorithm": "md5"})
+        with self.assertRaises(ValueError):
+            get_kdf_profile("md5")
+
+    def test_get_kdf_profile_copy(self):
+        params = get_kdf_profile("scrypt")
+        params["n"] = 2
+        self.assertEqual(KDF_PROFILES["scrypt"]["n"], 2**14)
+
+    def test_calibrate(self):
+        for name in KDF_PROFILES:
+            with self.subTest(profile=name):
+                params = calibrate(name, target_ms=5)
+                self.assertEqual(params["algorithm"], name)
+                self.assertIn("calibrated_ms", params)
+                if name == "scrypt":
+                    self.assertGreaterEqual(params["n"], MIN_SCRYPT_N)
+                    self.assertEqual(params["n"] & (params["n"] - 1), 0) # power of two
+                else:
+                    self.assertGreaterEqual(params["iterations"], MIN_PBKDF2_ITERATIONS)
+
+
+class TestSaltStrategyProfiles(unittest.TestCase):
+    def test_register_stores_params(self):
+        # Arrange
+        strategy = PasswordStrategy("scrypt")
+
+        # Act
+        strategy.register("username", "password")
+
+        # Assert
+        self.assertEqual(strategy.data["kdf"], KDF_PROFILES["scrypt"])
+        self.assertTrue(strategy.authenticate("username", "password"))
+
+    def test_profile_change_keeps_registration(self):
+        # Arrange
+        strategy = SecurityQuestionStrategy()
+        strategy.register(["question"], "answer")
+
+        # Act
+        strategy.set_kdf_profile("pbkdf2-sha512", target_ms=5)
+
+        # Assert
+        self.assertEqual(strategy.data["kdf"]["algorithm"], "pbkdf2-sha256")
+        self.assertTrue(strategy.authenticate("answer"))
+        self.assertFalse(strategy.authenticate("wrong"))
+
+    def test_legacy_registration(self):
+        # Arrange, a registration stored before profiles existed has no "kdf" entry
+        strategy = PasswordStrategy("scrypt")
+        salt = strategy.generate_salt()
+        strategy.data["user_registered"] = "username"
+        strategy.data["salt"] = salt
+        strategy.data["hashed_secret"] = hashlib.pbkdf2_hmac('sha256', b"username$password", salt, 100000)
+
+        # Act / Assert
+        self.assertTrue(strategy.authenticate("username", "password"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+from unittest.mock import PropertyMock, patch
+from models.authentication.key_pool import *
+import rsa
+import threading
+
+
+class TestKeyPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = KeyPool(watermark=2, max_workers=1, use_processes=False)
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_generate_key_pair(self):
+        public_key, private_key, seconds = generate_key_pair(512)
+        self.assertIsInstance(public_key, rsa.PublicKey)
+        self.assertIsInstance(private_key, rsa.PrivateKey)
+        self.assertGreater(seconds, 0)
+
+    def test_prefill_to_watermark(self):
+        # Act
+        self.pool.prefill(512)
+
+        # Assert
+        self.assertTrue(self.pool.wait_ready(512, 2))
+        self.assertEqual(self.pool.depth(512), 2)
+        self.assertEqual(self.pool.refill(512), 0) # already at the watermark
+        self.assertEqual(self.pool.stats()["generated"], 2)
+
+    def test_acquire_hit(self):
+        # Arrange
+        self.pool.prefill(512)
+        self.pool.wait_ready(512, 2)
+
+        # Act
+        public_key, private_key = self.pool.acquire(512)
+
+        # Assert
+        self.assertEqual(self.pool.hits, 1)
+        self.assertEqual(self.pool.misses, 0)
+        signature = rsa.sign(b"nonce", private_key, 'SHA-256')
+        self.assertEqual(rsa.verify(b"nonce", signature, public_key), 'SHA-256')
+        self.assertTrue(self.pool.wait_ready(512, 2)) # topped back up
+
+    def test_acquire_miss_waits_for_refill(self):
+        threads = []
+        def generate(bits):
+            threads.append(threading.current_thread())
+            return generate_key_pair(bits)
+
+        with patch("models.authentication.key_pool.generate_key_pair", side_effect=generate):
+            public_key, _ = self.pool.acquire(512, timeout=30)
+            self.pool.wait_ready(512, 2)
+
+        self.assertEqual(self.pool.misses, 1)
+        self.assertEqual(public_key.n.bit_length(), 512)
+        # generated on the pool's worker, never on the calling thread
+        self.assertNotIn(threading.current_thread(), threads)
+        self.assertTrue(self.pool.wait_ready(512, 2)) # the watermark is still refilled
+
+    def test_acquire_hit_resolved(self):
+        self.pool.prefill(512)
+        self.pool.wait_ready(512, 1)
+
+        future = self.pool.acquire_async(512)
+
+        self.assertTrue(future.done())
+        self.assertEqual(self.pool.hits, 1)
+
+    def test_acquire_after_shutdown_fails(self):
+        self.pool.shutdown()
+        with patch.object(KeyPool, "executor", new_callable=PropertyMock) as mock_executor:
+            mock_executor.return_value.submit.side_effect = RuntimeError("shut down")
+            with self.assertRaises(RuntimeError):
+                self.pool.acquire(512, timeout=5)
+
+    def test_acquire_unique_keys(self):
+        self.pool.prefill(512)
+        self.pool.wait_ready(512, 2)
+        self.assertNotEqual(self.pool.acquire(512)[0], self.pool.acquire(512)[0])
+
+    def test_unsupported_size(self):
+        with self.assertRaises(ValueError):
+            self.pool.acquire(256)
+
+    def test_stats(self):
+        stats = self.pool.stats()
+        self.assertEqual(stats["watermark"], 2)
+        self.assertEqual(stats["depth"], {512: 0, 1024: 0, 2048: 0})
+        self.assertEqual(stats["avg_generation_s"], 0.0)
+
+    def test_get_key_pool_singleton(self):
+        self.assertIs(get_key_pool(), get_key_pool())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -16,4 +16,10 @@ class TestNote(unittest.TestCase):
 
         # Modify content and check if it's converted to HTML
         self.note.content = "This is another **Markdown** content."
-        self.assertEqual(self.note.content, "<p>This is another <strong>Markdown</strong> content.</p>")
\ No newline at end of file
+        self.assertEqual(self.note.content, "<p>This is another <strong>Markdown</strong> content.</p>")
+
+    def test_html_property(self):
+        # Pre-rendered HTML is stored as is
+        self.note.html = "<p>*kept*</p>"
+        self.assertEqual(self.note.content, "<p>*kept*</p>")
+        self.assertEqual(self.note.html, "<p>*kept*</p>")
@@ -0,0 +1,177 @@
+import unittest
+import os
+import tempfile
+import struct
+import uuid
+from unittest.mock import MagicMock
+import numpy as np
+from models.authentication.session_snapshot import *
+from models.authentication.authentication_methods import *
+from models.authentication.fingerprint_methods import FingerPrintStrategy, TwoFAKeyStrategy
+from models.utils import ImageList
+from services.authentication_service import AuthenticationService
+
+
+with open("tests/fp1.png", 'rb') as f:
+    FINGERPRINT = f.read()
+
+# (strategy factory, register args, authenticate args)
+FLOWS = {
+    Method.PASSWORD: (PasswordStrategy, ("username", "password"), ("username", "password")),
+    Method.SECRET_QUESTION: (SecurityQuestionStrategy, (["question"], "answer"), ("answer",)),
+    Method.PICTURE_PASSWORD: (PicturePasswordStrategy, ([b"image1", b"image2"],), ([b"image1", b"image2"],)),
+    Method.FINGERPRINT: (FingerPrintStrategy, (FINGERPRINT,), (FINGERPRINT,)),
+    Method.CHIP_PIN: (ChipPinStrategy, ("1234",), ("1234",)),
+    Method.TOTP: (TOTPStrategy, None, None),
+    Method.TWOFA_KEY: (TwoFAKeyStrategy, (FINGERPRINT,), (FINGERPRINT,))
+}
+
+
+def registered(method: Method):
+    factory, register_args, _ = FLOWS[method]
+    strategy = factory()
+    if method == Method.TOTP:
+        strategy.register("")
+        strategy.register("Confirm")
+    else:
+        strategy.register(*register_args)
+    return strategy
+
+
+def authenticate(method: Method, strategy) -> bool:
+    if method == Method.TOTP:
+        return strategy.authenticate(strategy.generate_TOTP())
+    return strategy.authenticate(*FLOWS[method][2])
+
+
+class TestSessionSnapshot(unittest.TestCase):
+    def assertStateEqual(self, first, second):
+        self.assertEqual(list(first), list(second))
+        for key in first:
+            if isinstance(first[key], np.ndarray):
+                self.assertTrue(np.array_equal(first[key], second[key]), key)
+                self.assertEqual(first[key].dtype, second[key].dtype)
+            else:
+                self.assertEqual(first[key], second[key], key)
+
+    def test_round_trip_every_strategy(self):
+        for method in FLOWS:
+            with self.subTest(method=method):
+                # Arrange
+                strategy = registered(method)
+
+                # Act
+                restored, offset = load_strategy(memoryview(dump_strategy(strategy)), 0)
+
+                # Assert
+                self.assertIs(type(restored), type(strategy))
+                self.assertStateEqual(strategy.data, restored.data)
+                self.assertTrue(authenticate(method, restored))
+
+    def test_round_trip_after_authenticate(self):
+        for method in FLOWS:
+            with self.subTest(method=method):
+                strategy = registered(method)
+                authenticate(method, strategy)
+                restored, _ = load_strategy(memoryview(dump_strategy(strategy)), 0)
+                self.assertStateEqual(strategy.data, restored.data)
+
+    def test_strategy_config(self):
+        # Arrange
+        strategy = TwoFAKeyStrategy(backend="ecdsa-p256")
+        strategy.register(FINGERPRINT)
+
+        # Act
+        restored, _ = load_strategy(memoryview(dump_strategy(strategy)), 0)
+
+        # Assert
+        self.assertEqual(restored.backend.name, "ecdsa-p256")
+        self.assertTrue(restored.authenticate(FINGERPRINT))
+
+    def test_extra_fields(self):
+        strategy = registered(Method.PICTURE_PASSWORD)
+        strategy.store({"encryption_key": b"k" * 32, "iv": b"i" * 16, "note": {"a": [1, 2]}})
+        restored, _ = load_strategy(memoryview(dump_strategy(strategy)), 0)
+        self.assertEqual(restored.data["note"], {"a": [1, 2]})
+        self.assertIsInstance(restored.data["user_images"], ImageList)
+
+    def test_encode_values(self):
+        for value in [None, True, -5, 2.5, "text", b"\x00\x01", uuid.uuid4(), [1, "a"], np.float64(0.5)]:
+            with self.subTest(value=value):
+                tag, payload = encode_value(value)
+                self.assertEqual(decode_value(tag, memoryview(payload)), value)
+
+        array = np.arange(12, dtype=np.uint16).reshape(3, 4)
+        tag, payload = encode_value(array)
+        self.assertEqual(tag, NDARRAY)
+        self.assertTrue(np.array_equal(decode_value(tag, memoryview(payload)), array))
+
+    def test_session_round_trip(self):
+        # Arrange
+        service = AuthenticationService(MagicMock())
+        service.add(Method.PASSWORD)
+        service.add(Method.CHIP_PIN)
+        service.register("username", "password")
+        service.forward()
+        service.register("1234")
+        service.authenticate("0000")
+
+        # Act
+        restored = AuthenticationService(MagicMock())
+        restored.restore(service.snapshot())
+
+        # Assert
+        self.assertEqual(restored.get_all_types(), [Method.PASSWORD, Method.CHIP_PIN])
+        self.assertEqual((restored.at, restored.register_count, restored.auth_count), (1, 2, 0))
+        self.assertEqual(restored.authenticate("1234"), 0)
+
+    def test_file_round_trip(self):
+        service = AuthenticationService(MagicMock())
+        service.add(Method.CHIP_PIN)
+        service.register("1234")
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "session.bin")
+            write_snapshot(service, path)
+            restored = AuthenticationService(MagicMock())
+            read_snapshot(restored, path)
+            self.assertEqual(os.listdir(tmp_dir), ["session.bin"])
+        self.assertEqual(restored.authenticate("1234"), 0)
+
+    def test_invalid_snapshots(self):
+        service = AuthenticationService(MagicMock())
+        service.add(Method.CHIP_PIN)
+        service.register("1234")
+        blob = service.snapshot()
+
+        for bad in [b"", b"XXXX" + blob[4:], blob[:4] + bytes([VERSION + 1]) + blob[5:], blob[:-3], blob + b"\x00"]:
+            with self.subTest(bad=bad[:8]):
+                with self.assertRaises(ValueError):
+                    load_session(AuthenticationService(MagicMock()), bad)
+
+    def strategy_blob(self, method: int, config: bytes) -> bytes:
+        # session header with one strategy and no fields
+        return (HEADER.pack(MAGIC, VERSION, 0, 0, 0, 0, 1) + STRATEGY.pack(method, len(config)) + config
+                + struct.pack(">H", 0))
+
+    def test_invalid_methods(self):
+        # NULL has no strategy and 99 is not a method, both are invalid snapshots
+        for method in [Method.NULL.value, 99]:
+            with self.subTest(method=method):
+                with self.assertRaises(ValueError):
+                    load_session(AuthenticationService(MagicMock()), self.strategy_blob(method, b"{}"))
+
+    def test_invalid_config(self):
+        service = AuthenticationService(MagicMock())
+        for config in [b'{"data": null}', b'{"__class__": 1}', b'{"backend": "rsa"}', b'[]', b'{"window": 1']:
+            with self.subTest(config=config):
+                with self.assertRaises(ValueError):
+                    load_session(service, self.strategy_blob(Method.CHIP_PIN.value, config))
+        self.assertEqual(len(service.strategy), 0)
+
+        # configuration the strategy has is still restored
+        load_session(service, self.strategy_blob(Method.TOTP.value, b'{"window": 2}'))
+        self.assertEqual(service.strategy.childens[0].window, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+from models.authentication.signature_backends import *
+from models.utils import decode_key
+
+
+class TestSignatureBackends(unittest.TestCase):
+    def test_sign_verify(self):
+        for name in SIGNATURE_BACKENDS:
+            with self.subTest(backend=name):
+                # Arrange
+                backend = get_signature_backend(name)
+                public_key, private_key = backend.generate_keys(512)
+
+                # Act
+                signature = backend.sign(b"nonce", private_key)
+
+                # Assert
+                self.assertEqual(backend.name, name)
+                self.assertIsInstance(signature, bytes)
+                self.assertTrue(backend.verify(b"nonce", signature, public_key))
+                self.assertFalse(backend.verify(b"other nonce", signature, public_key))
+
+    def test_verify_wrong_key(self):
+        for name in SIGNATURE_BACKENDS:
+            with self.subTest(backend=name):
+                backend = get_signature_backend(name)
+                _, private_key = backend.generate_keys(512)
+                other_public_key, _ = backend.generate_keys(512)
+
+                signature = backend.sign(b"nonce", private_key)
+                self.assertFalse(backend.verify(b"nonce", signature, other_public_key))
+
+    def test_decode_key(self):
+        for name in SIGNATURE_BACKENDS:
+            with self.subTest(backend=name):
+                public_key, private_key = get_signature_backend(name).generate_keys(512)
+                self.assertIn("-----BEGIN", decode_key(public_key))
+                self.assertIn("-----BEGIN", decode_key(private_key))
+
+    def test_cryptodome_min_key_size(self):
+        public_key, _ = CryptodomeRsaBackend("pss").generate_keys(512)
+        self.assertEqual(public_key.size_in_bits(), CryptodomeRsaBackend.MIN_KEY_SIZE)
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            get_signature_backend("dsa")
+        with self.assertRaises(ValueError):
+            CryptodomeRsaBackend("oaep")
+
+
+if __name__ == '__main__':
+    unittest.main()
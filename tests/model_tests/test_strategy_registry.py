@@ -0,0 +1,46 @@
+import unittest
+import sys
+from models.authentication.strategy_registry import *
+from models.authentication import authentication_methods
+from models.authentication.authentication import BaseStrategy
+
+
+class TestStrategyRegistry(unittest.TestCase):
+    def test_every_method(self):
+        registry = StrategyRegistry()
+        for method in Method:
+            if method == Method.NULL:
+                continue
+            with self.subTest(method=method):
+                strategy_class = registry[method]
+                self.assertTrue(issubclass(strategy_class, BaseStrategy))
+                self.assertEqual(strategy_class().get_type(), method)
+
+    def test_lazy(self):
+        # Arrange
+        registry = StrategyRegistry()
+
+        # Act
+        registry.get(Method.PASSWORD)
+
+        # Assert
+        self.assertTrue(registry.is_loaded(Method.PASSWORD))
+        self.assertFalse(registry.is_loaded(Method.FINGERPRINT))
+        self.assertEqual(len(registry), 7)
+        self.assertIsNone(registry.get(Method.NULL))
+
+    def test_cached(self):
+        self.assertIs(strategy_registry[Method.TOTP], strategy_registry[Method.TOTP])
+
+    def test_authentication_methods_reexports(self):
+        strategy_class = authentication_methods.FingerPrintStrategy
+        self.assertIs(strategy_class, sys.modules["models.authentication.fingerprint_methods"].FingerPrintStrategy)
+        self.assertIn("TwoFAKeyStrategy", authentication_methods.LAZY_STRATEGIES)
+        # import * stays light
+        self.assertNotIn("TwoFAKeyStrategy", authentication_methods.__all__)
+        with self.assertRaises(AttributeError):
+            authentication_methods.MissingStrategy
+
+
+if __name__ == '__main__':
+    unittest.main()
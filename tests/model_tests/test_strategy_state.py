@@ -0,0 +1,98 @@
+import unittest
+import datetime
+import sys
+from models.authentication.strategy_state import *
+from models.authentication.authentication_methods import ChipPinStrategy, PasswordStrategy, PicturePasswordStrategy
+
+
+class TestStrategyState(unittest.TestCase):
+    def setUp(self):
+        self.state = ChipPinState()
+
+    def test_unset_fields_are_missing(self):
+        self.assertNotIn("arqc", self.state)
+        self.assertEqual(len(self.state), 0)
+        self.assertEqual(self.state, {})
+        with self.assertRaises(KeyError):
+            self.state["arqc"]
+        self.assertIsNone(self.state.get("arqc"))
+
+    def test_set_get(self):
+        # Act
+        self.state["user_pin"] = "1234"
+        self.state["timestamp_register"] = 1.5
+
+        # Assert
+        self.assertEqual(self.state["user_pin"], "1234")
+        self.assertEqual(list(self.state), ["timestamp_register", "user_pin"])
+        self.assertEqual(self.state.copy(), {"timestamp_register": 1.5, "user_pin": "1234"})
+        del self.state["user_pin"]
+        self.assertNotIn("user_pin", self.state)
+
+    def test_extra_keys(self):
+        self.state |= {"encryption_key": b"key", "pin": "1"}
+        self.assertEqual(self.state["encryption_key"], b"key")
+        self.assertEqual(self.state["pin"], "1")
+        self.assertEqual(len(self.state), 2)
+
+    def test_blobs_by_reference(self):
+        blob = b"x" * 1000
+        self.state["chip_digital_signature"] = blob
+        self.assertIs(self.state.view()["chip_digital_signature"], blob)
+
+    def test_no_instance_dict(self):
+        self.assertFalse(hasattr(self.state, "__dict__"))
+        with self.assertRaises(AttributeError):
+            self.state.unknown = 1
+
+    def test_view(self):
+        # Arrange
+        now = datetime.datetime.now()
+        view = self.state.view()
+
+        # Act
+        self.state["timestamp_register"] = now.timestamp()
+        self.state["user_pin"] = "1234"
+
+        # Assert
+        self.assertEqual(view["timestamp_register"], str(now)) # same text as before
+        self.assertEqual(view["user_pin"], "1234") # live
+        self.assertEqual(view.copy(), {"timestamp_register": str(now), "user_pin": "1234"})
+        with self.assertRaises(TypeError):
+            view["user_pin"] = "0000"
+
+    def test_render_timestamp(self):
+        self.assertEqual(render_timestamp("2024-01-01 00:00:00"), "2024-01-01 00:00:00")
+        self.assertIsInstance(timestamp(), float)
+
+
+class TestStrategyStateUsage(unittest.TestCase):
+    def test_strategy_state_classes(self):
+        self.assertIsInstance(ChipPinStrategy().data, ChipPinState)
+        self.assertIsInstance(PasswordStrategy().data, PasswordState)
+        self.assertIsInstance(PicturePasswordStrategy().data, PicturePasswordState)
+
+    def test_get_stored_is_read_only_view(self):
+        # Arrange
+        strategy = ChipPinStrategy()
+        strategy.register("1234")
+
+        # Act
+        stored = strategy.get_stored()
+
+        # Assert
+        self.assertIsInstance(stored, StateView)
+        self.assertIsInstance(strategy.data["timestamp_register"], float)
+        self.assertIsInstance(stored["timestamp_register"], str)
+        strategy.authenticate("1234")
+        self.assertIn("arqc", stored)
+
+    def test_smaller_than_dict(self):
+        strategy = PasswordStrategy()
+        strategy.register("username", "password")
+        as_dict = strategy.data.copy()
+        self.assertLess(sys.getsizeof(strategy.data), sys.getsizeof(as_dict))
+
+
+if __name__ == '__main__':
+    unittest.main()
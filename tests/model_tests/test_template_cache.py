@@ -0,0 +1,115 @@
+import unittest
+from unittest.mock import patch
+import os
+import tempfile
+from models.authentication.template_cache import *
+from models.authentication.fingerprint_template import FingerprintTemplateEngine
+import numpy as np
+
+
+class TestTemplateCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = TemplateCache(max_entries=2)
+        self.template = np.ones((64, 64), dtype=np.uint8)
+
+    def test_content_key(self):
+        self.assertEqual(content_key(b"fp"), content_key(b"fp"))
+        self.assertNotEqual(content_key(b"fp1"), content_key(b"fp2"))
+        self.assertEqual(len(content_key(b"fp")), 64)
+
+    def test_get_miss(self):
+        self.assertIsNone(self.cache.get("missing"))
+        self.assertEqual(self.cache.misses, 1)
+        self.assertEqual(self.cache.hits, 0)
+
+    def test_put_get(self):
+        # Act
+        self.cache.put("a", self.template)
+        result = self.cache.get("a")
+
+        # Assert
+        self.assertTrue(np.array_equal(result, self.template))
+        self.assertFalse(result.flags.writeable)
+        self.assertEqual(self.cache.hits, 1)
+
+    def test_lru_eviction(self):
+        # Arrange
+        self.cache.put("a", self.template)
+        self.cache.put("b", self.template)
+        self.cache.get("a") # a becomes most recently used
+
+        # Act
+        self.cache.put("c", self.template)
+
+        # Assert
+        self.assertIn("a", self.cache)
+        self.assertNotIn("b", self.cache)
+        self.assertIn("c", self.cache)
+        self.assertEqual(self.cache.evictions, 1)
+        self.assertEqual(len(self.cache), 2)
+
+    def test_stats(self):
+        self.cache.put("a", self.template)
+        self.cache.get("a")
+        self.cache.get("b")
+
+        stats = self.cache.stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hit_rate"], 0.5)
+
+        self.cache.reset_stats()
+        self.assertEqual(self.cache.stats()["hits"], 0)
+
+    def test_disk_tier(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            # Arrange
+            TemplateCache(cache_dir=cache_dir).put("a", self.template)
+            self.assertTrue(os.path.exists(os.path.join(cache_dir, "a.npy")))
+
+            # Act
+            restarted = TemplateCache(cache_dir=cache_dir)
+            result = restarted.get("a")
+
+            # Assert
+            self.assertTrue(np.array_equal(result, self.template))
+            self.assertEqual(restarted.disk_hits, 1)
+            self.assertIn("a", restarted)
+
+            restarted.clear(disk=True)
+            self.assertEqual(os.listdir(cache_dir), [])
+
+
+class TestCachedTemplateEngine(unittest.TestCase):
+    def setUp(self):
+        self.engine = FingerprintTemplateEngine(cache=TemplateCache())
+        with open("tests/fp1.png", 'rb') as img_file:
+            self.fp1 = img_file.read()
+
+    def tearDown(self):
+        self.engine.shutdown()
+
+    def test_repeated_generate_skips_decode(self):
+        # Arrange
+        first = self.engine.generate([self.fp1])
+
+        # Act
+        with patch("cv2.imdecode") as mock_imdecode:
+            second = self.engine.generate([self.fp1, self.fp1])
+
+        # Assert
+        mock_imdecode.assert_not_called()
+        self.assertTrue(np.array_equal(first[0], second[0]))
+        self.assertTrue(np.array_equal(first[0], second[1]))
+        self.assertEqual(self.engine.cache.hits, 2)
+        self.assertEqual(self.engine.cache.misses, 1)
+
+    def test_duplicates_computed_once(self):
+        with patch.object(self.engine, "compute", wraps=self.engine.compute) as mock_compute:
+            self.engine.generate([self.fp1, self.fp1])
+
+        self.assertEqual(len(mock_compute.call_args[0][0]), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
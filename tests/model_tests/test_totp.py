@@ -0,0 +1,86 @@
+import unittest
+from unittest.mock import patch
+from models.authentication.totp import *
+from models.authentication.authentication_methods import TOTPStrategy
+
+
+class TestTotp(unittest.TestCase):
+    def test_rfc6238_vectors(self):
+        # RFC 6238 appendix B, SHA-1 seed
+        key = "12345678901234567890"
+        self.assertEqual(totp_code(key, time_step(59), 8)[0], "94287082")
+        self.assertEqual(totp_code(key, time_step(1111111109), 8)[0], "07081804")
+        self.assertEqual(totp_code(key, time_step(1234567890), 8)[0], "89005924")
+
+    def test_truncate(self):
+        digest = bytes.fromhex("1f8698690e02ca16618550ef7f19da8e945b555a")
+        self.assertEqual(truncate(digest), "872921")
+
+    def test_time_step(self):
+        self.assertEqual(time_step(0), 0)
+        self.assertEqual(time_step(29.9), 0)
+        self.assertEqual(time_step(30), 1)
+
+    def test_totp_code_cached(self):
+        totp_code.cache_clear()
+        totp_code("key", 100)
+        totp_code("key", 100)
+        info = totp_code.cache_info()
+        self.assertEqual(info.hits, 1)
+        self.assertEqual(info.misses, 1)
+
+
+class TestTOTPStrategyWindow(unittest.TestCase):
+    def setUp(self):
+        self.strategy = TOTPStrategy(window=1)
+        self.strategy.register("")
+        self.strategy.register("Confirm")
+        self.key = self.strategy.data["shared_key"]
+
+    @patch('time.time', return_value=3000)
+    def test_accept_previous_step(self, mock_time):
+        code = totp_code(self.key, time_step(3000) - 1)[0]
+        self.assertTrue(self.strategy.authenticate(code))
+        self.assertEqual(self.strategy.data["step_drift"], -1)
+
+    @patch('time.time', return_value=3000)
+    def test_accept_next_step(self, mock_time):
+        code = totp_code(self.key, time_step(3000) + 1)[0]
+        self.assertTrue(self.strategy.authenticate(code))
+        self.assertEqual(self.strategy.data["step_drift"], 1)
+
+    @patch('time.time', return_value=3000)
+    def test_reject_outside_window(self, mock_time):
+        code = totp_code(self.key, time_step(3000) - 2)[0]
+        if code not in (totp_code(self.key, time_step(3000) + i)[0] for i in (-1, 0, 1)):
+            self.assertFalse(self.strategy.authenticate(code))
+
+    @patch('time.time', return_value=3000)
+    def test_strict_window(self, mock_time):
+        self.strategy.window = 0
+        code = totp_code(self.key, time_step(3000) - 1)[0]
+        if code != totp_code(self.key, time_step(3000))[0]:
+            self.assertFalse(self.strategy.authenticate(code))
+
+    @patch('time.time', return_value=3000)
+    def test_replay_rejected(self, mock_time):
+        # Arrange
+        code = self.strategy.generate_TOTP()
+        self.assertTrue(self.strategy.authenticate(code))
+
+        # Act / Assert, same code in the same step is a replay
+        self.assertFalse(self.strategy.authenticate(code))
+        self.assertEqual(self.strategy.data["last_accepted_step"], time_step(3000))
+
+    def test_replay_earlier_step_rejected(self):
+        with patch('time.time', return_value=3030):
+            self.assertTrue(self.strategy.authenticate(self.strategy.generate_TOTP()))
+        # previous step is inside the window but older than the last accepted one
+        with patch('time.time', return_value=3030):
+            code = totp_code(self.key, time_step(3030) - 1)[0]
+            if code != totp_code(self.key, time_step(3030) + 1)[0]:
+                self.assertFalse(self.strategy.authenticate(code))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+from unittest.mock import patch
+import numpy as np
+from models.authentication.totp import totp_code
+from models.authentication.totp_bulk import *
+
+
+class TestTotpBulk(unittest.TestCase):
+    def setUp(self):
+        self.keys = [f"shared-key-{i}" for i in range(20)]
+        self.counters = np.arange(20, dtype=np.int64) + 1000
+        self.codes = [totp_code(key, int(counter))[0] for key, counter in zip(self.keys, self.counters)]
+
+    def test_bulk_truncate_matches_scalar(self):
+        digests = bulk_digests([key.encode() for key in self.keys], self.counters)
+        self.assertEqual(digests.shape, (20, 20))
+        self.assertEqual([str(code).zfill(6) for code in bulk_truncate(digests)], self.codes)
+
+    def test_validate_bulk(self):
+        # Arrange
+        codes = list(self.codes)
+        codes[2] = "12345"  # wrong length
+        codes[4] = "abcdef" # not digits
+        codes[6] = str((int(codes[6]) + 1) % 10**6).zfill(6)
+
+        # Act
+        result = validate_bulk(self.keys, self.counters, codes)
+
+        # Assert
+        self.assertEqual(result.dtype, bool)
+        self.assertEqual(np.flatnonzero(~result).tolist(), [2, 4, 6])
+
+    def test_validate_bulk_chunked(self):
+        codes = list(self.codes)
+        codes[13] = "000000"
+        with patch("models.authentication.totp_bulk.BULK_CHUNK_SIZE", 6):
+            result = validate_bulk(self.keys, self.counters, codes)
+        self.assertEqual(np.flatnonzero(~result).tolist(), [13])
+
+    def test_validate_bulk_window(self):
+        self.assertFalse(validate_bulk(self.keys, self.counters + 1, self.codes).any())
+        self.assertTrue(validate_bulk(self.keys, self.counters + 1, self.codes, window=1).all())
+
+    def test_validate_bulk_scalar_counter(self):
+        codes = [totp_code(key, 5)[0] for key in self.keys]
+        self.assertTrue(validate_bulk(self.keys, 5, codes).all())
+
+    def test_validate_bulk_length_mismatch(self):
+        with self.assertRaises(ValueError):
+            validate_bulk(self.keys, self.counters, self.codes[:5])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,10 @@
 import unittest
 import os
+import tempfile
+from unittest.mock import patch
+import hashlib
+import tracemalloc
+import threading
 from models.utils import *
 
 
@@ -96,5 +101,281 @@ class TestUtils(unittest.TestCase):
         for original, decrypted in zip(original_images, decrypted_images):
             self.assertEqual(decrypted, original)
 
+    def test_hash_images(self):
+        images = [b'image1', bytearray(b'image2'), memoryview(b'image3')]
+        self.assertEqual(hash_images(images), hashlib.sha256(b'image1image2image3').digest())
+        self.assertEqual(hash_images([]), hashlib.sha256(b'').digest())
 
-    
\ No newline at end of file
+    def test_image_list_joined(self):
+        # Arrange
+        images = ImageList([b'image1', b'image2'])
+
+        # Act
+        joined = images.joined
+
+        # Assert
+        self.assertEqual(joined, b'image1image2')
+        self.assertIs(images.joined, joined) # cached
+        self.assertEqual(images, [b'image1', b'image2'])
+
+        images.append(b'image3')
+        self.assertEqual(images.joined, b'image1image2image3')
+        images[0] = b'other'
+        self.assertEqual(images.joined, b'otherimage2image3')
+
+    def test_image_list_mutation_drops_blob(self):
+        mutations = {
+            "setitem": lambda images: images.__setitem__(slice(0, 1), [b'x']),
+            "delitem": lambda images: images.__delitem__(0),
+            "iadd": lambda images: images.__iadd__([b'x']),
+            "imul": lambda images: images.__imul__(2),
+            "append": lambda images: images.append(b'x'),
+            "extend": lambda images: images.extend([b'x']),
+            "insert": lambda images: images.insert(0, b'x'),
+            "pop": lambda images: images.pop(),
+            "remove": lambda images: images.remove(b'b'),
+            "clear": lambda images: images.clear(),
+            "sort": lambda images: images.sort(reverse=True),
+            "reverse": lambda images: images.reverse()
+        }
+        for name, mutate in mutations.items():
+            with self.subTest(mutation=name):
+                # Arrange
+                images = ImageList([b'a', b'b'])
+                images.joined
+
+                # Act
+                mutate(images)
+
+                # Assert
+                self.assertIsNone(images._joined)
+                self.assertEqual(images.joined, b''.join(images))
+
+    def test_image_list_same_ids(self):
+        # Swapping an item for another at a recycled address still rebuilds
+        images = ImageList([b'first', b'second'])
+        images.joined
+        images[1], images[0] = images[0], images[1]
+        self.assertEqual(images.joined, b'secondfirst')
+
+    def test_joined_images(self):
+        self.assertEqual(joined_images([b'a', b'b']), b'ab')
+        images = ImageList([b'a', b'b'])
+        self.assertIs(joined_images(images), images.joined)
+
+    def test_encrypt_images_memoised(self):
+        # Arrange
+        image_dirs = ["src/data/images/arrows-1.jpg", "src/data/images/balloons-1.jpg"]
+        encrypted_image_cache.clear()
+        first = encrypt_images(image_dirs, self.key, self.iv)
+
+        # Act
+        with patch('models.utils.encrypt_image') as mock_encrypt:
+            second = encrypt_images(image_dirs, self.key, self.iv)
+
+        # Assert
+        mock_encrypt.assert_not_called()
+        self.assertEqual(first, second)
+        self.assertNotEqual(encrypt_images(image_dirs, os.urandom(32), self.iv), first)
+
+    def test_encrypt_memo_holds_no_key_material(self):
+        encrypted_image_cache.clear()
+        encrypt_images(["src/data/images/arrows-1.jpg"], self.key, self.iv)
+        for memo_key in encrypted_image_cache._entries:
+            self.assertNotIn(bytes(self.key), memo_key)
+            self.assertNotIn(bytes(self.iv), memo_key)
+            self.assertIn(secret_digest(self.key, self.iv), memo_key)
+
+    def test_map_images_inline_on_shared_pool(self):
+        # a task already on the shared pool does not wait on the pool again
+        from models.authentication.authentication import get_executor
+        threads = get_executor().submit(lambda: map_images(lambda _: threading.current_thread(), range(8))).result(timeout=10)
+        self.assertEqual(len(set(threads)), 1)
+        self.assertTrue(threads[0].name.startswith("authentication"))
+
+    def test_encrypt_images_file_changed(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            # Arrange
+            path = os.path.join(tmp_dir, "image.jpg")
+            with open(path, 'wb') as f:
+                f.write(b"version 1")
+            first = encrypt_images([path], self.key, self.iv)
+
+            # Act
+            with open(path, 'wb') as f:
+                f.write(b"version 2 longer")
+            second = encrypt_images([path], self.key, self.iv)
+
+            # Assert
+            self.assertEqual(decrypt_images(second, self.key, self.iv), [b"version 2 longer"])
+            self.assertNotEqual(first, second)
+
+    def test_decrypt_images_order(self):
+        images = [os.urandom(1000 + i) for i in range(8)]
+        encrypted = [encrypt_image(image, self.key, self.iv) for image in images]
+        self.assertEqual(decrypt_images(encrypted, self.key, self.iv), images)
+
+    def test_byte_lru_cache(self):
+        # Arrange
+        cache = ByteLRUCache(10)
+        cache.put("a", b"1234")
+        cache.put("b", b"1234")
+        cache.get("a")
+
+        # Act
+        cache.put("c", b"1234")
+        cache.put("huge", b"x" * 11)
+
+        # Assert
+        self.assertEqual(cache.get("a"), b"1234")
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNone(cache.get("huge"))
+        self.assertEqual(cache.size, 8)
+
+
+    def test_atomic_write(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            # Arrange
+            path = os.path.join(tmp_dir, "data.bin")
+
+            # Act
+            with patch("os.fsync", wraps=os.fsync) as mock_fsync:
+                size = atomic_write(path, b"first")
+            atomic_write(path, "second", mode='w')
+            atomic_write(path, lambda f: f.write(b"third"))
+
+            # Assert
+            self.assertEqual(size, 5)
+            self.assertGreaterEqual(mock_fsync.call_count, 1)
+            self.assertEqual(image_byte(path), b"third")
+            self.assertEqual(os.listdir(tmp_dir), ["data.bin"])
+
+    def test_atomic_write_failure_keeps_old_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            # Arrange
+            path = os.path.join(tmp_dir, "data.bin")
+            atomic_write(path, b"old")
+
+            def fail(f):
+                f.write(b"partial")
+                raise OSError("disk full")
+
+            # Act
+            with self.assertRaises(OSError):
+                atomic_write(path, fail)
+
+            # Assert
+            self.assertEqual(image_byte(path), b"old")
+            self.assertEqual(os.listdir(tmp_dir), ["data.bin"])
+
+    def test_atomic_write_concurrent(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            # Arrange, every writer holds its temp file open until all have opened one
+            path = os.path.join(tmp_dir, "data.bin")
+            barrier = threading.Barrier(4)
+
+            def write(value):
+                def body(f):
+                    f.write(value)
+                    barrier.wait(timeout=10)
+                atomic_write(path, body)
+
+            # Act
+            threads = [threading.Thread(target=write, args=(bytes([i]) * 100,)) for i in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            # Assert
+            self.assertIn(image_byte(path), [bytes([i]) * 100 for i in range(4)])
+            self.assertEqual(os.listdir(tmp_dir), ["data.bin"])
+
+    def test_streaming_cipher_round_trip(self):
+        data = os.urandom(5 * 64 + 7)
+        for mode in STREAM_MODES:
+            for size in (0, 16, 100, len(data)):
+                with self.subTest(mode=mode, size=size):
+                    # Arrange
+                    chunks = [data[i:min(i + 64, size)] for i in range(0, size, 64)]
+                    stream = StreamingImageCipher(self.key, self.iv, mode, chunk_size=64)
+
+                    # Act
+                    encrypted = list(stream.encrypt_chunks(chunks))
+                    decrypted = b"".join(StreamingImageCipher(self.key, self.iv, mode, chunk_size=64).decrypt_chunks(encrypted, stream.tag))
+
+                    # Assert
+                    self.assertEqual(decrypted, data[:size])
+                    self.assertEqual(len(stream.tag), stream.tag_size)
+
+    def test_streaming_cbc_matches_encrypt_image(self):
+        data = os.urandom(1000)
+        stream = StreamingImageCipher(self.key, self.iv, "cbc", chunk_size=64)
+        chunks = [data[i:i + 100] for i in range(0, len(data), 100)] # not block aligned
+        self.assertEqual(b"".join(stream.encrypt_chunks(chunks)), encrypt_image(data, self.key, self.iv))
+
+    def test_streaming_cipher_tampered(self):
+        for mode in STREAM_MODES:
+            with self.subTest(mode=mode):
+                stream = StreamingImageCipher(self.key, self.iv, mode)
+                encrypted = bytearray(b"".join(stream.encrypt_chunks([b"picture" * 10])))
+                encrypted[0] ^= 1
+                with self.assertRaises(ValueError):
+                    list(StreamingImageCipher(self.key, self.iv, mode).decrypt_chunks([bytes(encrypted)], stream.tag))
+
+    def test_streaming_cipher_invalid(self):
+        with self.assertRaises(ValueError):
+            StreamingImageCipher(self.key, self.iv, "ecb")
+        with self.assertRaises(ValueError):
+            StreamingImageCipher(self.key, self.iv, "gcm", chunk_size=100)
+
+    def test_encrypt_images_stream(self):
+        # Arrange
+        image_dirs = ["src/data/images/arrows-1.jpg", "src/data/images/balloons-1.jpg"]
+        original_images = [open(img_dir, 'rb').read() for img_dir in image_dirs]
+
+        for mode in STREAM_MODES:
+            with self.subTest(mode=mode):
+                # Act
+                encrypted_images = encrypt_images_stream(image_dirs, self.key, self.iv, mode, chunk_size=4096)
+
+                # Assert
+                self.assertEqual(encrypted_images, encrypt_images_stream(image_dirs, self.key, self.iv, mode)) # deterministic
+                self.assertEqual(decrypt_images_stream(encrypted_images, self.key, mode, chunk_size=4096), original_images)
+
+    def test_stream_nonce_per_image(self):
+        # Arrange
+        image_dirs = ["src/data/images/arrows-1.jpg", "src/data/images/balloons-1.jpg"]
+
+        # Act
+        first, second = encrypt_images_stream(image_dirs, self.key, self.iv, "ctr")
+        swapped, _ = encrypt_images_stream(image_dirs[::-1], self.key, self.iv, "ctr")
+        repeated = encrypt_images_stream([image_dirs[0], image_dirs[0]], self.key, self.iv, "ctr")
+
+        # Assert, no two different (image, position) pairs share a nonce
+        nonces = {images[:STREAM_NONCE_SIZE] for images in (first, second, swapped, *repeated)}
+        self.assertEqual(len(nonces), 4)
+        self.assertEqual(first[:STREAM_NONCE_SIZE], repeated[0][:STREAM_NONCE_SIZE])
+        self.assertNotEqual(first[:STREAM_NONCE_SIZE], stream_nonce(os.urandom(32), self.iv, 0, image_dirs[0]))
+
+    def test_encrypt_image_stream_bounded_memory(self):
+        # Arrange, 16 MiB of image against a 64 KiB chunk
+        size = 16 * 1024 * 1024
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            for _ in range(size // STREAM_CHUNK_SIZE):
+                f.write(os.urandom(STREAM_CHUNK_SIZE))
+        self.addCleanup(os.remove, f.name)
+
+        for mode in STREAM_MODES:
+            with self.subTest(mode=mode):
+                # Act
+                total = 0
+                tracemalloc.start()
+                for chunk in encrypt_image_stream(f.name, self.key, self.iv, 0, mode):
+                    total += len(chunk)
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+
+                # Assert
+                self.assertGreaterEqual(total, size)
+                self.assertLess(peak, size // 8)
@@ -1,4 +1,5 @@
 import unittest
+from concurrent.futures import Future
 from unittest.mock import MagicMock
 from services.authentication_service import AuthenticationService
 from models.authentication.authentication import Method
@@ -84,23 +85,110 @@ class TestAuthenticationService(unittest.TestCase):
     def test_authenticate_lockout(self):
         self.service.add(Method.PASSWORD)
         self.service.register("username", "password")
-        for _ in range(self.service.LIMIT_COUNT):
+        for _ in range(self.service.rate_limiter.policy.limit):
             self.assertEqual(self.service.authenticate("username", "wrong_password"), 1)
-        # After LIMIT_COUNT attempts, authentication should be locked out
+        # After limit attempts, authentication should be locked out
         self.assertEqual(self.service.authenticate("username", "wrong_password"), 2)
 
     def test_authenticate_lockout_ignore(self):
         self.service.add(Method.TOTP)
         self.service.register("")
         self.service.register("confirm")
-        for _ in range(self.service.LIMIT_COUNT):
+        for _ in range(self.service.rate_limiter.policy.limit):
             self.assertEqual(self.service.authenticate("GENERATE"), 1)
-        # After LIMIT_COUNT attempts, authentication should be locked out
+        # After limit attempts, authentication should be locked out
         self.assertEqual(self.service.authenticate(self.service.get_session_stored()["totp"]), 2)
-        # After LIMIT_COUNT attempts, authentication should be locked out but can ignore
+        # After limit attempts, authentication should be locked out but can ignore
         self.assertEqual(self.service.authenticate("GENERATE", ignore_limit=True), 1)
         self.assertEqual(self.service.authenticate(self.service.get_session_stored()["totp"], ignore_limit=True), 0)
 
+    def test_retry_after(self):
+        # Arrange
+        self.service.add(Method.PASSWORD)
+        self.service.register("username", "password")
+        self.assertEqual(self.service.retry_after(), 0)
+
+        # Act
+        for _ in range(self.service.rate_limiter.policy.limit):
+            self.service.authenticate("username", "wrong_password")
+
+        # Assert
+        self.assertTrue(self.service.is_locked())
+        self.assertGreater(self.service.retry_after(), self.service.rate_limiter.policy.lock_duration - 1)
+        self.assertLessEqual(self.service.retry_after(), self.service.rate_limiter.policy.lock_duration)
+
+    def test_lockout_per_method(self):
+        self.service.add(Method.PASSWORD)
+        self.service.add(Method.CHIP_PIN)
+        self.service.register("username", "password")
+        self.service.forward()
+        self.service.register("1234")
+        self.service.at = 0
+        for _ in range(self.service.rate_limiter.policy.limit):
+            self.service.authenticate("username", "wrong_password")
+        self.assertTrue(self.service.is_locked())
+
+        self.service.at = 1
+        self.assertFalse(self.service.is_locked())
+        self.assertEqual(self.service.authenticate("1234"), 0)
+
+    def test_register_async(self):
+        self.service.add(Method.PASSWORD)
+        future = self.service.register_async("username", "password")
+        self.assertTrue(future.result(timeout=10))
+        self.assertEqual(self.service.register_count, 1)
+
+    def test_authenticate_async(self):
+        self.service.add(Method.PASSWORD)
+        self.service.register_async("username", "password").result(timeout=10)
+        self.assertEqual(self.service.authenticate_async("username", "wrong_password").result(timeout=10), 1)
+        self.assertEqual(self.service.auth_count, 0)
+        self.assertEqual(self.service.authenticate_async("username", "password").result(timeout=10), 0)
+        self.assertEqual(self.service.auth_count, 1)
+
+    def test_authenticate_async_lockout(self):
+        self.service.add(Method.PASSWORD)
+        self.service.register("username", "password")
+        futures = [self.service.authenticate_async("username", "wrong_password") for _ in range(self.service.rate_limiter.policy.limit)]
+        self.assertEqual([future.result(timeout=10) for future in futures], [1] * self.service.rate_limiter.policy.limit)
+        # Locked out without reaching the strategy
+        future = self.service.authenticate_async("username", "password")
+        self.assertTrue(future.done())
+        self.assertEqual(future.result(), 2)
+        self.assertEqual(self.service.auth_count, 0)
+
+    def test_authenticate_async_error(self):
+        self.service.add(Method.PASSWORD)
+        # not registered yet so the strategy raises, the error reaches the caller
+        with self.assertRaises(KeyError):
+            self.service.authenticate_async("username", "password").result(timeout=10)
+        # the reserved attempt is given back, not counted as a failure
+        self.assertEqual(self.service.rate_limiter.pending(self.service.rate_key()), 0)
+        self.assertFalse(self.service.is_locked())
+
+    def test_authenticate_async_in_flight_counted(self):
+        # Arrange, attempts stay in flight until the test resolves them
+        self.service.add(Method.PASSWORD)
+        self.service.register("username", "password")
+        attempts = []
+        def authenticate_async(at, *data):
+            attempts.append(Future())
+            return attempts[-1]
+        self.service.strategy.authenticate_async = authenticate_async
+        limit = self.service.rate_limiter.policy.limit
+
+        # Act, more attempts than the limit are submitted before any completes
+        futures = [self.service.authenticate_async("username", "wrong_password") for _ in range(limit + 3)]
+
+        # Assert, only limit attempts reach the strategy
+        self.assertEqual(len(attempts), limit)
+        self.assertEqual([future.result() for future in futures[limit:]], [2] * 3)
+        for attempt in attempts:
+            attempt.set_result(False)
+        self.assertEqual([future.result() for future in futures[:limit]], [1] * limit)
+        self.assertTrue(self.service.is_locked())
+        self.assertEqual(self.service.rate_limiter.pending(self.service.rate_key()), 0)
+
     def test_forward(self):
         self.service.add(Method.PASSWORD)
         self.service.add(Method.SECRET_QUESTION)
@@ -173,7 +261,6 @@ class TestAuthenticationService(unittest.TestCase):
         self.service.measure = 2
         self.service.register_count = 1
         self.service.auth_count = 1
-        self.service.auth_false_count = 5
 
         self.service.reset()
         self.assertEqual(len(self.service.strategy), 0)
@@ -181,7 +268,22 @@ class TestAuthenticationService(unittest.TestCase):
         self.assertEqual(self.service.measure, 0)
         self.assertEqual(self.service.register_count, 0)
         self.assertEqual(self.service.auth_count, 0)
-        self.assertEqual(self.service.auth_false_count, 0)
+
+    def test_reset_clears_lockout(self):
+        # Arrange
+        self.service.add(Method.PASSWORD)
+        self.service.register("username", "password")
+        for _ in range(self.service.rate_limiter.policy.limit):
+            self.service.authenticate("username", "wrong_password")
+        self.assertTrue(self.service.is_locked())
+
+        # Act
+        self.service.reset()
+        self.service.add(Method.PASSWORD)
+
+        # Assert, the next simulation does not start locked
+        self.assertFalse(self.service.is_locked())
+        self.assertEqual(len(self.service.rate_limiter), 0)
 
     def test_display_details_register(self):
         self.service.add(Method.PASSWORD)
@@ -0,0 +1,179 @@
+import unittest
+import sqlite3
+import threading
+import time
+from unittest.mock import MagicMock
+from services.autosave import *
+
+
+class TestAutosaver(unittest.TestCase):
+    def setUp(self):
+        self.data_service = MagicMock()
+        self.data_service.save_data.return_value = 100
+        self.saved = threading.Event()
+        self.data_service.save_data.side_effect = lambda: self.saved.set() or 100
+
+    def advance(self, seconds):
+        self.now += seconds
+
+    def autosaver(self, **kwargs):
+        # Not started, the test drives wait() and the clock itself
+        self.now = 0.0
+        return Autosaver(self.data_service, clock=lambda: self.now, **kwargs)
+
+    def test_burst_coalesced(self):
+        # Arrange
+        autosaver = self.autosaver(interval=2, max_dirty=50)
+
+        # Act
+        for _ in range(20):
+            autosaver.notify()
+            self.advance(0.1)
+        self.advance(2)
+        due = autosaver.wait()
+        autosaver.flush()
+
+        # Assert
+        self.assertTrue(due)
+        self.data_service.save_data.assert_called_once()
+        stats = autosaver.stats()
+        self.assertEqual(stats["notifications"], 20)
+        self.assertEqual(stats["saves"], 1)
+        self.assertEqual(stats["coalesced"], 19)
+        self.assertEqual(stats["bytes_written"], 100)
+
+    def test_debounce_waits_for_quiet(self):
+        # Arrange
+        autosaver = self.autosaver(interval=30, max_dirty=50)
+
+        # Act
+        autosaver.notify()
+        self.advance(15)
+        autosaver.notify()
+        self.advance(20)
+        early = autosaver.due() # 35s after the first change, 20s after the last
+        self.advance(10)
+        late = autosaver.due()
+
+        # Assert
+        self.assertEqual(early, 10)
+        self.assertEqual(late, 0)
+
+    def test_nothing_due_when_clean(self):
+        # Arrange
+        autosaver = self.autosaver(interval=2)
+        stopped = threading.Event()
+
+        # Act, the worker sleeps until stop without a change to save
+        thread = threading.Thread(target=lambda: autosaver.wait() or stopped.set())
+        thread.start()
+        autosaver.stop(flush=False)
+        thread.join()
+
+        # Assert
+        self.assertTrue(stopped.is_set())
+        self.data_service.save_data.assert_not_called()
+
+    def test_failed_save_retried(self):
+        # Arrange, any error (here the sqlite backend's) is retried, not only OSError
+        results = [sqlite3.OperationalError("database is locked"), 100]
+        def save_data():
+            result = results.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            self.saved.set()
+            return result
+        self.data_service.save_data.side_effect = save_data
+        autosaver = self.autosaver(interval=2, max_dirty=1).start()
+
+        # Act
+        autosaver.notify()
+        with self.assertLogs("services.autosave", "WARNING") as logs:
+            while not logs.records: # logged once the retry is scheduled
+                time.sleep(0.01)
+        self.assertEqual(autosaver.retry_at, self.now + 2)
+        self.advance(2) # the backoff
+        with autosaver.condition:
+            autosaver.condition.notify()
+        saved = self.saved.wait(5)
+        autosaver.stop(flush=False)
+
+        # Assert
+        self.assertTrue(saved)
+        self.assertEqual(autosaver.failures, 1)
+        self.assertEqual(autosaver.saves, 1)
+        self.assertEqual(autosaver.consecutive_failures, 0)
+
+    def test_backoff_and_report(self):
+        # Arrange
+        self.data_service.save_data.side_effect = RuntimeError("broken")
+        autosaver = self.autosaver(interval=2, max_dirty=1, max_backoff=5, report_after=3)
+        autosaver.notify()
+
+        # Act
+        delays = []
+        with self.assertLogs("services.autosave", "WARNING") as logs:
+            for _ in range(4):
+                self.assertTrue(autosaver.wait())
+                self.assertFalse(autosaver.save())
+                delays.append(autosaver.due())
+                self.advance(delays[-1])
+
+        # Assert
+        self.assertEqual(delays, [2, 4, 5, 5])
+        self.assertEqual([record.levelname for record in logs.records], ["WARNING", "WARNING", "ERROR", "ERROR"])
+        stats = autosaver.stats()
+        self.assertEqual(stats["failures"], 4)
+        self.assertEqual(stats["consecutive_failures"], 4)
+        self.assertEqual(stats["last_error"], repr(RuntimeError("broken")))
+
+        # a successful save ends the backoff
+        self.data_service.save_data.side_effect = None
+        self.assertTrue(autosaver.wait())
+        self.assertTrue(autosaver.save())
+        self.assertEqual(autosaver.consecutive_failures, 0)
+        self.assertIsNone(autosaver.retry_at)
+
+    def test_max_dirty(self):
+        # Arrange
+        autosaver = Autosaver(self.data_service, interval=60, max_dirty=5).start()
+
+        # Act
+        for _ in range(5):
+            autosaver.notify()
+        saved = self.saved.wait(2)
+        autosaver.stop(flush=False)
+
+        # Assert
+        self.assertTrue(saved)
+
+    def test_stop_flushes(self):
+        # Arrange
+        autosaver = Autosaver(self.data_service, interval=60).start()
+        autosaver.notify()
+
+        # Act
+        autosaver.stop()
+
+        # Assert
+        self.data_service.save_data.assert_called_once()
+        self.assertIsNone(autosaver.thread)
+        self.assertEqual(autosaver.saves, 1)
+
+    def test_flush_nothing_pending(self):
+        # Arrange
+        self.data_service.save_data.side_effect = None
+        self.data_service.save_data.return_value = 0
+        autosaver = Autosaver(self.data_service)
+
+        # Act
+        written = autosaver.flush()
+
+        # Assert
+        self.assertEqual(written, 0)
+        self.assertEqual(autosaver.saves, 0)
+        self.assertEqual(autosaver.stats()["mean_latency_ms"], 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+import unittest
+import json
+import os
+import tempfile
+from unittest.mock import patch
+from services.content_bundle import *
+
+
+class TestContentBundle(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.root = self.folder.name + "/"
+        self.content = {
+            Settings.FACT_FILE_PATH: {"facts": ["Fact 1", "Fact 2"]},
+            Settings.SECURITY_QUESTION_FILE_PATH: {"security_questions": ["Question 1"]},
+            Settings.QUIZ_FILE_PATH + "quiz_bank1.json": [{"question": "Question 1", "answer": "Answer 1"}],
+            Settings.HELP_TOKEN_FILE_PATH: {"help": [0, 1]},
+            Settings.SIMULATION_NOTE_PATH + "password.json": {"name": "Password"}
+        }
+        for path, data in self.content.items():
+            self.write(path, data)
+        self.path = self.root + Settings.CONTENT_BUNDLE_PATH
+        self.bundles = []
+
+    def tearDown(self):
+        for bundle in self.bundles:
+            bundle.close()
+        self.folder.cleanup()
+
+    def write(self, path, data):
+        os.makedirs(os.path.dirname(self.root + path), exist_ok=True)
+        with open(self.root + path, 'w') as f:
+            json.dump(data, f)
+
+    def load(self):
+        bundle = load_bundle(root=self.root)
+        if bundle is not None:
+            self.bundles.append(bundle)
+        return bundle
+
+    def test_build_and_load(self):
+        # Act
+        bundle = self.load()
+
+        # Assert
+        self.assertTrue(os.path.exists(self.path))
+        self.assertEqual(sorted(bundle.keys()), ["facts", "help_token", "quiz_bank", "security_questions", "simulation/password"])
+        self.assertEqual(bundle.get("facts"), {"facts": ["Fact 1", "Fact 2"]})
+        self.assertEqual(bundle.get("simulation/password"), {"name": "Password"})
+        self.assertEqual(bundle.get("quiz_bank"), self.content[Settings.QUIZ_FILE_PATH + "quiz_bank1.json"])
+        self.assertIsNone(bundle.get("simulation/totp"))
+
+    def test_get_returns_copy(self):
+        # Arrange
+        bundle = self.load()
+
+        # Act
+        bundle.get("facts")["facts"].append("Fact 3")
+
+        # Assert
+        self.assertEqual(bundle.get("facts"), {"facts": ["Fact 1", "Fact 2"]})
+
+    def test_fresh_bundle_reused(self):
+        # Arrange
+        self.load()
+        built = os.stat(self.path).st_mtime_ns
+
+        # Act
+        with patch('services.content_bundle.build_bundle') as mock_build:
+            bundle = self.load()
+
+        # Assert
+        mock_build.assert_not_called()
+        self.assertFalse(bundle.stale(self.root))
+        self.assertEqual(os.stat(self.path).st_mtime_ns, built)
+
+    def test_touched_source_not_stale(self):
+        # Arrange
+        bundle = self.load()
+        source = self.root + Settings.FACT_FILE_PATH
+        stat = os.stat(source)
+
+        # Act
+        os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        # Assert
+        self.assertFalse(bundle.stale(self.root))
+
+    def test_edited_source_rebuilt(self):
+        # Arrange
+        bundle = self.load()
+
+        # Act
+        self.write(Settings.FACT_FILE_PATH, {"facts": ["A much longer new fact"]})
+        stale = bundle.stale(self.root)
+        rebuilt = self.load()
+
+        # Assert
+        self.assertTrue(stale)
+        self.assertEqual(rebuilt.get("facts"), {"facts": ["A much longer new fact"]})
+
+    def test_added_source_rebuilt(self):
+        # Arrange
+        bundle = self.load()
+
+        # Act
+        self.write(Settings.SIMULATION_NOTE_PATH + "totp.json", {"name": "TOTP"})
+        stale = bundle.stale(self.root)
+        rebuilt = self.load()
+
+        # Assert
+        self.assertTrue(stale)
+        self.assertEqual(rebuilt.get("simulation/totp"), {"name": "TOTP"})
+
+    def test_corrupt_bundle_rebuilt(self):
+        # Arrange
+        self.load()
+        with open(self.path, 'r+b') as f:
+            f.write(b"XXXX")
+
+        # Act
+        bundle = self.load()
+
+        # Assert
+        self.assertEqual(bundle.get("facts"), {"facts": ["Fact 1", "Fact 2"]})
+
+    def test_invalid_bundle(self):
+        # Arrange
+        with open(self.path, 'wb') as f:
+            f.write(b"MFAB")
+
+        # Act / Assert
+        with self.assertRaises(ValueError):
+            ContentBundle(self.path)
+
+    def test_no_sources(self):
+        # Act
+        bundle = load_bundle(root=self.root + "missing/")
+
+        # Assert
+        self.assertIsNone(bundle)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,6 +3,10 @@ from unittest.mock import MagicMock, patch
 from services.data_service import DataService, Settings, User, UserPreference, Note, Badge
 from services.message_service import MessageService
 import json
+import os
+import tempfile
+import threading
+import time
 
 
 class TestDataServices(unittest.TestCase):
@@ -63,49 +67,49 @@ class TestDataServices(unittest.TestCase):
         self.assertFalse(data_service.signal_update)
     
     @patch.object(DataService, 'read_notes_titles')
-    @patch('json.dump')
+    @patch('services.journal.atomic_write')
     @patch('builtins.open')
-    def test_save_data_update(self, mock_open, mock_dump, mock_read_notes_titles):
+    def test_save_data_update(self, mock_open, mock_write, mock_read_notes_titles):
         # Arrange
         data_service = DataService(self.message_service_mock)
         data_service.signal_update = True
 
         mock_open.reset_mock()
-        mock_dump.reset_mock()
+        mock_write.reset_mock()
 
         # Act
         data_service.save_data()
 
         # Assert
-        mock_open.assert_called_once_with(Settings.USER_FILE_PATH, 'w')
-        mock_dump.assert_called_once()
+        mock_write.assert_called_once()
+        self.assertEqual(mock_write.call_args.args[0], Settings.USER_FILE_PATH)
         self.assertFalse(data_service.signal_update)
 
     @patch.object(DataService, 'read_notes_titles')
-    @patch('json.dump')
+    @patch('services.journal.atomic_write')
     @patch('builtins.open')
-    def test_save_data_not_update(self, mock_open, mock_dump, mock_read_notes_titles):
+    def test_save_data_not_update(self, mock_open, mock_write, mock_read_notes_titles):
         # Arrange
         data_service = DataService(self.message_service_mock)
         data_service.signal_update = False
 
         mock_open.reset_mock()
-        mock_dump.reset_mock()
+        mock_write.reset_mock()
 
         # Act
         data_service.save_data()
 
         # Assert
         mock_open.assert_not_called()
-        mock_dump.assert_not_called()
+        mock_write.assert_not_called()
         self.assertFalse(data_service.signal_update)
 
 
     @patch.object(DataService, 'read_notes_titles')
-    @patch('json.dump')
+    @patch('services.journal.atomic_write')
     @patch('builtins.open')
     @patch('os.path.exists')
-    def test_reset_data(self, mock_path_exists, mock_open, mock_dump, mock_read_notes_titles):
+    def test_reset_data(self, mock_path_exists, mock_open, mock_write, mock_read_notes_titles):
         # Arrange
         mock_path_exists.return_value = True
         data = {"user": {"coins": 700, "quiz_completed": 5, "simulation_played": 12, "recent_activities": [["Quiz Completion", "Saturday, Mar 09, 2024, 03:45 PM", "Great job on completing the quiz! Keep learning."], ["Quiz Completion", "Saturday, Mar 09, 2024, 03:46 PM", "Great job on completing the quiz! Keep learning."], ["Quiz Completion", "Saturday, Mar 09, 2024, 05:24 PM", "Great job on completing the quiz! Keep learning."]], "badges": [[0, "b5.png"], [1, "b6.png"], [6, "b3.png"]], "improvements": [["MFA concepts", -6], ["MFA challenges", -3], ["MFA technologies", -6], ["RSA concepts", -2]], "readings": [["A Reading List", 2], ["Biometric", 2], ["Chip & Pin", 2], ["Cryptographic Device", False], ["Memorised Secret", 2], ["Picture Password", 2], ["TOTP", False]], "unlocked_simulations": {"1": True, "2": True, "3": True, "4": True, "5": True, "6": True, "7": True}}, "user_preference": {"start_up_index": 0, "custom_quiz_setting_expand": False, "show_notification": True}}
@@ -115,13 +119,14 @@ class TestDataServices(unittest.TestCase):
         data_service.signal_update = True
 
         mock_open.reset_mock()
-        mock_dump.reset_mock()
+        mock_write.reset_mock()
 
         # Act
         data_service.reset_data()
 
         # Assert
-        mock_open.assert_called_once_with(Settings.USER_FILE_PATH, 'w')
+        mock_write.assert_called_once()
+        self.assertEqual(mock_write.call_args.args[0], Settings.USER_FILE_PATH)
         # Check if the user and user_preference attributes are reset
         self.assertIsInstance(data_service.user, User)
         self.assertIsInstance(data_service.user_preference, UserPreference)
@@ -550,17 +555,32 @@ class TestDataServiceSection(unittest.TestCase):
     @patch('builtins.open')
     def test_read_note_content(self, mock_open, mock_listdir):
         # Arrange
+        mock_listdir.return_value = ['note3.md', 'Note1.md', 'note2.md']
         mock_file = MagicMock()
         mock_file.read.return_value = "Note content"
         mock_open.return_value.__enter__.return_value = mock_file
         self.data_service.notes = [Note("Note1", ""), Note("Note2", ""), Note("Note3", "")]
 
         # Act
-        result = self.data_service.read_note_content(0)
+        result = self.data_service.read_note_content(1)
 
         # Assert
         self.assertEqual(result, "<p>Note content</p>")  # Ensure correct content is returned
-        self.assertEqual(self.data_service.notes[0].content, "<p>Note content</p>")  # Ensure content is cached
+        self.assertEqual(self.data_service.notes[1].content, "<p>Note content</p>")  # Ensure content is cached
+        mock_open.assert_any_call(os.path.join(Settings.NOTE_FILE_PATH, 'note2.md'), 'r', encoding="utf-8")
+        mock_listdir.assert_called_once_with(Settings.NOTE_FILE_PATH)
+
+    @patch('os.listdir')
+    def test_read_notes_titles_sorted(self, mock_listdir):
+        # Arrange
+        mock_listdir.return_value = ['TOTP.md', 'biometric.md', 'a_reading_list.md', 'image.png']
+
+        # Act
+        result = self.data_service.read_notes_titles()
+
+        # Assert
+        self.assertEqual([note.title for note in result], ["A Reading List", "Biometric", "TOTP"])
+        self.assertEqual(self.data_service.note_index.paths["TOTP"], os.path.join(Settings.NOTE_FILE_PATH, 'TOTP.md'))
 
     def test_get_notes(self):
         # Arrange
@@ -596,6 +616,22 @@ class TestDataServiceSection(unittest.TestCase):
         self.assertEqual(result, self.data_service.cached_quiz_bank)
         mock_open.assert_called_once_with(Settings.QUIZ_FILE_PATH + 'quiz_bank1.json', 'r')
 
+    @patch('builtins.open')
+    def test_get_quiz_bank_bundled(self, mock_open):
+        # Arrange
+        self.data_service.content = MagicMock()
+        self.data_service.content.__contains__.return_value = True
+        self.data_service.content.get.return_value = [{"question": "Question 1", "answer": "Answer 1"}]
+        self.data_service.content_loaded = True
+
+        # Act
+        result = self.data_service.get_quiz_bank()
+
+        # Assert
+        self.assertEqual(result, [{"question": "Question 1", "answer": "Answer 1"}])
+        self.data_service.content.get.assert_called_once_with("quiz_bank")
+        mock_open.assert_not_called()
+
     @patch('builtins.open')
     def test_get_quiz_bank_cached(self, mock_open):
         # Arrange
@@ -639,3 +675,285 @@ class TestDataServiceSection(unittest.TestCase):
     
 
     
+
+
+class TestDataServiceJournal(unittest.TestCase):
+    def setUp(self):
+        self.message_service_mock = MagicMock(spec=MessageService)
+        self.folder = tempfile.TemporaryDirectory()
+        self.patches = [
+            patch.object(Settings, 'USER_FILE_PATH', os.path.join(self.folder.name, "user.json")),
+            patch.object(Settings, 'USER_JOURNAL_PATH', os.path.join(self.folder.name, "user.journal")),
+            patch.object(DataService, 'read_notes_titles', return_value=[])
+        ]
+        for p in self.patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        self.folder.cleanup()
+
+    def crash(self, data_service):
+        # process dies without save_data, only the journal is on disk
+        data_service.storage.journal.close()
+
+    def test_recover_after_crash(self):
+        # Arrange
+        data_service = DataService(self.message_service_mock)
+        data_service.update_user_coin(50)
+        data_service.update_user_badge(Badge.QUIZ_WHIZ)
+        data_service.unlock_user_simulation(3)
+        data_service.change_system_start_up(2)
+        self.crash(data_service)
+
+        # Act
+        recovered = DataService(self.message_service_mock)
+
+        # Assert
+        self.assertEqual(recovered.user.coins, 150)
+        self.assertEqual(recovered.user.badges, [Badge.QUIZ_WHIZ.value])
+        self.assertTrue(recovered.user.unlocked_simulations[3])
+        self.assertEqual(recovered.user_preference.start_up_index, 2)
+        # recovery compacts, the journal is folded into the document
+        self.assertFalse(os.path.exists(Settings.USER_JOURNAL_PATH))
+        self.assertFalse(recovered.signal_update)
+
+    def test_mutation_appends_only(self):
+        # Arrange
+        data_service = DataService(self.message_service_mock)
+        document_size = os.path.getsize(Settings.USER_FILE_PATH)
+
+        # Act
+        data_service.update_user_coin(10)
+
+        # Assert
+        self.assertEqual(os.path.getsize(Settings.USER_FILE_PATH), document_size)
+        self.assertEqual(list(data_service.storage.journal.records()), [["user", "coins", 110]])
+        self.assertTrue(data_service.signal_update)
+        data_service.storage.journal.close()
+
+    def test_save_data_compacts(self):
+        # Arrange
+        data_service = DataService(self.message_service_mock)
+        data_service.update_user_coin(10)
+
+        # Act
+        data_service.save_data()
+
+        # Assert
+        self.assertFalse(os.path.exists(Settings.USER_JOURNAL_PATH))
+        with open(Settings.USER_FILE_PATH) as f:
+            self.assertEqual(json.load(f)["user"]["coins"], 110)
+
+    @patch.object(Settings, 'USER_JOURNAL_COMPACT_RECORDS', 3)
+    def test_compact_threshold(self):
+        # Arrange
+        data_service = DataService(self.message_service_mock)
+
+        # Act
+        for _ in range(3):
+            data_service.update_user_coin(10)
+
+        # Assert
+        self.assertFalse(os.path.exists(Settings.USER_JOURNAL_PATH))
+        self.assertFalse(data_service.signal_update)
+        with open(Settings.USER_FILE_PATH) as f:
+            self.assertEqual(json.load(f)["user"]["coins"], 130)
+
+    def test_reset_data_clears_journal(self):
+        # Arrange
+        data_service = DataService(self.message_service_mock)
+        data_service.update_user_coin(10)
+
+        # Act
+        data_service.reset_data()
+        self.crash(data_service)
+        recovered = DataService(self.message_service_mock)
+
+        # Assert
+        self.assertEqual(recovered.user.coins, 100)
+
+    @patch.object(Settings, 'AUTOSAVE_INTERVAL', 60)
+    def test_autosave_burst(self):
+        # Arrange
+        data_service = DataService(self.message_service_mock)
+        autosaver = data_service.start_autosave()
+
+        # Act, nothing is due inside the interval, stopping writes the burst once
+        for _ in range(20):
+            data_service.update_user_coin(10)
+        data_service.stop_autosave()
+
+        # Assert
+        self.assertEqual(autosaver.notifications, 20)
+        self.assertEqual(autosaver.saves, 1)
+        self.assertGreater(autosaver.bytes_written, 0)
+        self.assertIsNone(data_service.autosaver)
+        with open(Settings.USER_FILE_PATH) as f:
+            self.assertEqual(json.load(f)["user"]["coins"], 300)
+
+    def blocking_write(self, data_service):
+        # storage.write that waits until the test lets it finish
+        started, release = threading.Event(), threading.Event()
+        write = data_service.storage.write
+        def blocked(document):
+            started.set()
+            release.wait(5)
+            return write(document)
+        data_service.storage.write = blocked
+        return started, release
+
+    def test_record_during_save(self):
+        # Arrange
+        data_service = DataService(self.message_service_mock)
+        data_service.update_user_coin(10)
+        started, release = self.blocking_write(data_service)
+        saver = threading.Thread(target=data_service.save_data)
+        saver.start()
+        started.wait(5)
+
+        # Act, the GUI thread records while the document is being written
+        recorded = threading.Thread(target=data_service.update_user_coin, args=(5,))
+        recorded.start()
+        recorded.join(5)
+        finished = not recorded.is_alive()
+        release.set()
+        saver.join()
+        self.crash(data_service)
+        recovered = DataService(self.message_service_mock)
+
+        # Assert
+        self.assertTrue(finished)
+        self.assertTrue(data_service.signal_update)
+        # the change made mid write is still in the journal
+        self.assertEqual(recovered.user.coins, 115)
+
+    def test_failed_save_marks_dirty(self):
+        # Arrange
+        data_service = DataService(self.message_service_mock)
+        data_service.update_user_coin(10)
+
+        # Act
+        with patch('services.storage.write_json_atomic', side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                data_service.save_data()
+        self.assertTrue(data_service.signal_update)
+        self.crash(data_service)
+        recovered = DataService(self.message_service_mock)
+
+        # Assert, the rotated records are replayed
+        self.assertEqual(recovered.user.coins, 110)
+
+    def test_stale_snapshot_not_written(self):
+        # Arrange, two saves copied the state, the newer one reaches the disk first
+        data_service = DataService(self.message_service_mock)
+        data_service.update_user_coin(10)
+        older = data_service.snapshot()
+        data_service.update_user_coin(5)
+        newer = data_service.snapshot()
+
+        # Act
+        data_service.write_snapshot(*newer)
+        written = data_service.write_snapshot(*older)
+
+        # Assert
+        self.assertEqual(written, 0)
+        with open(Settings.USER_FILE_PATH) as f:
+            self.assertEqual(json.load(f)["user"]["coins"], 115)
+
+    def test_snapshot_never_sees_half_a_change(self):
+        # Arrange, a save is copied while update_user_quiz is between its two field updates
+        data_service = DataService(self.message_service_mock)
+        copies = []
+        saver = threading.Thread(target=lambda: copies.append(data_service.snapshot(force=True)))
+        add_activity = User.add_activity
+
+        def slow_add_activity(user, *args):
+            saver.start()
+            saver.join(0.2)
+            blocked = saver.is_alive()
+            add_activity(user, *args)
+            copies.append(blocked)
+
+        # Act
+        with patch.object(User, 'add_activity', slow_add_activity):
+            data_service.update_user_quiz(0)
+        saver.join(5)
+
+        # Assert
+        blocked, (_, document) = copies
+        self.assertTrue(blocked)
+        self.assertEqual(document["user"]["quiz_completed"], 1)
+        self.assertEqual(len(document["user"]["recent_activities"]), 1)
+
+    def test_stop_autosave_flushes(self):
+        # Arrange
+        data_service = DataService(self.message_service_mock)
+        data_service.start_autosave()
+        data_service.update_user_coin(10)
+
+        # Act
+        data_service.stop_autosave()
+
+        # Assert
+        self.assertFalse(data_service.signal_update)
+        self.assertFalse(os.path.exists(Settings.USER_JOURNAL_PATH))
+        with open(Settings.USER_FILE_PATH) as f:
+            self.assertEqual(json.load(f)["user"]["coins"], 110)
+
+
+class TestDataServiceSqlite(unittest.TestCase):
+    def setUp(self):
+        self.message_service_mock = MagicMock(spec=MessageService)
+        self.folder = tempfile.TemporaryDirectory()
+        self.patches = [
+            patch.object(Settings, 'USER_STORAGE', "sqlite"),
+            patch.object(Settings, 'USER_DATABASE_PATH', os.path.join(self.folder.name, "user.db")),
+            patch.object(DataService, 'read_notes_titles', return_value=[])
+        ]
+        for p in self.patches:
+            p.start()
+        self.data_service = DataService(self.message_service_mock)
+
+    def tearDown(self):
+        self.data_service.storage.close()
+        for p in self.patches:
+            p.stop()
+        self.folder.cleanup()
+
+    def test_changes_stored_without_save(self):
+        # Arrange
+        self.data_service.update_user_coin(50)
+        self.data_service.update_user_badge(Badge.LEARNER)
+        self.data_service.set_system_show_notification(False)
+        self.data_service.storage.close()
+
+        # Act
+        recovered = DataService(self.message_service_mock)
+
+        # Assert
+        self.assertEqual(recovered.get_user_coins(), 150)
+        self.assertEqual(recovered.get_user_badges(), [Badge.LEARNER.value])
+        self.assertFalse(recovered.is_system_show_notification())
+        recovered.storage.close()
+
+    def test_change_profile(self):
+        # Arrange
+        self.data_service.update_user_coin(50)
+        self.message_service_mock.reset_mock()
+
+        # Act
+        self.data_service.change_profile("alice")
+        alice_coins = self.data_service.get_user_coins()
+        self.data_service.update_user_coin(-40)
+        self.data_service.change_profile("default")
+
+        # Assert
+        self.assertEqual(alice_coins, 100)
+        self.assertEqual(self.data_service.get_user_coins(), 150)
+        self.assertEqual(self.data_service.get_profile(), "default")
+        self.assertEqual(self.data_service.get_profiles(), ["alice", "default"])
+        self.message_service_mock.send.assert_any_call(self.data_service, "Reboot")
+        self.data_service.change_profile("alice")
+        self.assertEqual(self.data_service.get_user_coins(), 60)
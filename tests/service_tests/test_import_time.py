@@ -0,0 +1,92 @@
+import unittest
+import ast
+import os
+import subprocess
+import sys
+
+# Startup import cost, measured with python -X importtime in a fresh interpreter so
+# modules already loaded by other tests do not hide it. Budgets are relative to the
+# cost of importing the heavy dependencies on the same machine, so a slow runner
+# does not fail them and pulling one of those dependencies back in does.
+
+HEAVY_MODULES = ("numpy", "cv2", "rsa", "Crypto")
+HEAVY_IMPORT = "import numpy, cv2, rsa, Crypto.Cipher.AES, Crypto.PublicKey.RSA"
+SERVICE_BUDGET = 0.75 # of the heavy import, about 0.45 today
+STARTUP_BUDGET = 2.0 # of the heavy import, about 1.35 today without Qt (dependency_injector is most of it)
+SRC = os.path.join(os.getcwd(), "src")
+
+
+def startup_modules() -> list:
+    # modules app.py imports at module level, in order
+    with open(os.path.join(SRC, "app.py")) as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            modules.append(node.module)
+    return modules
+
+
+def import_times(statement: str) -> dict:
+    # module name -> cumulative microseconds
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], cwd=SRC,
+                            capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative)
+    return times
+
+
+def loaded_heavy_modules(times: dict) -> list:
+    return [name for name in HEAVY_MODULES if name in times]
+
+
+def best_cost(statement: str, modules: list, runs: int = 3) -> float:
+    # milliseconds spent in modules (cumulative), best of a few runs to ride out a cold disk cache
+    return min(sum(times.get(name, 0) for name in modules)
+               for times in (import_times(statement) for _ in range(runs))) / 1000
+
+
+class TestImportTime(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.heavy_cost = best_cost(HEAVY_IMPORT, ["numpy", "cv2", "rsa", "Crypto.Cipher.AES", "Crypto.PublicKey.RSA"])
+
+    def test_service_skips_heavy_modules(self):
+        times = import_times("import services.authentication_service")
+        self.assertIn("services.authentication_service", times)
+        self.assertEqual(loaded_heavy_modules(times), [])
+
+    def test_light_strategies_skip_heavy_modules(self):
+        self.assertEqual(loaded_heavy_modules(import_times("from models.authentication.authentication_methods import *")), [])
+
+    def test_lazy_strategy_loads_on_use(self):
+        loaded = loaded_heavy_modules(import_times("from models.authentication.authentication_methods import FingerPrintStrategy"))
+        self.assertIn("numpy", loaded)
+        self.assertIn("cv2", loaded)
+
+    def test_startup_skips_heavy_modules(self):
+        # everything app.py imports before the window opens
+        times = import_times("\n".join(f"import {name}" for name in startup_modules()))
+        self.assertIn("views.main_view", times)
+        self.assertEqual(loaded_heavy_modules(times), [])
+
+    def test_service_import_budget(self):
+        cost = best_cost("import services.authentication_service", ["services.authentication_service"])
+        self.assertLess(cost, SERVICE_BUDGET * self.heavy_cost)
+
+    def test_startup_import_budget(self):
+        # Qt is imported first and left out, the budget covers the app's own modules
+        modules = [name for name in startup_modules() if not name.startswith("PyQt5")]
+        statement = "\n".join(f"import {name}" for name in startup_modules())
+        cost = best_cost(statement, modules)
+        self.assertLess(cost, STARTUP_BUDGET * self.heavy_cost)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import unittest
+import json
+import os
+import tempfile
+from services.journal import *
+
+
+class TestJournal(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.folder.name, "user.journal")
+        self.journal = Journal(self.path)
+
+    def tearDown(self):
+        self.journal.close()
+        self.folder.cleanup()
+
+    def test_append_replay(self):
+        # Arrange
+        data = {"user": {"coins": 100, "badges": []}}
+
+        # Act
+        self.journal.append("user", "coins", 120)
+        self.journal.append("user", "badges", [[7, "b10.png"]])
+        self.journal.append("user", "coins", 140)
+        self.journal.close()
+        applied = Journal(self.path).replay(data)
+
+        # Assert
+        self.assertEqual(applied, 3)
+        self.assertEqual(data["user"], {"coins": 140, "badges": [[7, "b10.png"]]})
+        self.assertEqual(self.journal.appended, 3)
+
+    def test_replay_twice(self):
+        # Arrange
+        data = {"user": {"coins": 100}}
+        self.journal.append("user", "coins", 120)
+
+        # Act
+        self.journal.replay(data)
+        self.journal.replay(data)
+
+        # Assert
+        self.assertEqual(data["user"]["coins"], 120)
+
+    def test_torn_record(self):
+        # Arrange
+        self.journal.append("user", "coins", 120)
+        self.journal.append("user_preference", "start_up_index", 2)
+        self.journal.close()
+        with open(self.path, 'a') as f:
+            f.write('["user","coins",9')
+        data = {"user": {}}
+
+        # Act
+        applied = Journal(self.path).replay(data)
+
+        # Assert
+        self.assertEqual(applied, 2)
+        self.assertEqual(data, {"user": {"coins": 120}, "user_preference": {"start_up_index": 2}})
+
+    def test_missing_file(self):
+        # Act
+        applied = self.journal.replay({})
+
+        # Assert
+        self.assertEqual(applied, 0)
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_clear(self):
+        # Arrange
+        self.journal.append("user", "coins", 120)
+
+        # Act
+        self.journal.clear()
+
+        # Assert
+        self.assertFalse(os.path.exists(self.path))
+        self.assertEqual(self.journal.count, 0)
+        self.assertTrue(self.journal.append("user", "coins", 130))
+        self.assertEqual(list(Journal(self.path).records()), [["user", "coins", 130]])
+
+    def test_rotate_drop(self):
+        # Arrange
+        self.journal.append("user", "coins", 120)
+
+        # Act, a record made while the rotated ones are being written survives the drop
+        self.journal.rotate()
+        self.journal.append("user", "coins", 140)
+        before = list(self.journal.records())
+        self.journal.drop()
+        after = list(self.journal.records())
+
+        # Assert
+        self.assertEqual(before, [["user", "coins", 120], ["user", "coins", 140]])
+        self.assertEqual(after, [["user", "coins", 140]])
+
+    def test_rotate_after_failed_write(self):
+        # Arrange
+        self.journal.append("user", "coins", 120)
+        self.journal.rotate()
+        self.journal.append("user", "coins", 140)
+
+        # Act, the earlier write never dropped its records
+        self.journal.rotate()
+
+        # Assert
+        self.assertFalse(os.path.exists(self.path))
+        self.assertEqual(list(self.journal.records()), [["user", "coins", 120], ["user", "coins", 140]])
+
+    def test_append_unwritable(self):
+        # Arrange
+        journal = Journal(os.path.join(self.folder.name, "missing", "user.journal"))
+
+        # Act
+        result = journal.append("user", "coins", 120)
+
+        # Assert
+        self.assertFalse(result)
+        self.assertEqual(journal.failed, 1)
+        self.assertEqual(journal.count, 0)
+
+    def test_write_json_atomic(self):
+        # Arrange
+        path = os.path.join(self.folder.name, "user.json")
+
+        # Act
+        write_json_atomic(path, {"user": {"coins": 1}})
+        write_json_atomic(path, {"user": {"coins": 2}})
+
+        # Assert
+        with open(path) as f:
+            self.assertEqual(json.load(f), {"user": {"coins": 2}})
+        self.assertEqual(os.listdir(self.folder.name), ["user.json"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+import json
+import os
+import tempfile
+from services.load_generator import *
+
+
+class TestLoadGenerator(unittest.TestCase):
+    def test_run_flow_every_method(self):
+        for method in METHODS:
+            with self.subTest(method=method):
+                # Act
+                result_method, register_s, authenticate_s, ok = run_flow(method, 0, root="src/")
+
+                # Assert
+                self.assertEqual(result_method, method)
+                self.assertTrue(ok)
+                self.assertGreater(register_s, 0)
+                self.assertGreater(authenticate_s, 0)
+
+    def test_run_load(self):
+        # Act
+        report = run_load([Method.CHIP_PIN, Method.TOTP], iterations=5, workers=2, root="src/")
+
+        # Assert
+        self.assertEqual(set(report["methods"]), {"chip_pin", "totp"})
+        self.assertGreater(report["flows_per_s"], 0)
+        for result in report["methods"].values():
+            self.assertEqual(result["ok"], 5)
+            self.assertEqual(result["failed"], 0)
+            self.assertLessEqual(result["register"]["p50_ms"], result["register"]["p99_ms"])
+            self.assertLessEqual(result["authenticate"]["p99_ms"], result["authenticate"]["max_ms"])
+
+    def test_latency_summary(self):
+        summary = latency_summary([0.001] * 99 + [0.1])
+        self.assertAlmostEqual(summary["p50_ms"], 1.0)
+        self.assertAlmostEqual(summary["max_ms"], 100.0)
+        self.assertEqual(latency_summary([]), {})
+
+    def test_parse_methods(self):
+        self.assertEqual(parse_methods(["password", "TWOFA_KEY"]), [Method.PASSWORD, Method.TWOFA_KEY])
+        with self.assertRaises(ValueError):
+            parse_methods(["retina"])
+
+    def test_make_executor_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            make_executor("fiber", 1)
+
+    def test_main_writes_json(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output = os.path.join(tmp_dir, "report.json")
+            main(["--methods", "chip_pin", "--iterations", "2", "--root", "src/", "--output", output])
+            with open(output) as f:
+                self.assertEqual(json.load(f)["methods"]["chip_pin"]["ok"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,177 @@
+import unittest
+import os
+import tempfile
+from services.note_index import *
+
+
+class TestNoteIndex(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.notes = os.path.join(self.folder.name, "notes")
+        self.cache = os.path.join(self.folder.name, "notes_cache")
+        os.mkdir(self.notes)
+        self.write("TOTP.md", "# TOTP")
+        self.write("biometric.md", "*Biometric*")
+        self.write("a_reading_list.md", "A list")
+        self.write("image.png", "")
+        self.index = NoteIndex(self.notes, self.cache)
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def write(self, filename, text):
+        with open(os.path.join(self.notes, filename), 'w', encoding="utf-8") as f:
+            f.write(text)
+
+    def test_note_title(self):
+        # Act / Assert
+        self.assertEqual(note_title("chip_&_pin.md"), "Chip & Pin")
+        self.assertEqual(note_title("TOTP.md"), "TOTP")
+
+    def test_build_sorted(self):
+        # Act
+        entries = self.index.build()
+
+        # Assert
+        self.assertEqual([entry.title for entry in entries], ["A Reading List", "Biometric", "TOTP"])
+        self.assertEqual(self.index.paths["TOTP"], os.path.join(self.notes, "TOTP.md"))
+        self.assertGreater(entries[0].mtime_ns, 0)
+
+    def test_html(self):
+        # Arrange
+        self.index.build()
+
+        # Act
+        html = self.index.html("Biometric")
+        again = self.index.html("Biometric")
+
+        # Assert
+        self.assertEqual(html, "<p><em>Biometric</em></p>")
+        self.assertEqual(again, html)
+        self.assertEqual(self.index.rendered_count, 1)
+        self.assertEqual(len(os.listdir(self.cache)), 1)
+
+    def test_unknown_title(self):
+        # Arrange
+        self.index.build()
+
+        # Act / Assert
+        with self.assertRaises(KeyError):
+            self.index.html("Missing")
+
+    def test_disk_cache(self):
+        # Arrange
+        self.index.build()
+        self.index.warm()
+
+        # Act
+        index = NoteIndex(self.notes, self.cache)
+        index.build()
+        index.warm()
+
+        # Assert
+        self.assertEqual(self.index.rendered_count, 3)
+        self.assertEqual(index.rendered_count, 0)
+        self.assertEqual(index.html("TOTP"), "<h1>TOTP</h1>")
+
+    def test_edited_note(self):
+        # Arrange
+        self.index.build()
+        self.index.warm()
+        self.write("TOTP.md", "# Time-based OTP")
+        path = os.path.join(self.notes, "TOTP.md")
+        os.utime(path, ns=(0, self.index.entries[2].mtime_ns + 10**9))
+
+        # Act
+        self.index.warm()
+
+        # Assert
+        self.assertEqual(self.index.html("TOTP"), "<h1>Time-based OTP</h1>")
+        self.assertEqual(self.index.rendered_count, 4)
+        # the HTML of the old text was pruned
+        self.assertEqual(len(os.listdir(self.cache)), 3)
+
+    def test_rebuild_keeps_rendered(self):
+        # Arrange
+        self.index.build()
+        self.index.warm()
+        entries = self.index.entries
+
+        # Act, a reboot lists the same folder again then a note is added
+        self.index.build()
+        same = self.index.entries
+        self.write("chip_&_pin.md", "Chip")
+        self.index.build()
+
+        # Assert
+        self.assertIs(same, entries)
+        self.assertEqual(set(self.index.rendered), {"A Reading List", "Biometric", "TOTP"})
+        self.assertEqual(self.index.html("Chip & Pin"), "<p>Chip</p>")
+        self.assertEqual(self.index.rendered_count, 4)
+
+    def test_rebuild_drops_removed(self):
+        # Arrange
+        self.index.build()
+        self.index.warm()
+
+        # Act
+        os.remove(os.path.join(self.notes, "TOTP.md"))
+        self.index.build()
+
+        # Assert
+        self.assertEqual(set(self.index.rendered), {"A Reading List", "Biometric"})
+
+    def test_render_after_rebuild_not_stored(self):
+        # Arrange, the warm thread rendered a note the index no longer has
+        self.index.build()
+        path = self.index.paths["TOTP"]
+        os.remove(path)
+        self.index.build()
+
+        # Act
+        html = self.index.store("TOTP", path, "<h1>TOTP</h1>")
+
+        # Assert
+        self.assertEqual(html, "<h1>TOTP</h1>")
+        self.assertNotIn("TOTP", self.index.rendered)
+
+    def test_warm_during_lookups(self):
+        # Arrange
+        self.index.build()
+
+        # Act, the GUI thread reads and lists while the warm thread renders
+        thread = self.index.start_warming()
+        for _ in range(20):
+            self.index.build()
+            self.index.html("Biometric")
+        thread.join(5)
+
+        # Assert
+        self.assertEqual(set(self.index.rendered), {"A Reading List", "Biometric", "TOTP"})
+        self.assertEqual(self.index.html("Biometric"), "<p><em>Biometric</em></p>")
+
+    def test_start_warming(self):
+        # Arrange
+        self.index.build()
+
+        # Act
+        self.index.start_warming().join(5)
+
+        # Assert
+        self.assertEqual(set(self.index.rendered), {"A Reading List", "Biometric", "TOTP"})
+
+    def test_no_cache_folder_parent(self):
+        # Arrange
+        index = NoteIndex(self.notes, os.path.join(self.folder.name, "missing", "notes_cache"))
+        index.build()
+
+        # Act
+        html = index.html("A Reading List")
+
+        # Assert
+        self.assertEqual(html, "<p>A list</p>")
+        self.assertFalse(os.path.exists(os.path.join(self.folder.name, "missing")))
+
+
+if __name__ == '__main__':
+    unittest.main()
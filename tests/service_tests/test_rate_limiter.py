@@ -0,0 +1,182 @@
+import unittest
+from services.rate_limiter import *
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def limiter(self, policy):
+        return RateLimiter(policy, clock=self.clock, sweep_interval=3600)
+
+    def fail(self, limiter, times, key="k"):
+        for _ in range(times):
+            limiter.record(key, False)
+
+    def test_fixed_window(self):
+        # Arrange
+        limiter = self.limiter(FixedWindowPolicy(limit=3, window=60, lock_duration=10))
+
+        # Act
+        self.fail(limiter, 2)
+        unlocked = limiter.is_locked("k")
+        self.fail(limiter, 1)
+
+        # Assert
+        self.assertFalse(unlocked)
+        self.assertEqual(limiter.retry_after("k"), 10)
+        self.clock.now += 4
+        self.assertEqual(limiter.retry_after("k"), 6)
+        self.clock.now += 6
+        self.assertFalse(limiter.is_locked("k"))
+
+    def test_fixed_window_expires(self):
+        limiter = self.limiter(FixedWindowPolicy(limit=3, window=60, lock_duration=10))
+        self.fail(limiter, 2)
+        self.clock.now += 61
+        self.fail(limiter, 2)
+        self.assertFalse(limiter.is_locked("k"))
+
+    def test_fixed_window_count_kept_through_lock(self):
+        # Arrange
+        limiter = self.limiter(FixedWindowPolicy(limit=3, window=60, lock_duration=10))
+        self.fail(limiter, 3)
+
+        # Act, the lock ends but the window is still open
+        self.clock.now += 10
+        unlocked = not limiter.is_locked("k")
+        retry_after = limiter.record("k", False)
+
+        # Assert, one failure locks again, there are no fresh attempts after each lock
+        self.assertTrue(unlocked)
+        self.assertEqual(retry_after, 10)
+        self.clock.now += 51 # 61s after the window started, the count starts over
+        self.assertEqual(limiter.record("k", False), 0)
+
+    def test_sliding_log_kept_through_lock(self):
+        limiter = self.limiter(SlidingLogPolicy(limit=3, window=60, lock_duration=10))
+        self.fail(limiter, 3)
+        self.clock.now += 10
+        self.assertFalse(limiter.is_locked("k"))
+        self.assertEqual(limiter.record("k", False), 10)
+
+    def test_sliding_log(self):
+        limiter = self.limiter(SlidingLogPolicy(limit=3, window=60, lock_duration=10))
+        self.fail(limiter, 2)
+        self.clock.now += 59
+        self.fail(limiter, 1)
+        self.assertTrue(limiter.is_locked("k"))
+
+        self.clock.now += 10
+        self.fail(limiter, 2)
+        self.clock.now += 60 # both fall out of the window
+        self.fail(limiter, 1)
+        self.assertFalse(limiter.is_locked("k"))
+
+    def test_token_bucket(self):
+        # Arrange
+        limiter = self.limiter(TokenBucketPolicy(capacity=3, rate=0.5))
+
+        # Act
+        self.fail(limiter, 3)
+
+        # Assert
+        self.assertAlmostEqual(limiter.retry_after("k"), 2.0)
+        self.clock.now += 2
+        self.assertFalse(limiter.is_locked("k"))
+        self.fail(limiter, 1)
+        self.assertTrue(limiter.is_locked("k"))
+
+    def test_exponential_backoff(self):
+        # Arrange
+        limiter = self.limiter(ExponentialBackoffPolicy(free=2, base=1, factor=2, max_delay=5))
+        self.fail(limiter, 2)
+        self.assertFalse(limiter.is_locked("k"))
+
+        # Act / Assert
+        delays = []
+        for _ in range(5):
+            delays.append(limiter.record("k", False))
+            self.clock.now += delays[-1]
+        self.assertEqual(delays, [1, 2, 4, 5, 5])
+
+        limiter.record("k", True)
+        self.assertEqual(limiter.record("k", False), 0) # success resets the backoff
+
+    def test_keys_are_independent(self):
+        limiter = self.limiter(FixedWindowPolicy(limit=2))
+        self.fail(limiter, 2, key=("session", "password"))
+        self.assertTrue(limiter.is_locked(("session", "password")))
+        self.assertFalse(limiter.is_locked(("session", "totp")))
+        self.assertFalse(limiter.is_locked(("other", "password")))
+
+    def test_sweep(self):
+        # Arrange
+        limiter = self.limiter(FixedWindowPolicy(limit=2, window=60, lock_duration=10))
+        self.fail(limiter, 2, key="locked")
+        self.fail(limiter, 1, key="recent")
+        self.clock.now -= 100
+        self.fail(limiter, 1, key="stale")
+        self.clock.now += 100
+
+        # Act
+        swept = limiter.sweep()
+
+        # Assert
+        self.assertEqual(swept, 1)
+        self.assertEqual(len(limiter), 2)
+        self.clock.now += 61
+        self.assertEqual(limiter.sweep(), 2)
+        self.assertEqual(len(limiter), 0)
+
+    def test_reserve_counts_in_flight(self):
+        # Arrange
+        limiter = self.limiter(FixedWindowPolicy(limit=3, window=60, lock_duration=10))
+        self.fail(limiter, 1)
+
+        # Act, two more attempts may still run, a third would go past the limit
+        granted = [limiter.reserve("k") for _ in range(3)]
+
+        # Assert
+        self.assertEqual(granted, [True, True, False])
+        self.assertEqual(limiter.pending("k"), 2)
+        limiter.release("k")
+        self.assertTrue(limiter.reserve("k"))
+        limiter.settle("k", False)
+        self.assertEqual(limiter.settle("k", False), 10)
+        self.assertEqual(limiter.pending("k"), 0)
+        self.assertFalse(limiter.reserve("k"))
+
+    def test_reserve_after_lock(self):
+        # once a lock is over one attempt at a time may run, even though the count is kept
+        limiter = self.limiter(FixedWindowPolicy(limit=2, window=60, lock_duration=10))
+        self.fail(limiter, 2)
+        self.clock.now += 10
+        self.assertTrue(limiter.reserve("k"))
+        self.assertFalse(limiter.reserve("k"))
+
+    def test_pending_not_swept(self):
+        limiter = self.limiter(FixedWindowPolicy(limit=3))
+        self.assertTrue(limiter.reserve("k"))
+        self.assertEqual(limiter.sweep(), 0)
+        limiter.settle("k", True)
+        self.assertEqual(limiter.sweep(), 1)
+
+    def test_reset(self):
+        limiter = self.limiter(FixedWindowPolicy(limit=1))
+        self.fail(limiter, 1)
+        limiter.reset("k")
+        self.assertFalse(limiter.is_locked("k"))
+        self.assertEqual(len(limiter), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
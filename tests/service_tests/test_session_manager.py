@@ -0,0 +1,169 @@
+import unittest
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+from services.session_manager import SessionManager
+from services.authentication_service import SessionState
+from models.authentication.authentication import Method
+
+
+class TestSessionManager(unittest.TestCase):
+    def setUp(self):
+        self.manager = SessionManager(MagicMock(), ttl=60)
+
+    def test_create(self):
+        # Act
+        first = self.manager.create()
+        second = self.manager.create()
+
+        # Assert
+        self.assertNotEqual(first, second)
+        self.assertEqual(len(self.manager), 2)
+        self.assertIn(first, self.manager)
+        with self.manager.session(first) as a, self.manager.session(second) as b:
+            self.assertIsNot(a, b)
+
+    def test_sessions_are_independent(self):
+        # Arrange
+        first = self.manager.create()
+        second = self.manager.create()
+        self.manager.add(first, Method.CHIP_PIN)
+        self.manager.add(second, Method.CHIP_PIN)
+
+        # Act
+        self.assertTrue(self.manager.register(first, "1234"))
+        self.assertTrue(self.manager.register(second, "9999"))
+
+        # Assert
+        self.assertEqual(self.manager.authenticate(first, "1234"), 0)
+        self.assertEqual(self.manager.authenticate(second, "1234"), 1)
+        self.assertEqual(self.manager.state(first)["auth_count"], 1)
+        self.assertEqual(self.manager.state(second)["auth_count"], 0)
+
+    def test_state(self):
+        session_id = self.manager.create()
+        self.manager.add(session_id, Method.PASSWORD)
+        state = self.manager.state(session_id)
+        self.assertEqual(state["session_id"], session_id)
+        self.assertEqual(state["methods"], ["password"])
+        self.assertEqual(state["register_count"], 0)
+        self.assertFalse(state["locked"])
+        self.assertEqual(len(self.manager.states()), 1)
+
+    def test_locked_state(self):
+        session_id = self.manager.create()
+        self.manager.add(session_id, Method.CHIP_PIN)
+        self.manager.register(session_id, "1234")
+        for _ in range(5):
+            self.manager.authenticate(session_id, "0000")
+
+        self.assertEqual(self.manager.authenticate(session_id, "1234"), 2)
+        self.assertTrue(self.manager.state(session_id)["locked"])
+        self.assertGreater(self.manager.state(session_id)["lock_remaining"], 0)
+
+    def test_unknown_session(self):
+        with self.assertRaises(KeyError):
+            self.manager.register("missing", "1234")
+        self.assertFalse(self.manager.close("missing"))
+
+    def test_close(self):
+        session_id = self.manager.create()
+        self.assertTrue(self.manager.close(session_id))
+        self.assertNotIn(session_id, self.manager)
+
+    def test_evict_idle(self):
+        # Arrange
+        idle = self.manager.create()
+        active = self.manager.create()
+        now = time.monotonic()
+
+        in_use, done = threading.Event(), threading.Event()
+
+        def hold():
+            with self.manager.session(active):
+                in_use.set()
+                done.wait(5)
+
+        worker = threading.Thread(target=hold)
+        worker.start()
+        in_use.wait(5)
+
+        # Act
+        evicted = self.manager.evict_idle(now + 61)
+        done.set()
+        worker.join()
+
+        # Assert
+        self.assertEqual(evicted, 1) # the session in use is skipped
+        self.assertNotIn(idle, self.manager)
+        self.assertIn(active, self.manager)
+        self.assertEqual(self.manager.evicted, 1)
+        self.assertEqual(self.manager.evict_idle(now + 30), 0)
+
+    def test_sweep_on_create(self):
+        manager = SessionManager(MagicMock(), ttl=0, sweep_interval=0)
+        first = manager.create()
+        time.sleep(0.001)
+        manager.create()
+        self.assertNotIn(first, manager)
+
+    def test_concurrent_sessions(self):
+        # Arrange
+        def flow(i):
+            session_id = self.manager.create()
+            self.manager.add(session_id, Method.CHIP_PIN)
+            self.manager.register(session_id, str(i))
+            return self.manager.authenticate(session_id, str(i))
+
+        # Act
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(flow, range(100)))
+
+        # Assert
+        self.assertEqual(results, [0] * 100)
+        self.assertEqual(len(self.manager), 100)
+
+
+    def test_session_is_slim_record(self):
+        # Arrange
+        session_id = self.manager.create()
+        self.manager.add(session_id, Method.CHIP_PIN)
+        self.manager.register(session_id, "1234")
+
+        # Act
+        session = self.manager._get(session_id)
+
+        # Assert, the record holds the chain and counters, not a service
+        self.assertFalse(hasattr(session, "__dict__"))
+        self.assertIsInstance(session.state, SessionState)
+        self.assertEqual((session.state.register_count, session.state.auth_count), (1, 0))
+        with self.manager.session(session_id) as service:
+            self.assertIs(service.state, session.state)
+            self.assertIs(service.rate_limiter, self.manager.rate_limiter)
+
+    def test_data_service_calls_serialised(self):
+        # Arrange, a data service that notices overlapping calls
+        active, overlaps = [0], []
+        def update_user_coin(value):
+            active[0] += 1
+            overlaps.append(active[0] > 1)
+            time.sleep(0.001)
+            active[0] -= 1
+            return True
+        data_service = MagicMock()
+        data_service.update_user_coin.side_effect = update_user_coin
+        manager = SessionManager(data_service, ttl=60)
+        sessions = [manager.create() for _ in range(20)]
+
+        # Act
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda session_id: manager.data_service.update_user_coin(-100), sessions))
+
+        # Assert
+        self.assertEqual(len(overlaps), 20)
+        self.assertFalse(any(overlaps))
+
+
+if __name__ == '__main__':
+    unittest.main()
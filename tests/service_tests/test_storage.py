@@ -0,0 +1,164 @@
+import unittest
+import unittest.mock
+import os
+import tempfile
+from models.user import User, Badge
+from models.user_preference import UserPreference
+from services.storage import *
+
+
+def sample_document() -> dict:
+    user = User()
+    user.coins = 450
+    user.quiz_completed = 2
+    user.recent_activities.append(("Simulation Completion", "Saturday, Mar 09, 2024, 03:45 PM", "Well done!"))
+    user.add_activity("Quiz Completion", "Great job on completing the quiz! Keep learning.")
+    user.add_badge(Badge.MFA)
+    user.add_badge(Badge.QUIZ_WHIZ)
+    user.update_improvements([("MFA concepts", -6), ("RSA concepts", -2)])
+    user.readings = [["Biometric", True], ["TOTP", False]]
+    user.unlock_simulation(3)
+    preference = UserPreference()
+    preference.start_up_index = 2
+    preference.show_notification = False
+    # as JSON would hand it back
+    return json.loads(json.dumps({"user": user.to_dict(), "user_preference": preference.to_dict()}))
+
+
+class TestJsonStorage(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.storage = JsonStorage(os.path.join(self.folder.name, "user.json"), os.path.join(self.folder.name, "user.journal"))
+
+    def tearDown(self):
+        self.storage.close()
+        self.folder.cleanup()
+
+    def test_load_missing(self):
+        # Act / Assert
+        self.assertIsNone(self.storage.load())
+
+    def test_write_append_load(self):
+        # Arrange
+        document = sample_document()
+        self.storage.write(document)
+
+        # Act
+        self.storage.append("user", "coins", 500)
+        pending = self.storage.pending()
+        self.storage.close()
+        data = JsonStorage(self.storage.path, self.storage.journal.path).load()
+
+        # Assert
+        self.assertEqual(pending, 1)
+        self.assertEqual(data["user"]["coins"], 500)
+        self.assertEqual(data["user"]["badges"], document["user"]["badges"])
+        self.assertFalse(os.path.exists(self.storage.journal.path))
+
+    def test_single_profile(self):
+        # Act / Assert
+        self.assertEqual(self.storage.profiles(), [DEFAULT_PROFILE])
+        self.storage.use(DEFAULT_PROFILE)
+        with self.assertRaises(ValueError):
+            self.storage.use("alice")
+
+
+class TestSqliteStorage(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.folder.name, "user.db")
+        self.storage = SqliteStorage(self.path)
+
+    def tearDown(self):
+        self.storage.close()
+        self.folder.cleanup()
+
+    def test_load_missing(self):
+        # Act / Assert
+        self.assertIsNone(self.storage.load())
+        self.assertFalse(self.storage.append("user", "coins", 1))
+
+    def test_round_trip(self):
+        # Arrange
+        document = sample_document()
+
+        # Act
+        written = self.storage.write(document)
+        self.storage.close()
+        self.storage = SqliteStorage(self.path)
+        data = self.storage.load()
+
+        # Assert
+        self.assertGreater(written, 0)
+        self.assertEqual(data, document)
+        self.assertEqual(User.from_dict(data["user"]).unlocked_simulations[3], True)
+
+    def test_append(self):
+        # Arrange
+        document = sample_document()
+        self.storage.write(document)
+
+        # Act
+        self.storage.append("user", "coins", 999)
+        self.storage.append("user", "unlocked_simulations", {"1": True, "2": True})
+        self.storage.append("user", "readings", [["Biometric", True], ["TOTP", True]])
+        self.storage.append("user_preference", "custom_quiz_setting_expand", True)
+        unknown = self.storage.append("user", "unknown", 1)
+        data = SqliteStorage(self.path).load()
+
+        # Assert
+        self.assertFalse(unknown)
+        self.assertEqual(data["user"]["coins"], 999)
+        self.assertEqual(data["user"]["unlocked_simulations"], {"1": True, "2": True})
+        self.assertEqual(data["user"]["readings"], [["Biometric", True], ["TOTP", True]])
+        self.assertTrue(data["user_preference"]["custom_quiz_setting_expand"])
+        self.assertEqual(data["user"]["badges"], document["user"]["badges"])
+        self.assertEqual(self.storage.pending(), 0)
+
+    def test_profiles_isolated(self):
+        # Arrange
+        document = sample_document()
+        self.storage.write(document)
+        self.storage.use("alice")
+
+        # Act
+        missing = self.storage.load()
+        fresh = json.loads(json.dumps({"user": User().to_dict(), "user_preference": UserPreference().to_dict()}))
+        self.storage.write(fresh)
+        self.storage.append("user", "coins", 5)
+        self.storage.use(DEFAULT_PROFILE)
+        default = self.storage.load()
+
+        # Assert
+        self.assertIsNone(missing)
+        self.assertEqual(self.storage.profiles(), ["alice", DEFAULT_PROFILE])
+        self.assertEqual(default, document)
+        self.storage.use("alice")
+        self.assertEqual(self.storage.load()["user"]["coins"], 5)
+
+    def test_wal_and_indexes(self):
+        # Act
+        mode = self.storage.connection.execute("PRAGMA journal_mode").fetchone()[0]
+        indexes = [row[1] for row in self.storage.connection.execute("PRAGMA index_list(activities)")]
+
+        # Assert
+        self.assertEqual(mode, "wal")
+        self.assertIn("activities_time", indexes)
+
+    def test_activity_time(self):
+        # Act / Assert
+        self.assertGreater(activity_time("Saturday, Mar 09, 2024, 03:45 PM"), 0)
+        self.assertEqual(activity_time("yesterday"), 0.0)
+
+
+class TestCreateStorage(unittest.TestCase):
+    def test_unknown(self):
+        # Arrange
+        with unittest.mock.patch.object(Settings, 'USER_STORAGE', "csv"):
+            # Act / Assert
+            with self.assertRaises(ValueError):
+                create_storage()
+
+
+if __name__ == '__main__':
+    unittest.main()
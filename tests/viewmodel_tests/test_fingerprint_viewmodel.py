@@ -2,6 +2,7 @@ import unittest
 from unittest.mock import MagicMock, patch
 from viewmodels.authentication.fingerprint_viewmodel import FingerprintRegisterViewModel, FingerprintAuthenticateViewModel
 import numpy as np
+import base64
 
 class TestFingerprintRegisterViewModel(unittest.TestCase):
     @patch("services.container.ApplicationContainer.authentication_service")
@@ -58,6 +59,16 @@ class TestFingerprintRegisterViewModel(unittest.TestCase):
         self.assertTrue(isinstance(result["user_fingerprint"], str))
         self.assertTrue(isinstance(result["fingerprint_template"], str))
 
+    def test_state_data_packed_template(self):
+        mock_data = {
+            "user_fingerprint": b"user_fingerprint",
+            "fingerprint_template": np.packbits(np.ones((64, 64), dtype=np.uint8))
+        }
+        self.viewmodel.authentication_service.get_session_stored.return_value = mock_data
+
+        result = self.viewmodel.state_data()
+        self.assertEqual(base64.b64decode(result["fingerprint_template"]), b"\xff" * 512)
+
     @patch('viewmodels.authentication.fingerprint_viewmodel.image_byte', return_value=b"fingerprint")
     def test_send(self, mock_image_byte):
         # mock signals
@@ -136,6 +147,7 @@ class TestFingerprintAuthenticateViewModel(unittest.TestCase):
 
         # Case: Locked for 10 seconds
         self.viewmodel.authentication_service.authenticate.return_value = 2
+        self.viewmodel.authentication_service.retry_after.return_value = 9.5
         self.viewmodel.send()
         self.viewmodel.state_change.emit.assert_called_with("Locked for 10 seconds.", 2)
         self.viewmodel.state_data_change.emit.assert_called_with(self.viewmodel.state_data(False), 2)
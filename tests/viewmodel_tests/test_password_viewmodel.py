@@ -102,6 +102,7 @@ class TestPasswordAuthenticateViewModel(unittest.TestCase):
 
         # Case: Locked for 10 seconds
         self.viewmodel.authentication_service.authenticate.return_value = 2
+        self.viewmodel.authentication_service.retry_after.return_value = 9.5
         self.viewmodel.send("username", "Password")
         self.viewmodel.state_change.emit.assert_called_with("Locked for 10 seconds.", 2)
         self.viewmodel.state_data_change.emit.assert_called_with(self.viewmodel.state_data(False), 2)
@@ -122,6 +122,20 @@ class TestPicturePasswordRegisterViewModel(unittest.TestCase):
         self.viewmodel.send()
         self.viewmodel.state_change.emit.assert_called_with("Registration Fail", 1)
 
+    @patch("viewmodels.authentication.picture_password_viewmodel.encrypt_images_stream", return_value = [b"streamed"])
+    @patch("viewmodels.authentication.picture_password_viewmodel.encrypt_images", return_value = [b"encrypted"])
+    def test_encrypt_selected(self, mock_encrypt_images, mock_encrypt_images_stream):
+        self.viewmodel.selected_images = ["image1.png"]
+
+        # Default whole file encryption
+        self.assertEqual(self.viewmodel.encrypt_selected(b"key", b"iv"), [b"encrypted"])
+        mock_encrypt_images_stream.assert_not_called()
+
+        # Opted in to streaming
+        self.viewmodel.stream_cipher = "gcm"
+        self.assertEqual(self.viewmodel.encrypt_selected(b"key", b"iv"), [b"streamed"])
+        mock_encrypt_images_stream.assert_called_once_with(["image1.png"], b"key", b"iv", "gcm")
+
 class TestPicturePasswordAuthenticateViewModel(unittest.TestCase):
     @patch("os.listdir")
     @patch("services.container.ApplicationContainer.authentication_service")
@@ -205,6 +219,7 @@ class TestPicturePasswordAuthenticateViewModel(unittest.TestCase):
 
         # Case: Locked for 10 seconds
         self.viewmodel.authentication_service.authenticate.return_value = 2
+        self.viewmodel.authentication_service.retry_after.return_value = 9.5
         self.viewmodel.send()
         self.viewmodel.state_change.emit.assert_called_with("Locked for 10 seconds.", 2)
         self.viewmodel.state_data_change.emit.assert_called_with(self.viewmodel.state_data(False), 2)
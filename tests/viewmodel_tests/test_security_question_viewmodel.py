@@ -178,6 +178,7 @@ class TestPicturePasswordAuthenticateViewModel(unittest.TestCase):
 
         # Case: Locked for 10 seconds
         self.viewmodel.authentication_service.authenticate.return_value = 2
+        self.viewmodel.authentication_service.retry_after.return_value = 9.5
         self.viewmodel.send()
         self.viewmodel.state_change.emit.assert_called_with("Locked for 10 seconds.", 2)
         self.viewmodel.state_data_change.emit.assert_called_with(self.viewmodel.state_data(), 2)
@@ -1,4 +1,5 @@
 import unittest
+from concurrent.futures import Future
 from unittest.mock import MagicMock, patch
 from viewmodels.authentication.twofa_key_viewmodel import TwoFAKeyRegisterViewModel, TwoFAKeyAuthenticateViewModel
 import numpy as np
@@ -89,16 +90,35 @@ class TestFingerprintRegisterViewModel(unittest.TestCase):
         self.viewmodel.state_data = MagicMock()
         self.viewmodel.state_data.return_value = {}
 
+        def resolved(value):
+            future = Future()
+            future.set_result(value)
+            return future
+
         # Case: Registration successful
-        self.viewmodel.authentication_service.register.return_value = True
+        self.viewmodel.authentication_service.register_async.return_value = resolved(True)
         self.viewmodel.send("key_name", "fingerprint_path")
+        self.viewmodel.authentication_service.register.assert_not_called()
         self.viewmodel.state_change.emit.assert_called_with("Registration Completed", 0)
         self.viewmodel.state_data_change.emit.assert_called_with(self.viewmodel.state_data(), 0)
         self.viewmodel.message_service.send.assert_called_once_with(self.viewmodel, "Registered")
 
         # Case: Registration failed
-        self.viewmodel.authentication_service.register.return_value = False
+        self.viewmodel.authentication_service.register_async.return_value = resolved(False)
+        self.viewmodel.send("key_name", "fingerprint_path")
+        self.viewmodel.state_change.emit.assert_called_with("Registration Fail", 1)
+
+    @patch('viewmodels.authentication.twofa_key_viewmodel.image_byte', return_value=b"fingerprint")
+    def test_send_pending(self, mock_image_byte):
+        # Nothing is reported until the key pair and the registration are done
+        self.viewmodel.state_change = MagicMock()
+        pending = Future()
+        self.viewmodel.authentication_service.register_async.return_value = pending
+
         self.viewmodel.send("key_name", "fingerprint_path")
+        self.viewmodel.state_change.emit.assert_not_called()
+
+        pending.set_exception(RuntimeError("Key generation was cancelled."))
         self.viewmodel.state_change.emit.assert_called_with("Registration Fail", 1)
 
 
@@ -181,6 +201,7 @@ class TestTwoFAKeyAuthenticateViewModel(unittest.TestCase):
 
         # Case: Locked for 10 seconds
         self.viewmodel.authentication_service.authenticate.return_value = 2
+        self.viewmodel.authentication_service.retry_after.return_value = 9.5
         self.viewmodel.key_on = True
         self.viewmodel.send()
         self.viewmodel.state_change.emit.assert_called_with("Locked for 10 seconds.", 2)